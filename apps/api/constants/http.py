@@ -0,0 +1,3 @@
+CACHE_STATUS_HEADER = "X-Cache"
+CACHE_STATUS_HIT = "HIT"
+CACHE_STATUS_MISS = "MISS"
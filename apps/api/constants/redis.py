@@ -1,2 +1,10 @@
 REDIS_KEY_CATEGORIES = "store:categories"
 REDIS_KEY_PRODUCTS = "store:products"
+REDIS_KEY_RATE_LIMIT = "store:ratelimit"
+REDIS_KEY_RECOMPUTE_SLOTS = "store:recompute:slots"
+REDIS_KEY_PRODUCT_FACETS = "store:products:facets"
+REDIS_KEY_CATEGORY_DELETIONS = "store:category_deletions"
+REDIS_KEY_JOBS = "store:jobs"
+REDIS_KEY_PRICE_INDEX = "store:price_index"
+REDIS_KEY_CATALOG_SNAPSHOT = "store:catalog_snapshot"
+REDIS_KEY_CACHE_GENERATION = "store:cache:generation"
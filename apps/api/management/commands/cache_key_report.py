@@ -0,0 +1,79 @@
+import hashlib
+import json
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from apps.api.constants.redis import REDIS_KEY_CATEGORIES, REDIS_KEY_PRODUCTS
+from apps.api.utils.redis_cache import get_cache_nodes
+
+CACHE_KEY_PREFIX = ":1:"
+BATCH_SIZE = 500
+
+
+def payload_digest(payload):
+    """Digest of the part of a cached payload that depends on the query.
+
+    Pagination links are left out: they echo the query string, so otherwise
+    identical pages stored under different keys would never compare equal.
+    """
+    if isinstance(payload, dict):
+        payload = {k: v for k, v in payload.items()
+                   if k not in ("next", "previous")}
+    encoded = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha1(encoded.encode()).hexdigest()
+
+
+def collect_key_stats(base_keys, batch_size=BATCH_SIZE):
+    stats = {
+        base_key: {"keys": 0, "variants": 0, "bytes": 0, "digests": defaultdict(int)}
+        for base_key in base_keys
+    }
+
+    def flush(redis_conn, batch):
+        pipe = redis_conn.pipeline(transaction=False)
+        for _, raw_key in batch:
+            pipe.get(raw_key)
+        for (base_key, raw_key), value in zip(batch, pipe.execute()):
+            if value is None:
+                continue
+            entry = stats[base_key]
+            entry["bytes"] += len(value)
+            if b"#" in raw_key:
+                entry["variants"] += 1
+                continue
+            entry["keys"] += 1
+            entry["digests"][payload_digest(cache.client.decode(value))] += 1
+
+    # Each node of a sharded cache holds a share of the keys.
+    for redis_conn in get_cache_nodes():
+        for base_key in base_keys:
+            batch = []
+            pattern = f"{CACHE_KEY_PREFIX}{base_key}*"
+            for raw_key in redis_conn.scan_iter(pattern, count=batch_size):
+                batch.append((base_key, raw_key))
+                if len(batch) >= batch_size:
+                    flush(redis_conn, batch)
+                    batch = []
+            if batch:
+                flush(redis_conn, batch)
+    return stats
+
+
+class Command(BaseCommand):
+    help = ("Report cache key-space cardinality and the share of keys "
+            "holding duplicate payloads.")
+
+    def handle(self, *args, **options):
+        stats = collect_key_stats([REDIS_KEY_PRODUCTS, REDIS_KEY_CATEGORIES])
+        for base_key, entry in stats.items():
+            keys = entry["keys"]
+            unique = len(entry["digests"])
+            duplicates = keys - unique
+            ratio = duplicates / keys if keys else 0.0
+            self.stdout.write(
+                f"{base_key}: keys={keys} unique_payloads={unique} "
+                f"duplicate_keys={duplicates} duplicate_ratio={ratio:.1%} "
+                f"compressed_variants={entry['variants']} "
+                f"bytes={entry['bytes']}")
@@ -0,0 +1,139 @@
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.api.constants.http import CACHE_STATUS_HEADER
+from apps.api.middleware.request_capture import get_capture_settings
+
+REPLAYABLE_METHODS = ("GET", "HEAD")
+
+
+def load_capture(paths):
+    records = []
+    for path in paths:
+        with open(path, encoding="utf-8") as capture:
+            for line in capture:
+                line = line.strip()
+                if line:
+                    records.append(json.loads(line))
+    records.sort(key=lambda record: record["ts"])
+    return records
+
+
+def build_url(base_url, record):
+    url = base_url.rstrip("/") + record["path"]
+    if record.get("query"):
+        url += "?" + urlencode(record["query"], doseq=True)
+    return url
+
+
+def replay_one(base_url, record, timeout):
+    request = Request(
+        build_url(base_url, record),
+        method=record["method"],
+        headers={"Accept": "application/json"},
+    )
+    start = time.perf_counter()
+    try:
+        with urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+            cache_status = response.headers.get(CACHE_STATUS_HEADER)
+    except HTTPError as e:
+        status = e.code
+        cache_status = e.headers.get(CACHE_STATUS_HEADER)
+    except URLError:
+        status = None
+        cache_status = None
+    return status, cache_status, time.perf_counter() - start
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = "Replay a request capture against a running server."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths", nargs="*",
+            help="Capture files to replay (defaults to REQUEST_CAPTURE['PATH']).")
+        parser.add_argument(
+            "--base-url", default="http://127.0.0.1:8000",
+            help="Server to replay against.")
+        parser.add_argument(
+            "--speed", type=float, default=1.0,
+            help="Replay speed multiplier; 0 replays as fast as possible.")
+        parser.add_argument(
+            "--concurrency", type=int, default=8,
+            help="Maximum number of in-flight requests.")
+        parser.add_argument(
+            "--timeout", type=float, default=10.0,
+            help="Per-request timeout in seconds.")
+
+    def handle(self, *args, **options):
+        paths = options["paths"] or [get_capture_settings()["PATH"]]
+        try:
+            records = load_capture(paths)
+        except FileNotFoundError as e:
+            raise CommandError(f"Capture file not found: {e.filename}")
+
+        # Only the body hash is captured, so writes cannot be reproduced.
+        replayable = [r for r in records if r["method"] in REPLAYABLE_METHODS]
+        skipped = len(records) - len(replayable)
+        if not replayable:
+            raise CommandError("No replayable requests in capture.")
+
+        speed = options["speed"]
+        results = []
+        lock = threading.Lock()
+
+        def run(record):
+            result = replay_one(options["base_url"], record, options["timeout"])
+            with lock:
+                results.append(result)
+
+        first_ts = replayable[0]["ts"]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            for record in replayable:
+                if speed > 0:
+                    delay = (record["ts"] - first_ts) / speed
+                    remaining = delay - (time.perf_counter() - started)
+                    if remaining > 0:
+                        time.sleep(remaining)
+                pool.submit(run, record)
+        elapsed = time.perf_counter() - started
+
+        latencies = [duration * 1000 for _, _, duration in results]
+        errors = sum(1 for status, _, _ in results
+                     if status is None or status >= 500)
+        hits = sum(1 for _, cache_status, _ in results
+                   if cache_status == "HIT")
+        misses = sum(1 for _, cache_status, _ in results
+                     if cache_status == "MISS")
+
+        self.stdout.write(f"Replayed {len(results)} requests "
+                          f"in {elapsed:.2f}s ({len(results) / elapsed:.1f} req/s), "
+                          f"skipped {skipped} non-replayable.")
+        self.stdout.write(f"Errors: {errors}")
+        self.stdout.write(
+            f"Latency ms: mean={statistics.fmean(latencies):.2f} "
+            f"p50={percentile(latencies, 0.50):.2f} "
+            f"p95={percentile(latencies, 0.95):.2f} "
+            f"p99={percentile(latencies, 0.99):.2f}")
+        if hits + misses:
+            self.stdout.write(
+                f"Cache hit ratio: {hits / (hits + misses):.1%} "
+                f"({hits} hits, {misses} misses)")
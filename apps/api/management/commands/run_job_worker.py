@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.api.utils.jobs import RedisJobQueue, get_job_queue
+
+
+class Command(BaseCommand):
+    help = ("Run background jobs from the Redis job queue until interrupted. "
+            "Requires JOB_QUEUE['BACKEND'] = 'redis'.")
+
+    def handle(self, *args, **options):
+        job_queue = get_job_queue()
+        if not isinstance(job_queue, RedisJobQueue):
+            raise CommandError(
+                "run_job_worker needs JOB_QUEUE['BACKEND'] = 'redis'; the "
+                f"'{job_queue.name}' backend runs jobs inside the web process.")
+        self.stdout.write("Waiting for jobs. Press CTRL+C to stop.")
+        try:
+            job_queue.work()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.api.utils.cache_warming import (
+    get_hot_targets, get_warming_settings, hot_targets_from_capture, warm_targets,
+)
+
+
+class Command(BaseCommand):
+    help = ("Precompute the hottest list pages, filter combinations and "
+            "detail entries into the cache.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "targets", nargs="*",
+            help="API paths to warm, e.g. '/api/v1/products/?page=2'. "
+                 "Defaults to CACHE_WARMING['TARGETS'].")
+        parser.add_argument(
+            "--from-capture", nargs="+", default=None, metavar="PATH",
+            help="Also warm the most requested paths in these request captures.")
+        parser.add_argument(
+            "--top", type=int, default=None,
+            help="Number of paths to take from the captures.")
+        parser.add_argument(
+            "--workers", type=int, default=None,
+            help="Number of threads computing entries in parallel.")
+        parser.add_argument(
+            "--base-url", default=None,
+            help="Scheme and host used in pagination links.")
+
+    def handle(self, *args, **options):
+        capture_paths, top = options["from_capture"], options["top"]
+        try:
+            if options["targets"]:
+                targets = list(options["targets"])
+                if capture_paths:
+                    targets += hot_targets_from_capture(
+                        capture_paths, top or get_warming_settings()["CAPTURE_TOP"])
+            else:
+                targets = get_hot_targets(capture_paths, top)
+        except FileNotFoundError as e:
+            raise CommandError(f"Capture file not found: {e.filename}")
+
+        started = time.perf_counter()
+        statuses, written = warm_targets(
+            list(dict.fromkeys(targets)), options["workers"], options["base_url"])
+        elapsed = time.perf_counter() - started
+
+        failed = {t: s for t, s in statuses.items() if s != 200}
+        for target, status_code in failed.items():
+            self.stderr.write(f"Failed to warm {target}: HTTP {status_code}")
+        self.stdout.write(
+            f"Warmed {len(statuses) - len(failed)}/{len(statuses)} targets, "
+            f"wrote {written} cache keys in {elapsed:.2f}s.")
@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+
+from apps.api.utils.compression import (
+    compress, get_compression_settings, get_variant_cache_key, is_compressible,
+    is_shared_rendering, negotiate_encoding,
+)
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with the best encoding the client accepts
+    (zstd, br or gzip, depending on installed codecs).
+
+    Responses carrying a ``cache_key`` attribute were served from, or just
+    written to, the response cache. Their compressed body is stored next to
+    the cache entry so later hits are served as-is by
+    ``get_cached_response`` without compressing again. Only the plain JSON
+    rendering is stored; the browsable API and parametrized media types such
+    as ``indent`` are compressed but never cached.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.streaming or not is_compressible(response):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if response.has_header("Content-Encoding"):
+            return response
+
+        encoding = negotiate_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        content = response.content
+        if encoding is None or len(content) < get_compression_settings()["MIN_SIZE"]:
+            return response
+
+        compressed = compress(content, encoding)
+        if len(compressed) >= len(content):
+            return response
+
+        # ``get_cached_response`` serves the variant to every JSON client,
+        # so only the plain JSON rendering is stored.
+        cache_key = getattr(response, "cache_key", None)
+        if (cache_key and response.status_code == 200 and is_shared_rendering(
+                getattr(response, "accepted_renderer", None),
+                getattr(response, "accepted_media_type", None))):
+            cache.set(get_variant_cache_key(cache_key, encoding), compressed)
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        # The compressed body is a different representation of the resource.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
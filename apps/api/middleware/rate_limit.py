@@ -0,0 +1,82 @@
+from django.http import JsonResponse
+from rest_framework import status
+
+from apps.api.constants.http import CACHE_STATUS_HEADER, CACHE_STATUS_MISS
+from apps.api.utils.rate_limit import (
+    consume_tokens, get_bucket_key, get_rate_limit_settings,
+)
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def get_client_id(request, config):
+    header = config["CLIENT_IP_HEADER"]
+    if header and request.META.get(header):
+        # e.g. X-Forwarded-For: client, proxy1, proxy2
+        return request.META[header].split(",")[0].strip()
+    return request.META.get("REMOTE_ADDR", "unknown")
+
+
+def charge_request(request, match):
+    """
+    Charge ``request`` to its client's bucket for the route of ``match``.
+    Returns a 429 response when the bucket is empty, else ``None``.
+    """
+    config = get_rate_limit_settings()
+    if not config["ENABLED"] or match is None or not match.view_name:
+        return None
+
+    bucket_key = get_bucket_key(
+        get_client_id(request, config), match.view_name)
+    if request.method in READ_METHODS:
+        cost = config["HIT_COST"]
+        request.rate_limit_bucket = bucket_key
+    else:
+        cost = config["WRITE_COST"]
+
+    allowed, retry_after = consume_tokens(bucket_key, cost)
+    if allowed:
+        return None
+
+    response = JsonResponse(
+        {
+            "success": False,
+            "message": "Too many requests, please slow down.",
+            "data": None,
+        },
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+    )
+    response["Retry-After"] = str(retry_after)
+    return response
+
+
+def charge_recompute(request, response):
+    """Top a read up to ``MISS_COST`` if ``response`` was recomputed."""
+    bucket_key = getattr(request, "rate_limit_bucket", None)
+    if bucket_key and response.get(CACHE_STATUS_HEADER) == CACHE_STATUS_MISS:
+        config = get_rate_limit_settings()
+        extra_cost = config["MISS_COST"] - config["HIT_COST"]
+        if extra_cost > 0:
+            consume_tokens(bucket_key, extra_cost, force=True)
+
+
+class RateLimitMiddleware:
+    """
+    Per-client, per-route token bucket rate limiting backed by Redis.
+
+    Reads are charged ``HIT_COST`` up front and topped up to ``MISS_COST``
+    once the response shows they were recomputed, so clients looping over
+    uncached query strings run out of tokens much sooner than clients
+    hitting the cache. Writes are charged ``WRITE_COST``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        charge_recompute(request, response)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        return charge_request(request, request.resolver_match)
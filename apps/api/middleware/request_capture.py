@@ -0,0 +1,96 @@
+import hashlib
+import json
+import logging
+import random
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from django.conf import settings
+
+from apps.api.constants.http import CACHE_STATUS_HEADER
+
+logger = logging.getLogger("apps.api.request_capture")
+logger.propagate = False
+
+
+def get_capture_settings():
+    return {
+        "ENABLED": False,
+        "SAMPLE_RATE": 1.0,
+        "PATH": Path(settings.BASE_DIR) / "captures" / "requests.jsonl",
+        "MAX_BYTES": 50 * 1024 * 1024,
+        "BACKUP_COUNT": 5,
+        **getattr(settings, "REQUEST_CAPTURE", {}),
+    }
+
+
+def get_capture_logger(config):
+    """Return the capture logger, (re)attaching a rotating file handler for
+    the configured path."""
+    path = Path(config["PATH"])
+    handler = logger.handlers[0] if logger.handlers else None
+    if handler is None or handler.baseFilename != str(path.resolve()):
+        if handler is not None:
+            logger.removeHandler(handler)
+            handler.close()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            path,
+            maxBytes=config["MAX_BYTES"],
+            backupCount=config["BACKUP_COUNT"],
+            encoding="utf-8",
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    return logger
+
+
+def build_capture_record(request, response, started_at, duration):
+    body = request.body if request.method not in ("GET", "HEAD") else b""
+    return {
+        "ts": round(started_at, 6),
+        "method": request.method,
+        "path": request.path,
+        "query": {key: request.GET.getlist(key) for key in request.GET},
+        "body_sha256": hashlib.sha256(body).hexdigest() if body else None,
+        "body_size": len(body),
+        "status": response.status_code,
+        "duration_ms": round(duration * 1000, 3),
+        "cache": response.get(CACHE_STATUS_HEADER, "").lower() or None,
+    }
+
+
+class RequestCaptureMiddleware:
+    """Record a sample of API requests to a rotating JSONL file.
+
+    Each line describes one request (method, path, query params, a hash of
+    the body, status, timing and cache hit/miss) so the capture can be
+    replayed later with ``manage.py replay_requests``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = get_capture_settings()
+        if not config["ENABLED"] or random.random() >= config["SAMPLE_RATE"]:
+            return self.get_response(request)
+
+        # Read the body up front; it is not available once the view has
+        # consumed the stream.
+        request.body
+        started_at = time.time()
+        start = time.perf_counter()
+        response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        try:
+            record = build_capture_record(
+                request, response, started_at, duration)
+            get_capture_logger(config).info(
+                json.dumps(record, separators=(",", ":")))
+        except Exception:
+            logging.getLogger(__name__).exception("Failed to capture request.")
+        return response
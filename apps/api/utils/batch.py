@@ -0,0 +1,197 @@
+"""
+Execution of ``/api/v1/batch/`` sub-requests.
+
+Sub-requests are resolved through the URL resolver and handed straight to
+their views; the middleware stack only runs once, for the batch itself,
+except for rate limiting which is charged per sub-request. Consecutive
+reads run concurrently, writes run one at a time in order and separate
+the reads before them from the reads after them. The cache entries of
+the leading reads are fetched with a single ``get_many``; reads after a
+write skip the cache, since the write's invalidation runs in the
+background.
+"""
+import contextvars
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from rest_framework import status
+
+from apps.api.middleware.rate_limit import charge_recompute, charge_request
+from apps.api.utils.exceptions import ApiException
+from apps.api.utils.internal_requests import (
+    build_internal_request, dispatch_internal_request, resolve_internal_request,
+)
+from apps.api.utils.util import prefetched_cache
+
+BATCH_METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE")
+BATCH_URL_NAME = "batch"
+# Sub-requests skip the middleware and CSRF checks, so only API views may
+# be reached through a batch.
+BATCH_PATH_PREFIX = "/api/v1/"
+
+# Sub-response headers worth passing back to the client.
+FORWARDED_HEADERS = ("X-Cache", "Location", "Retry-After", "ETag")
+
+
+def get_batch_settings():
+    return {
+        "MAX_REQUESTS": 20,
+        "WORKERS": 4,
+        **getattr(settings, "BATCH", {}),
+    }
+
+
+def parse_batch(data):
+    """Validate a batch payload into a list of ``(method, path, body)``."""
+    items = data.get("requests") if isinstance(data, dict) else data
+    if not isinstance(items, list) or not items:
+        raise ApiException(
+            message="Expected a non-empty list of requests.",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+    max_requests = get_batch_settings()["MAX_REQUESTS"]
+    if len(items) > max_requests:
+        raise ApiException(
+            message=f"A batch may contain at most {max_requests} requests.",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+
+    parsed = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            item = {}
+        method = str(item.get("method", "GET")).upper()
+        path = item.get("path")
+        if (method not in BATCH_METHODS or not isinstance(path, str)
+                or not path.startswith(BATCH_PATH_PREFIX)):
+            raise ApiException(
+                message=f"Request {index} needs a method in {', '.join(BATCH_METHODS)} "
+                        f"and a path under {BATCH_PATH_PREFIX}.",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+        parsed.append((method, path, item.get("body")))
+    return parsed
+
+
+def get_sub_response_data(response):
+    if hasattr(response, "data"):
+        body = response.data
+    elif response.get("Content-Type", "").startswith("application/json"):
+        body = json.loads(response.content)
+    else:
+        body = response.content.decode(response.charset or "utf-8")
+    return {
+        "status": response.status_code,
+        "headers": {name: response[name] for name in FORWARDED_HEADERS if response.has_header(name)},
+        "body": body,
+    }
+
+
+def not_found_data():
+    return {
+        "status": status.HTTP_404_NOT_FOUND,
+        "headers": {},
+        "body": {"success": False, "message": "Not found.", "data": None},
+    }
+
+
+class SubRequest:
+    def __init__(self, parent, method, path, body):
+        self.method = method
+        self.request = build_internal_request(
+            method, path, parent.META,
+            body=json.dumps(body).encode() if body is not None else b"",
+        )
+        # The batch request itself already went through CSRF checks.
+        self.request._dont_enforce_csrf_checks = True
+        self.match = resolve_internal_request(self.request)
+
+    @property
+    def is_read(self):
+        return self.method == "GET"
+
+    def cache_key(self):
+        """The view's cache key for this read, or ``None`` if it has none."""
+        if self.match is None or not self.is_read:
+            return None
+        view_class = getattr(self.match.func, "view_class", None)
+        cache_key_for = getattr(view_class, "cache_key_for", None)
+        if cache_key_for is None:
+            return None
+        try:
+            return cache_key_for(self.request.GET, *self.match.args, **self.match.kwargs)
+        except ApiException:
+            # Invalid parameters; the view reports them.
+            return None
+
+    def run(self):
+        if self.match is None:
+            return not_found_data()
+        limited = charge_request(self.request, self.match)
+        if limited is not None:
+            return get_sub_response_data(limited)
+        try:
+            response = dispatch_internal_request(self.request, self.match)
+        except Exception as e:
+            return {
+                "status": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "headers": {},
+                "body": {"success": False, "message": str(e), "data": None},
+            }
+        charge_recompute(self.request, response)
+        return get_sub_response_data(response)
+
+
+def _run_in_thread(context, sub_request):
+    try:
+        return context.run(sub_request.run)
+    finally:
+        # Pool threads open their own connection; don't leave it dangling.
+        connection.close()
+
+
+def run_reads(sub_requests, cached, workers):
+    """Run independent reads, answering cache lookups from ``cached``."""
+    with prefetched_cache(cached):
+        if workers <= 1 or len(sub_requests) <= 1:
+            return [sub_request.run() for sub_request in sub_requests]
+        # Each thread needs its own copy of this context to see the prefetch.
+        contexts = [contextvars.copy_context() for _ in sub_requests]
+        with ThreadPoolExecutor(max_workers=min(workers, len(sub_requests))) as pool:
+            return list(pool.map(_run_in_thread, contexts, sub_requests))
+
+
+def execute_batch(parent, items, workers=None):
+    """Run the parsed ``items`` of a batch and return their results in order."""
+    workers = workers or get_batch_settings()["WORKERS"]
+    sub_requests = [SubRequest(parent, method, path, body) for method, path, body in items]
+    if any(r.match is not None and r.match.url_name == BATCH_URL_NAME for r in sub_requests):
+        raise ApiException(
+            message="Batch requests cannot be nested.",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+
+    results = []
+    written = False
+    start = 0
+    while start < len(sub_requests):
+        if not sub_requests[start].is_read:
+            results.append(sub_requests[start].run())
+            written = True
+            start += 1
+            continue
+        end = start
+        while end < len(sub_requests) and sub_requests[end].is_read:
+            end += 1
+        reads = sub_requests[start:end]
+        cache_keys = {key for key in (r.cache_key() for r in reads) if key}
+        if written:
+            cached = dict.fromkeys(cache_keys)
+        else:
+            cached = {**dict.fromkeys(cache_keys), **cache.get_many(list(cache_keys))}
+        results.extend(run_reads(reads, cached, workers))
+        start = end
+    return results
@@ -0,0 +1,159 @@
+import json
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+
+from apps.api.constants.http import CACHE_STATUS_HEADER, CACHE_STATUS_MISS
+from apps.api.utils.compression import (
+    compress, get_available_encodings, get_compression_settings,
+    get_variant_cache_key,
+)
+from apps.api.utils.internal_requests import (
+    build_environ, build_internal_request, dispatch_internal_request,
+)
+from apps.api.utils.jobs import enqueue
+from apps.api.utils.util import defer_cache_writes, get_invalidation_generation
+
+SET_MANY_BATCH_SIZE = 500
+
+
+def get_warming_settings():
+    return {
+        "TARGETS": ["/api/v1/products/", "/api/v1/categories/"],
+        "CAPTURE_PATH": None,
+        "CAPTURE_TOP": 100,
+        "BASE_URL": "http://localhost:8000",
+        "WORKERS": 4,
+        "REWARM_ON_INVALIDATE": False,
+        **getattr(settings, "CACHE_WARMING", {}),
+    }
+
+
+def hot_targets_from_capture(paths, top):
+    """The ``top`` most requested successful GET paths in a request capture."""
+    counts = Counter()
+    for path in paths:
+        with open(path, encoding="utf-8") as capture:
+            for line in capture:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if record["method"] != "GET" or record.get("status") != 200:
+                    continue
+                query = urlencode(sorted(record.get("query", {}).items()),
+                                  doseq=True)
+                counts[record["path"] + (f"?{query}" if query else "")] += 1
+    return [target for target, _ in counts.most_common(top)]
+
+
+def get_hot_targets(capture_paths=None, top=None):
+    config = get_warming_settings()
+    targets = list(config["TARGETS"])
+    capture_paths = capture_paths or (
+        [config["CAPTURE_PATH"]] if config["CAPTURE_PATH"] else [])
+    if capture_paths:
+        targets += hot_targets_from_capture(
+            capture_paths, top or config["CAPTURE_TOP"])
+    return list(dict.fromkeys(targets))
+
+
+def compressed_variants(response):
+    """Precompressed bodies for every available encoding of a freshly
+    filled cache entry, keyed like ``CompressionMiddleware`` stores them."""
+    cache_key = getattr(response, "cache_key", None)
+    if cache_key is None or not hasattr(response, "render"):
+        return {}
+    content = response.render().content
+    if len(content) < get_compression_settings()["MIN_SIZE"]:
+        return {}
+    return {
+        get_variant_cache_key(cache_key, encoding): compress(content, encoding)
+        for encoding in get_available_encodings()
+    }
+
+
+def render_target(target, environ):
+    """Run the view for ``target`` and return ``(status, cache writes)``."""
+    request = build_internal_request("GET", target, environ)
+    with defer_cache_writes() as writes:
+        response = dispatch_internal_request(request)
+    if response is None:
+        return 404, {}
+    if response.get(CACHE_STATUS_HEADER) == CACHE_STATUS_MISS:
+        writes.update(compressed_variants(response))
+    return response.status_code, writes
+
+
+def _render_target_in_thread(target, environ):
+    try:
+        return render_target(target, environ)
+    finally:
+        # Pool threads open their own connection; don't leave it dangling.
+        connection.close()
+
+
+def warm_targets(targets, workers=None, base_url=None):
+    """
+    Recompute ``targets`` (API paths with query strings) and write the
+    results to the cache, including precompressed variants.
+
+    Targets are rendered by up to ``workers`` threads and the collected
+    entries are written with pipelined ``set_many`` calls. If a cache
+    invalidation runs meanwhile, the entries may predate the write behind
+    it and are dropped. Returns ``{target: status_code}`` and the number of
+    keys written.
+    """
+    config = get_warming_settings()
+    workers = workers or config["WORKERS"]
+    environ = build_environ(base_url or config["BASE_URL"])
+    generation = get_invalidation_generation()
+
+    if workers <= 1:
+        results = [render_target(target, environ) for target in targets]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(
+                lambda target: _render_target_in_thread(target, environ),
+                targets))
+
+    writes = {}
+    statuses = {}
+    for target, (status_code, target_writes) in zip(targets, results):
+        statuses[target] = status_code
+        writes.update(target_writes)
+
+    if get_invalidation_generation() != generation:
+        return statuses, 0
+    items = list(writes.items())
+    for start in range(0, len(items), SET_MANY_BATCH_SIZE):
+        cache.set_many(dict(items[start:start + SET_MANY_BATCH_SIZE]))
+    if get_invalidation_generation() != generation:
+        # The invalidation ran while writing and may have missed entries.
+        cache.delete_many(list(writes))
+        return statuses, 0
+    return statuses, len(writes)
+
+
+def rewarm_hot_targets():
+    warm_targets(get_hot_targets())
+
+
+def _start_rewarm():
+    enqueue(rewarm_hot_targets)
+
+
+def schedule_rewarm():
+    """
+    Queue a rewarm of the hot targets once the current transaction commits,
+    if ``CACHE_WARMING['REWARM_ON_INVALIDATE']`` is set.
+
+    Invalidations arriving while a rewarm is still queued share it. Targets
+    that are still cached are cache hits and cost little.
+    """
+    if get_warming_settings()["REWARM_ON_INVALIDATE"]:
+        transaction.on_commit(_start_rewarm)
@@ -0,0 +1,114 @@
+import gzip
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_CONTENT_TYPES = ("application/json", "text/")
+
+
+def get_compression_settings():
+    return {
+        "ENCODINGS": ["zstd", "br", "gzip"],
+        "MIN_SIZE": 512,
+        "GZIP_LEVEL": 6,
+        "BROTLI_QUALITY": 5,
+        "ZSTD_LEVEL": 3,
+        **getattr(settings, "RESPONSE_COMPRESSION", {}),
+    }
+
+
+def _compress_gzip(content, config):
+    # A fixed mtime keeps the output deterministic for identical bodies.
+    return gzip.compress(content, compresslevel=config["GZIP_LEVEL"], mtime=0)
+
+
+def _compress_brotli(content, config):
+    return brotli.compress(content, quality=config["BROTLI_QUALITY"])
+
+
+def _compress_zstd(content, config):
+    return zstandard.ZstdCompressor(level=config["ZSTD_LEVEL"]).compress(content)
+
+
+CODECS = {"gzip": _compress_gzip}
+if brotli is not None:
+    CODECS["br"] = _compress_brotli
+if zstandard is not None:
+    CODECS["zstd"] = _compress_zstd
+
+
+def get_available_encodings():
+    """Configured encodings that have a codec installed, in server
+    preference order."""
+    return [e for e in get_compression_settings()["ENCODINGS"] if e in CODECS]
+
+
+def negotiate_encoding(accept_encoding):
+    """
+    Pick the content-encoding to use for an ``Accept-Encoding`` header.
+
+    The client's q-values win; ties are broken by the server preference in
+    ``RESPONSE_COMPRESSION['ENCODINGS']``. Returns ``None`` when the response
+    should be sent uncompressed.
+    """
+    if not accept_encoding:
+        return None
+
+    qualities = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in get_available_encodings():
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(content, encoding):
+    return CODECS[encoding](content, get_compression_settings())
+
+
+def is_compressible(response):
+    content_type = response.get("Content-Type", "")
+    return content_type.startswith(COMPRESSIBLE_CONTENT_TYPES)
+
+
+def is_shared_rendering(renderer, media_type):
+    """
+    Whether a body negotiated as ``renderer`` and ``media_type`` is the one
+    every JSON client gets, and so may be stored or served as a variant.
+    Media type parameters such as ``indent`` change the body.
+    """
+    return (getattr(renderer, "format", None) == "json"
+            and media_type == renderer.media_type)
+
+
+def get_variant_cache_key(cache_key, encoding):
+    """Cache key of the precompressed body for ``cache_key``.
+
+    Variants share the prefix of the entry they were built from, so pattern
+    invalidation of that entry removes them too.
+    """
+    return f"{cache_key}#{encoding}"
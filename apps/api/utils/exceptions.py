@@ -1,4 +1,5 @@
 class ApiException (Exception):
-    def __init__(self, message, status_code=400):
+    def __init__(self, message, status_code=400, data=None):
         self.message = message
-        self.status_code = status_code
\ No newline at end of file
+        self.status_code = status_code
+        self.data = data
@@ -0,0 +1,71 @@
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.urls import Resolver404, resolve
+
+# Request headers that describe the parent request's body or transport and
+# must not leak into internally dispatched requests.
+STRIPPED_ENVIRON_KEYS = (
+    "CONTENT_LENGTH", "CONTENT_TYPE", "HTTP_ACCEPT_ENCODING",
+    "HTTP_CONTENT_ENCODING", "HTTP_IF_MATCH", "HTTP_IF_NONE_MATCH",
+)
+
+
+def build_environ(base_url):
+    """Minimal WSGI environ for internal requests addressed to ``base_url``."""
+    url = urlsplit(base_url)
+    default_port = "443" if url.scheme == "https" else "80"
+    return {
+        "SERVER_NAME": url.hostname or "localhost",
+        "SERVER_PORT": str(url.port or default_port),
+        "HTTP_HOST": url.netloc or "localhost",
+        "wsgi.url_scheme": url.scheme or "http",
+        "REMOTE_ADDR": "127.0.0.1",
+        "SCRIPT_NAME": "",
+    }
+
+
+def build_internal_request(method, path, base_environ, body=b"",
+                           content_type="application/json"):
+    """
+    Build a ``WSGIRequest`` for ``path`` (which may carry a query string)
+    that can be handed straight to a view, without a round trip through the
+    WSGI handler and middleware.
+    """
+    url = urlsplit(path)
+    environ = {
+        key: value for key, value in base_environ.items()
+        if key not in STRIPPED_ENVIRON_KEYS
+    }
+    environ.update({
+        "REQUEST_METHOD": method.upper(),
+        "PATH_INFO": url.path,
+        "QUERY_STRING": url.query,
+        "HTTP_ACCEPT": "application/json",
+        "wsgi.input": BytesIO(body),
+    })
+    if body:
+        environ["CONTENT_LENGTH"] = str(len(body))
+        environ["CONTENT_TYPE"] = content_type
+    return WSGIRequest(environ)
+
+
+def resolve_internal_request(request):
+    """Return the ``ResolverMatch`` for ``request``, or ``None`` if no route
+    matches."""
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return None
+    request.resolver_match = match
+    return match
+
+
+def dispatch_internal_request(request, match=None):
+    """Call the view matching ``request`` and return its response, or
+    ``None`` if no route matches."""
+    match = match or resolve_internal_request(request)
+    if match is None:
+        return None
+    return match.func(request, *match.args, **match.kwargs)
@@ -0,0 +1,337 @@
+"""
+Background jobs for work that should not hold up a response, such as
+cache invalidation, rewarming and chunked category deletion.
+
+A job is a dotted path to a module-level function plus JSON-serializable
+arguments. Identical pending jobs are deduplicated, a failing job is
+retried up to ``MAX_RETRIES`` times, and queue depth and counters are
+reported by ``get_queue_stats()``.
+
+``JOB_QUEUE['BACKEND']`` selects where jobs wait:
+
+- ``thread``: an in-process queue drained by ``WORKERS`` daemon threads.
+  It needs no external service. Pending jobs are lost when the process
+  exits.
+- ``redis``: a Redis list shared by all processes. Each process drains it
+  with ``WORKERS`` threads, and ``manage.py run_job_worker`` can drain it
+  from a dedicated process.
+- ``inline``: runs each job immediately in the caller. Used by the tests
+  (see ``ApiTestCase``).
+"""
+import json
+import logging
+import queue
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import connection, transaction
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
+
+from apps.api.constants.redis import REDIS_KEY_JOBS
+
+logger = logging.getLogger(__name__)
+
+STAT_NAMES = ("enqueued", "deduplicated", "succeeded", "retried", "failed")
+
+# Push the job unless an identical one is already pending.
+ENQUEUE_SCRIPT = """
+if redis.call('SADD', KEYS[2], ARGV[1]) == 0 then
+    redis.call('HINCRBY', KEYS[3], 'deduplicated', 1)
+    return 0
+end
+redis.call('LPUSH', KEYS[1], ARGV[2])
+if ARGV[3] ~= '' then
+    redis.call('HINCRBY', KEYS[3], ARGV[3], 1)
+end
+return 1
+"""
+
+
+def get_job_settings():
+    return {
+        "BACKEND": "thread",
+        "WORKERS": 2,
+        "MAX_RETRIES": 3,
+        "RETRY_DELAY": 1.0,
+        "POLL_TIMEOUT": 1,
+        **getattr(settings, "JOB_QUEUE", {}),
+    }
+
+
+def get_job_key(func, args):
+    """Identity of a job, used both as its payload and for deduplication."""
+    path = func if isinstance(func, str) else f"{func.__module__}.{func.__qualname__}"
+    return json.dumps([path, list(args)], separators=(",", ":"))
+
+
+class BaseJobQueue(ABC):
+    name = None
+
+    def __init__(self, config):
+        self.config = config
+
+    @abstractmethod
+    def enqueue(self, job_key):
+        """Queue ``job_key``; returns False if it was already pending."""
+
+    @abstractmethod
+    def retry(self, job_key, attempt):
+        """Run ``job_key`` again as attempt number ``attempt``."""
+
+    def depth(self):
+        return 0
+
+    @abstractmethod
+    def counters(self):
+        """The ``STAT_NAMES`` counters, by name."""
+
+    @abstractmethod
+    def incr(self, stat):
+        """Add one to the ``stat`` counter."""
+
+    def stats(self):
+        return {"backend": self.name, "depth": self.depth(), **self.counters()}
+
+    def execute(self, job_key, attempt=0):
+        path, args = json.loads(job_key)
+        try:
+            import_string(path)(*args)
+        except Exception:
+            if attempt < self.config["MAX_RETRIES"]:
+                logger.warning("Job %s failed, retrying.", path, exc_info=True)
+                self.incr("retried")
+                self.retry(job_key, attempt + 1)
+            else:
+                logger.exception("Job %s failed after %d attempts.", path, attempt + 1)
+                self.incr("failed")
+        else:
+            self.incr("succeeded")
+
+
+class InlineJobQueue(BaseJobQueue):
+    name = "inline"
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._stats = Counter()
+
+    def enqueue(self, job_key):
+        self.incr("enqueued")
+        self.execute(job_key)
+        return True
+
+    def retry(self, job_key, attempt):
+        self.execute(job_key, attempt)
+
+    def counters(self):
+        return {stat: self._stats[stat] for stat in STAT_NAMES}
+
+    def incr(self, stat):
+        self._stats[stat] += 1
+
+
+class ThreadJobQueue(BaseJobQueue):
+    name = "thread"
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._stats = Counter()
+        self._workers = []
+
+    def _put(self, job_key, attempt, stat=None):
+        with self._lock:
+            if job_key in self._pending:
+                self._stats["deduplicated"] += 1
+                return False
+            self._pending.add(job_key)
+            if stat:
+                self._stats[stat] += 1
+            if not self._workers:
+                self._start_workers()
+        self._queue.put((job_key, attempt))
+        return True
+
+    def _start_workers(self):
+        for i in range(self.config["WORKERS"]):
+            worker = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _work(self):
+        while True:
+            job_key, attempt = self._queue.get()
+            # Jobs enqueued from now on must run again: they may depend on
+            # writes this run does not see.
+            with self._lock:
+                self._pending.discard(job_key)
+            try:
+                self.execute(job_key, attempt)
+            finally:
+                connection.close()
+                self._queue.task_done()
+
+    def enqueue(self, job_key):
+        return self._put(job_key, 0, "enqueued")
+
+    def retry(self, job_key, attempt):
+        timer = threading.Timer(
+            self.config["RETRY_DELAY"], self._put, (job_key, attempt))
+        timer.daemon = True
+        timer.start()
+
+    def join(self):
+        """Block until every queued job has run."""
+        self._queue.join()
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def counters(self):
+        with self._lock:
+            return {stat: self._stats[stat] for stat in STAT_NAMES}
+
+    def incr(self, stat):
+        with self._lock:
+            self._stats[stat] += 1
+
+
+class RedisJobQueue(BaseJobQueue):
+    name = "redis"
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.queue_key = f"{REDIS_KEY_JOBS}:queue"
+        self.pending_key = f"{REDIS_KEY_JOBS}:pending"
+        self.stats_key = f"{REDIS_KEY_JOBS}:stats"
+        self._lock = threading.Lock()
+        self._workers = []
+        self._script = None
+
+    @property
+    def redis(self):
+        return get_redis_connection()
+
+    def _push(self, job_key, attempt, stat=None):
+        if self._script is None:
+            self._script = self.redis.register_script(ENQUEUE_SCRIPT)
+        payload = json.dumps({"job": job_key, "attempt": attempt})
+        pushed = bool(self._script(
+            keys=[self.queue_key, self.pending_key, self.stats_key],
+            args=[job_key, payload, stat or ""]))
+        with self._lock:
+            if pushed and not self._workers and self.config["WORKERS"]:
+                self._start_workers()
+        return pushed
+
+    def _start_workers(self):
+        for i in range(self.config["WORKERS"]):
+            worker = threading.Thread(target=self.work, name=f"job-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def enqueue(self, job_key):
+        try:
+            return self._push(job_key, 0, "enqueued")
+        except RedisError:
+            # Don't lose the work when Redis is unavailable.
+            logger.warning("Job queue unavailable, running job inline.", exc_info=True)
+            self.execute(job_key)
+            return True
+
+    def retry(self, job_key, attempt):
+        def push():
+            try:
+                self._push(job_key, attempt)
+            except RedisError:
+                logger.exception("Could not requeue job %s.", job_key)
+
+        timer = threading.Timer(self.config["RETRY_DELAY"], push)
+        timer.daemon = True
+        timer.start()
+
+    def run_one(self, timeout=None):
+        """Run the next job, waiting up to ``timeout`` seconds for one.
+        Returns False if none arrived."""
+        item = self.redis.brpop(
+            self.queue_key, timeout=timeout or self.config["POLL_TIMEOUT"])
+        if item is None:
+            return False
+        message = json.loads(item[1])
+        self.redis.srem(self.pending_key, message["job"])
+        try:
+            self.execute(message["job"], message["attempt"])
+        finally:
+            connection.close()
+        return True
+
+    def work(self, stop_event=None):
+        while stop_event is None or not stop_event.is_set():
+            try:
+                self.run_one()
+            except RedisError:
+                logger.exception("Job worker lost its Redis connection.")
+                (stop_event or threading.Event()).wait(self.config["POLL_TIMEOUT"])
+
+    def depth(self):
+        return self.redis.llen(self.queue_key)
+
+    def counters(self):
+        values = self.redis.hgetall(self.stats_key)
+        return {stat: int(values.get(stat.encode(), 0)) for stat in STAT_NAMES}
+
+    def incr(self, stat):
+        try:
+            self.redis.hincrby(self.stats_key, stat, 1)
+        except RedisError:
+            pass
+
+
+BACKENDS = {
+    "inline": InlineJobQueue,
+    "thread": ThreadJobQueue,
+    "redis": RedisJobQueue,
+}
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            config = get_job_settings()
+            _job_queue = BACKENDS[config["BACKEND"]](config)
+        return _job_queue
+
+
+@receiver(setting_changed)
+def reset_job_queue(setting, **kwargs):
+    global _job_queue
+    if setting == "JOB_QUEUE":
+        with _job_queue_lock:
+            _job_queue = None
+
+
+def enqueue(func, *args):
+    """Queue ``func(*args)``; returns False if an identical job is pending."""
+    return get_job_queue().enqueue(get_job_key(func, args))
+
+
+def enqueue_on_commit(func, *args):
+    """Queue ``func(*args)`` once the current transaction commits, so the job
+    sees the committed data and is dropped on rollback."""
+    transaction.on_commit(lambda: enqueue(func, *args))
+
+
+def get_queue_stats():
+    return get_job_queue().stats()
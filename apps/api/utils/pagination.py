@@ -0,0 +1,39 @@
+from urllib.parse import urlencode
+
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CanonicalPageNumberPagination(PageNumberPagination):
+    """
+    Page number pagination whose next/previous links are built from the
+    canonical query parameters instead of the raw query string.
+
+    Equivalent query strings share one cache entry, so the links stored in
+    it must not depend on which of them filled the cache.
+    """
+
+    def __init__(self, canonical_params=None):
+        self.canonical_params = canonical_params or {}
+
+    def get_base_url(self):
+        url = self.request.build_absolute_uri(self.request.path)
+        if self.canonical_params:
+            url += "?" + urlencode(self.canonical_params)
+        return url
+
+    def get_next_link(self):
+        if not self.page.has_next():
+            return None
+        page_number = self.page.next_page_number()
+        return replace_query_param(
+            self.get_base_url(), self.page_query_param, page_number)
+
+    def get_previous_link(self):
+        if not self.page.has_previous():
+            return None
+        url = self.get_base_url()
+        page_number = self.page.previous_page_number()
+        if page_number == 1:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, page_number)
@@ -0,0 +1,159 @@
+import logging
+import math
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django_redis import get_redis_connection
+from redis.commands.core import Script
+from redis.exceptions import RedisError
+from rest_framework import status
+
+from apps.api.constants.redis import REDIS_KEY_RATE_LIMIT, REDIS_KEY_RECOMPUTE_SLOTS
+from apps.api.utils.exceptions import ApiException
+
+logger = logging.getLogger(__name__)
+
+# Refill the bucket for the time elapsed since the last call, then take
+# `cost` tokens if there are enough of them. With `force` the tokens are
+# taken regardless, which lets post-hoc charges push the bucket into debt.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local force = tonumber(ARGV[4])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+if tokens >= cost or force == 1 then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+# Slots older than the TTL belong to crashed workers and are reclaimed.
+ACQUIRE_SLOT_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local ttl = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - ttl)
+if redis.call('ZCARD', KEYS[1]) >= limit then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now, ARGV[3])
+redis.call('EXPIRE', KEYS[1], math.ceil(ttl) + 1)
+return 1
+"""
+
+
+# Built once, so the SHA1 of each source isn't recomputed per request. The
+# client is passed on every call; the cache connection changes with the
+# settings.
+TOKEN_BUCKET = Script(None, TOKEN_BUCKET_SCRIPT.encode())
+ACQUIRE_SLOT = Script(None, ACQUIRE_SLOT_SCRIPT.encode())
+
+
+def get_rate_limit_settings():
+    return {
+        "ENABLED": True,
+        "CAPACITY": 100,
+        "REFILL_RATE": 20,
+        "HIT_COST": 1,
+        "MISS_COST": 5,
+        "WRITE_COST": 5,
+        "CLIENT_IP_HEADER": None,
+        "MAX_CONCURRENT_RECOMPUTES": 0,
+        "RECOMPUTE_SLOT_TTL": 30,
+        **getattr(settings, "RATE_LIMIT", {}),
+    }
+
+
+def _run_script(script, keys, args):
+    return script(keys=keys, args=args, client=get_redis_connection())
+
+
+def get_bucket_key(client, route):
+    return f"{REDIS_KEY_RATE_LIMIT}:{client}:{route}"
+
+
+def consume_tokens(bucket_key, cost, force=False):
+    """
+    Take ``cost`` tokens from a bucket atomically.
+
+    Returns ``(allowed, retry_after)`` where ``retry_after`` is the number of
+    seconds until the request would be allowed. Redis errors fail open.
+    """
+    config = get_rate_limit_settings()
+    try:
+        allowed, tokens = _run_script(
+            TOKEN_BUCKET,
+            keys=[bucket_key],
+            args=[config["CAPACITY"], config["REFILL_RATE"], cost, int(force)],
+        )
+    except RedisError:
+        logger.warning("Rate limiter unavailable, allowing request.",
+                       exc_info=True)
+        return True, 0
+
+    if allowed:
+        return True, 0
+    missing = cost - float(tokens)
+    return False, max(1, math.ceil(missing / config["REFILL_RATE"]))
+
+
+@contextmanager
+def recompute_slot():
+    """
+    Hold one of ``RATE_LIMIT['MAX_CONCURRENT_RECOMPUTES']`` global slots
+    while recomputing a cache miss.
+
+    Raises ``ApiException`` (503) when every slot is taken, shedding load
+    instead of queueing more work on the database. A limit of 0 disables
+    the cap.
+    """
+    config = get_rate_limit_settings()
+    limit = config["MAX_CONCURRENT_RECOMPUTES"]
+    token = uuid.uuid4().hex
+    acquired = False
+
+    if limit:
+        try:
+            acquired = bool(_run_script(
+                ACQUIRE_SLOT,
+                keys=[REDIS_KEY_RECOMPUTE_SLOTS],
+                args=[limit, config["RECOMPUTE_SLOT_TTL"], token],
+            ))
+        except RedisError:
+            logger.warning("Recompute limiter unavailable, allowing request.",
+                           exc_info=True)
+        else:
+            if not acquired:
+                raise ApiException(
+                    message="Server is busy, please retry shortly.",
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                )
+
+    try:
+        yield
+    finally:
+        if acquired:
+            try:
+                get_redis_connection().zrem(REDIS_KEY_RECOMPUTE_SLOTS, token)
+            except RedisError:
+                logger.warning("Failed to release recompute slot.",
+                               exc_info=True)
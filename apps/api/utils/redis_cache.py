@@ -0,0 +1,211 @@
+"""
+Sharded Redis cache client, compact serializer and compressor for
+django-redis.
+
+With ``ShardedRedisClient`` as ``CLIENT_CLASS``, ``LOCATION`` may list
+several Redis nodes. Cache entries are spread over them by a consistent
+hash ring, so adding or removing a node only moves the keys on the arcs it
+gains or loses, about 1/n of them. A ``{tag}`` in a key hashes only the
+tag, which keeps related keys on one node. Multi-key calls send one
+command per node instead of one per key. Pattern deletes scan every node.
+
+``get_redis_connection()`` returns the first node. The rate limiter, job
+queue, price index and snapshot keep their counters, queues and
+Lua-managed keys there, since those need to live on a single node.
+
+``MsgpackSerializer`` and ``ZstdCompressor`` replace pickle and store
+cached pages in a fraction of the space. Values the serializer can't read,
+such as entries written by the previous serializer, count as misses.
+"""
+import hashlib
+import logging
+import threading
+from bisect import bisect
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+
+import msgpack
+import zstandard
+from django.core.cache import caches
+from django_redis import get_redis_connection
+from django_redis.client import DefaultClient, ShardClient
+from django_redis.client.default import DEFAULT_TIMEOUT
+from django_redis.compressors.base import BaseCompressor
+from django_redis.exceptions import CompressorError
+from django_redis.serializers.base import BaseSerializer
+
+logger = logging.getLogger(__name__)
+
+# Errors a serializer raises for data it can't read.
+UNREADABLE_ERRORS = (ValueError, TypeError, msgpack.UnpackException)
+
+
+def _hash(value):
+    return int.from_bytes(
+        hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class ConsistentHashRing:
+    """Maps keys to nodes, each node owning ``replicas`` points on the ring."""
+
+    def __init__(self, nodes, replicas=160):
+        points = sorted(
+            (_hash(f"{node}#{i}"), node) for node in nodes for i in range(replicas))
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def get_node(self, key):
+        return self._nodes[bisect(self._hashes, _hash(key)) % len(self._hashes)]
+
+
+class ShardedRedisClient(ShardClient):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._ring = ConsistentHashRing(
+            self._server, self._options.get("REPLICAS", 160))
+
+    def get_client(self, write=True, tried=None, show_index=False):
+        client = self._serverdict[self._server[0]]
+        return (client, 0) if show_index else client
+
+    def get_nodes(self):
+        return list(self._serverdict.values())
+
+    def group_by_node(self, keys, version=None):
+        """Map each node to the ``(key, cache key)`` pairs it holds."""
+        groups = defaultdict(list)
+        for key in keys:
+            cache_key = self.make_key(key, version=version)
+            groups[self.get_server_name(cache_key)].append((key, cache_key))
+        return groups
+
+    def get_many(self, keys, version=None):
+        found = {}
+        for name, pairs in self.group_by_node(keys, version).items():
+            values = self._serverdict[name].mget([key for _, key in pairs])
+            for (key, _), value in zip(pairs, values):
+                if value is not None:
+                    value = self.decode(value)
+                if value is not None:
+                    found[key] = value
+        return found
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        for name, pairs in self.group_by_node(data, version).items():
+            pipeline = self._serverdict[name].pipeline(transaction=False)
+            for key, cache_key in pairs:
+                DefaultClient.set(self, cache_key, data[key], timeout, client=pipeline)
+            pipeline.execute()
+
+    def delete_many(self, keys, version=None):
+        return sum(
+            self._serverdict[name].delete(*(key for _, key in pairs))
+            for name, pairs in self.group_by_node(keys, version).items()
+        )
+
+    def delete_pattern(self, pattern, version=None, prefix=None, client=None,
+                       itersize=None):
+        pattern = self.make_pattern(pattern, version=version, prefix=prefix)
+        deleted = 0
+        for node in self.get_nodes():
+            pipeline = node.pipeline(transaction=False)
+            for key in node.scan_iter(match=pattern, count=itersize):
+                pipeline.delete(key)
+            deleted += sum(pipeline.execute())
+        return deleted
+
+    def iter_keys(self, search, itersize=None, client=None, version=None):
+        pattern = self.make_pattern(search, version=version)
+        for node in self.get_nodes():
+            for key in node.scan_iter(match=pattern, count=itersize):
+                yield self.reverse_key(key.decode())
+
+    def keys(self, search, version=None):
+        return list(self.iter_keys(search, version=version))
+
+    def decode(self, value):
+        try:
+            return super().decode(value)
+        except UNREADABLE_ERRORS as e:
+            logger.warning("Unreadable cache value, treating it as a miss: %r", e)
+            return None
+
+
+def get_cache_nodes(alias="default"):
+    """The raw Redis clients of every node of the cache ``alias``."""
+    get_nodes = getattr(caches[alias].client, "get_nodes", None)
+    return get_nodes() if get_nodes else [get_redis_connection(alias)]
+
+
+# Extension type codes for values msgpack has no type for.
+EXT_DECIMAL = 1
+EXT_DATETIME = 2
+EXT_DATE = 3
+
+
+def _pack_default(value):
+    if isinstance(value, Decimal):
+        return msgpack.ExtType(EXT_DECIMAL, str(value).encode())
+    if isinstance(value, datetime):
+        return msgpack.ExtType(EXT_DATETIME, value.isoformat().encode())
+    if isinstance(value, date):
+        return msgpack.ExtType(EXT_DATE, value.isoformat().encode())
+    raise TypeError(f"Cannot serialize {type(value).__name__} to the cache.")
+
+
+def _unpack_ext(code, data):
+    if code == EXT_DECIMAL:
+        return Decimal(data.decode())
+    if code == EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == EXT_DATE:
+        return date.fromisoformat(data.decode())
+    return msgpack.ExtType(code, data)
+
+
+class MsgpackSerializer(BaseSerializer):
+    """
+    msgpack, with Decimal and datetime values kept as such. Tuples come back
+    as lists.
+    """
+
+    def dumps(self, value):
+        return msgpack.packb(value, default=_pack_default, use_bin_type=True)
+
+    def loads(self, value):
+        return msgpack.unpackb(value, ext_hook=_unpack_ext, raw=False)
+
+
+class ZstdCompressor(BaseCompressor):
+    """
+    zstd at ``OPTIONS['ZSTD_LEVEL']`` for values over ``ZSTD_MIN_LENGTH``
+    bytes. Values that don't shrink, such as precompressed response
+    bodies, are stored as they are.
+    """
+
+    def __init__(self, options):
+        super().__init__(options)
+        self.level = options.get("ZSTD_LEVEL", 3)
+        self.min_length = options.get("ZSTD_MIN_LENGTH", 256)
+        # zstandard contexts must not be shared between threads.
+        self._local = threading.local()
+
+    def _contexts(self):
+        local = self._local
+        if not hasattr(local, "compressor"):
+            local.compressor = zstandard.ZstdCompressor(level=self.level)
+            local.decompressor = zstandard.ZstdDecompressor()
+        return local.compressor, local.decompressor
+
+    def compress(self, value):
+        if len(value) <= self.min_length:
+            return value
+        compressed = self._contexts()[0].compress(value)
+        return compressed if len(compressed) < len(value) else value
+
+    def decompress(self, value):
+        try:
+            return self._contexts()[1].decompress(value)
+        except zstandard.ZstdError as e:
+            raise CompressorError(e)
@@ -0,0 +1,233 @@
+"""
+Cached list and detail views shared by the API resources.
+
+A resource is configured with its queryset, serializer, filterset and
+cache prefix; the base classes own cache key building, lookup, fill,
+invalidation on writes and pagination, so every resource gets the same
+fast path. Messages use ``item_name``/``plural_name``, which default to
+the model's verbose names.
+"""
+from rest_framework import status
+from rest_framework.views import APIView
+
+from apps.api.constants.http import CACHE_STATUS_HEADER, CACHE_STATUS_MISS
+from apps.api.utils.exceptions import ApiException
+from apps.api.utils.pagination import CanonicalPageNumberPagination
+from apps.api.utils.rate_limit import recompute_slot
+from apps.api.utils.response_formatter import format_response
+from apps.api.utils.util import (
+    canonicalize_query_params, get_cache_key, get_cached_response,
+    invalidate_cache, set_cached_data)
+
+
+def get_or_fill_cached_response(request, cache_key, build_response):
+    """
+    Return the cached response for ``cache_key``, or build it with
+    ``build_response()`` inside a recompute slot and cache its data.
+    """
+    cached_response = get_cached_response(request, cache_key)
+    if cached_response:
+        return cached_response
+
+    with recompute_slot():
+        response = build_response()
+        set_cached_data(cache_key, response.data)
+        response[CACHE_STATUS_HEADER] = CACHE_STATUS_MISS
+        response.cache_key = cache_key
+        return response
+
+
+def error_response(e):
+    """The error response for an exception raised while handling a request:
+    an ``ApiException`` keeps its status and data, anything else is a 500."""
+    if isinstance(e, ApiException):
+        return format_response(
+            success=False,
+            message=e.message,
+            data=e.data,
+            status_code=e.status_code,
+        )
+    return format_response(
+        success=False,
+        message=str(e),
+        data=None,
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+    )
+
+
+class CachedResourceMixin:
+    queryset = None
+    serializer_class = None
+    cache_prefix = None
+    # Prefixes of other resources derived from this one, invalidated with it.
+    dependent_cache_prefixes = ()
+    item_name = None
+    plural_name = None
+
+    def get_queryset(self):
+        return self.queryset.all()
+
+    @classmethod
+    def get_names(cls):
+        meta = cls.queryset.model._meta
+        return (cls.item_name or str(meta.verbose_name).capitalize(),
+                cls.plural_name or str(meta.verbose_name_plural).capitalize())
+
+    def invalidate(self):
+        invalidate_cache(*(
+            f"{prefix}*"
+            for prefix in (self.cache_prefix, *self.dependent_cache_prefixes)
+        ))
+
+    def error_response(self, e):
+        if isinstance(e, self.queryset.model.DoesNotExist):
+            e = ApiException(
+                message=f"{self.get_names()[0]} not found.",
+                status_code=status.HTTP_404_NOT_FOUND,
+            )
+        return error_response(e)
+
+    def save_serializer(self, serializer, message, status_code):
+        if serializer.is_valid():
+            serializer.save()
+            self.invalidate()
+            return format_response(
+                success=True,
+                message=message,
+                data=serializer.data,
+                status_code=status_code,
+            )
+        return format_response(
+            success=False,
+            message="Validation error occurred.",
+            data=serializer.errors,
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+
+
+class CachedListView(CachedResourceMixin, APIView):
+    filterset_class = None
+    pagination_class = CanonicalPageNumberPagination
+    page_size = 10
+
+    @classmethod
+    def get_canonical_params(cls, query_params):
+        return canonicalize_query_params(query_params, cls.filterset_class)
+
+    @classmethod
+    def cache_key_for(cls, query_params):
+        return get_cache_key(
+            cls.cache_prefix, cls.get_canonical_params(query_params))
+
+    def get_filterset(self, request):
+        filterset = self.filterset_class(
+            request.query_params, queryset=self.get_queryset())
+        if not filterset.is_valid():
+            raise ApiException(
+                message="Invalid filter parameters.",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+        return filterset
+
+    def filter_queryset(self, request):
+        """The items to paginate: a queryset, or any sequence supporting
+        ``count()`` and slicing."""
+        return self.get_filterset(request).qs
+
+    def paginate(self, request, queryset, canonical_params):
+        paginator = self.pagination_class(canonical_params)
+        paginator.page_size = self.page_size
+        try:
+            page = paginator.paginate_queryset(queryset, request)
+        except Exception as e:
+            raise ApiException(
+                message=str(e),
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = self.serializer_class(page, many=True)
+        return paginator.get_paginated_response(serializer.data).data
+
+    def build_list_response(self, request, canonical_params):
+        paginator_data = self.paginate(
+            request, self.filter_queryset(request), canonical_params)
+        response = format_response(
+            success=True,
+            message=f"{self.get_names()[1]} retrieved successfully.",
+            data=paginator_data['results'],
+            status_code=status.HTTP_200_OK,
+        )
+        response.data.update({
+            "count": paginator_data['count'],
+            "next": paginator_data['next'],
+            "previous": paginator_data['previous'],
+        })
+        return response
+
+    def get(self, request):
+        try:
+            canonical_params = self.get_canonical_params(request.query_params)
+            cache_key = get_cache_key(self.cache_prefix, canonical_params)
+            return get_or_fill_cached_response(
+                request, cache_key,
+                lambda: self.build_list_response(request, canonical_params))
+        except Exception as e:
+            return self.error_response(e)
+
+    def post(self, request):
+        try:
+            return self.save_serializer(
+                self.serializer_class(data=request.data),
+                f"{self.get_names()[0]} created successfully.",
+                status.HTTP_201_CREATED,
+            )
+        except Exception as e:
+            return self.error_response(e)
+
+
+class CachedDetailView(CachedResourceMixin, APIView):
+    @classmethod
+    def cache_key_for(cls, query_params, id):
+        return get_cache_key(cls.cache_prefix, {"id": id})
+
+    def get_object(self, id):
+        return self.get_queryset().get(id=id)
+
+    def build_detail_response(self, id):
+        serializer = self.serializer_class(self.get_object(id))
+        return format_response(
+            success=True,
+            message=f"{self.get_names()[0]} retrieved successfully.",
+            data=serializer.data,
+            status_code=status.HTTP_200_OK,
+        )
+
+    def get(self, request, id):
+        try:
+            cache_key = self.cache_key_for(request.query_params, id)
+            return get_or_fill_cached_response(
+                request, cache_key, lambda: self.build_detail_response(id))
+        except Exception as e:
+            return self.error_response(e)
+
+    def put(self, request, id):
+        try:
+            return self.save_serializer(
+                self.serializer_class(self.get_object(id), data=request.data),
+                f"{self.get_names()[0]} updated successfully.",
+                status.HTTP_200_OK,
+            )
+        except Exception as e:
+            return self.error_response(e)
+
+    def delete(self, request, id):
+        try:
+            self.get_object(id).delete()
+            self.invalidate()
+            return format_response(
+                success=True,
+                message=f"{self.get_names()[0]} deleted successfully.",
+                data=None,
+                status_code=status.HTTP_204_NO_CONTENT,
+            )
+        except Exception as e:
+            return self.error_response(e)
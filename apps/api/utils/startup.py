@@ -0,0 +1,67 @@
+"""
+Pre-fork warm-up for the application servers.
+
+With ``preload_app`` gunicorn imports the WSGI module once in the master
+and forks the workers from it. Everything warmed here is then shared by
+the workers and is not rebuilt on each worker's first request. This
+covers the URL resolver, the DRF renderer, parser and negotiation
+classes, the field maps of every routed serializer and the product price
+index. No database or Redis connection may be left open, since the
+workers would share it.
+"""
+import logging
+import time
+
+from django.db import connections
+from django.urls import get_resolver
+from django.urls.resolvers import URLResolver
+from django_redis import get_redis_connection
+from rest_framework.settings import api_settings
+
+from apps.api.v1.product.price_index import get_price_index, price_index_enabled
+
+logger = logging.getLogger(__name__)
+
+
+def iter_view_classes(patterns=None):
+    """Yield the class of every class-based view in the URLconf."""
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_view_classes(pattern.url_patterns)
+        else:
+            view_class = getattr(pattern.callback, "view_class", None)
+            if view_class is not None:
+                yield view_class
+
+
+def warm_up():
+    """Import and build everything a first request would, then return the
+    number of seconds it took."""
+    start = time.perf_counter()
+    resolver = get_resolver()
+    # Compiles every route pattern and fills the reverse lookup tables.
+    resolver.reverse_dict
+
+    for setting in ("DEFAULT_RENDERER_CLASSES", "DEFAULT_PARSER_CLASSES",
+                    "DEFAULT_CONTENT_NEGOTIATION_CLASS"):
+        getattr(api_settings, setting)
+
+    serializer_classes = {
+        view_class.serializer_class for view_class in iter_view_classes()
+        if getattr(view_class, "serializer_class", None) is not None
+    }
+    for serializer_class in serializer_classes:
+        # Builds the model field info and the field mapping.
+        serializer_class().fields
+
+    if price_index_enabled():
+        get_price_index().rebuild()
+        get_redis_connection().connection_pool.disconnect()
+
+    connections.close_all()
+    elapsed = time.perf_counter() - start
+    logger.info("Warmed %d serializers in %.1f ms",
+                len(serializer_classes), elapsed * 1000)
+    return elapsed
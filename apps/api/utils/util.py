@@ -1,13 +1,184 @@
+import hashlib
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
 from urllib.parse import urlencode
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
 from django_redis import get_redis_connection
+from rest_framework.response import Response
+from apps.api.constants.http import CACHE_STATUS_HEADER, CACHE_STATUS_HIT
+from apps.api.constants.redis import REDIS_KEY_CACHE_GENERATION
+from apps.api.utils.compression import (
+    get_variant_cache_key, is_shared_rendering, negotiate_encoding)
+from apps.api.utils.jobs import enqueue_on_commit
+
+_deferred = threading.local()
+_prefetched = ContextVar("prefetched_cache", default=None)
+
+# Longer query strings are replaced by their digest to keep Redis keys short.
+MAX_CACHE_KEY_QUERY_LENGTH = 200
+
 
 def get_cache_key(base_key, params):
     query_string = urlencode(params)
+    if len(query_string) > MAX_CACHE_KEY_QUERY_LENGTH:
+        digest = hashlib.sha1(query_string.encode()).hexdigest()
+        query_string = f"sha1={digest}"
     return f"{base_key}?{query_string}"
 
 
-def delete_cache_by_pattern(pattern):
-    redis_conn = get_redis_connection()
-    keys = redis_conn.scan_iter(f":1:{pattern}")
-    for key in keys:
-        redis_conn.delete(key)
+def normalize_param_value(value, case_insensitive=False):
+    if value is None or value == "" or value == []:
+        return None
+    if isinstance(value, Decimal):
+        # 10, 10.0 and 10.00 are the same filter.
+        return format(value.normalize(), "f")
+    if isinstance(value, str):
+        return value.lower() if case_insensitive else value
+    if isinstance(value, (list, tuple)):
+        return ",".join(str(item) for item in value)
+    return str(value)
+
+
+def canonicalize_query_params(query_params, filterset_class=None,
+                              page_query_param="page"):
+    """
+    Reduce list query parameters to a canonical, sorted dict for cache keys.
+
+    Only parameters the view actually uses are kept: the filters declared on
+    ``filterset_class`` and the page number. Filter values are validated by
+    the filterset form and normalized (decimals without trailing zeros,
+    text lowercased for case-insensitive lookups), and ``page=1`` is dropped since it is
+    the default page (pass ``page_query_param=None`` for unpaginated
+    views). Invalid filters keep their raw value; the view rejects
+    them and nothing gets cached.
+    """
+    params = {}
+    if filterset_class is not None:
+        form = filterset_class(query_params).form
+        if form.is_valid():
+            for name, filter_ in filterset_class.base_filters.items():
+                value = normalize_param_value(
+                    form.cleaned_data.get(name),
+                    case_insensitive=str(filter_.lookup_expr).startswith("i"),
+                )
+                if value is not None:
+                    params[name] = value
+        else:
+            for name in filterset_class.base_filters:
+                if name in query_params:
+                    params[name] = query_params.get(name)
+
+    page = query_params.get(page_query_param) if page_query_param else None
+    if page:
+        try:
+            page_number = int(page)
+        except ValueError:
+            params[page_query_param] = page
+        else:
+            if page_number != 1:
+                params[page_query_param] = str(page_number)
+
+    return dict(sorted(params.items()))
+
+
+def get_invalidation_generation():
+    """Number of invalidations so far. Writers that computed their entries
+    before it changed must not store them."""
+    return int(get_redis_connection().get(REDIS_KEY_CACHE_GENERATION) or 0)
+
+
+def delete_cache_by_pattern(*patterns):
+    from apps.api.utils.cache_warming import schedule_rewarm
+
+    # Bumped before deleting: a write that checks the generation after
+    # storing its entries either sees the bump or is deleted below.
+    get_redis_connection().incr(REDIS_KEY_CACHE_GENERATION)
+    # Scans every node of a sharded cache.
+    for pattern in patterns:
+        cache.delete_pattern(pattern)
+    schedule_rewarm()
+
+
+def invalidate_cache(*patterns):
+    """Delete the entries matching ``patterns`` from a background job once
+    the current transaction commits, keeping Redis off the write path."""
+    enqueue_on_commit(delete_cache_by_pattern, *patterns)
+
+
+@contextmanager
+def defer_cache_writes():
+    """
+    Collect the cache writes made through ``set_cached_data`` in this thread
+    into a dict instead of sending them, so the caller can flush them in one
+    pipelined ``cache.set_many``.
+    """
+    _deferred.writes = {}
+    try:
+        yield _deferred.writes
+    finally:
+        del _deferred.writes
+
+
+def set_cached_data(cache_key, data):
+    writes = getattr(_deferred, "writes", None)
+    if writes is not None:
+        writes[cache_key] = data
+    else:
+        cache.set(cache_key, data)
+
+
+@contextmanager
+def prefetched_cache(values):
+    """
+    Answer ``get_cached_data`` for the keys of ``values`` from that dict
+    instead of Redis, e.g. after a single ``cache.get_many``. A ``None``
+    value is a known miss. Applies to the current context only.
+    """
+    token = _prefetched.set(values)
+    try:
+        yield
+    finally:
+        _prefetched.reset(token)
+
+
+def get_cached_data(cache_key):
+    prefetched = _prefetched.get()
+    if prefetched is not None and cache_key in prefetched:
+        return prefetched[cache_key]
+    return cache.get(cache_key)
+
+
+def get_cached_response(request, cache_key):
+    """
+    Return the cached response for ``cache_key``, or ``None`` on a miss.
+
+    When the client accepts an encoding we already hold a precompressed body
+    for, that body is returned untouched. Otherwise the cached data is
+    returned as a regular ``Response`` tagged with ``cache_key`` so the
+    compression middleware can store the compressed variant.
+    """
+    accepted_renderer = getattr(request, "accepted_renderer", None)
+    encoding = negotiate_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+    if encoding and is_shared_rendering(
+            accepted_renderer, getattr(request, "accepted_media_type", None)):
+        body = cache.get(get_variant_cache_key(cache_key, encoding))
+        if body is not None:
+            response = HttpResponse(body, content_type=accepted_renderer.media_type)
+            response["Content-Encoding"] = encoding
+            response[CACHE_STATUS_HEADER] = CACHE_STATUS_HIT
+            patch_vary_headers(response, ("Accept-Encoding",))
+            return response
+
+    cached_data = get_cached_data(cache_key)
+    if cached_data:
+        response = Response(
+            cached_data,
+            headers={CACHE_STATUS_HEADER: CACHE_STATUS_HIT},
+        )
+        response.cache_key = cache_key
+        return response
+    return None
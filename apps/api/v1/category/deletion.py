@@ -0,0 +1,143 @@
+"""
+Chunked deletion of categories.
+
+Deleting a category through the ``CASCADE`` collects every product into
+memory and removes them in one long transaction. Instead the category is
+flagged ``is_deleting`` (new products are rejected) and its products are
+removed ``BATCH_SIZE`` at a time, each batch in its own short transaction.
+Progress is kept in the cache under ``store:category_deletions:<id>`` and
+caches are invalidated once, after the category row itself is gone.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+
+from apps.api.constants.redis import (
+    REDIS_KEY_CATEGORIES, REDIS_KEY_CATEGORY_DELETIONS, REDIS_KEY_PRODUCTS,
+)
+from apps.api.utils.exceptions import ApiException
+from apps.api.utils.jobs import enqueue
+from apps.api.utils.util import invalidate_cache
+from apps.api.v1.product.aggregates import suspend_incremental_updates
+from apps.api.v1.product.models import Product
+from .models import Category
+
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+def get_deletion_settings():
+    return {
+        "BATCH_SIZE": 1000,
+        "INLINE_THRESHOLD": 1000,
+        "PROGRESS_TIMEOUT": 24 * 60 * 60,
+        # A running deletion without progress for this long is assumed to
+        # have died with its process and may be restarted.
+        "STALE_AFTER": 5 * 60,
+        **getattr(settings, "CATEGORY_DELETION", {}),
+    }
+
+
+def get_progress_key(category_id):
+    return f"{REDIS_KEY_CATEGORY_DELETIONS}:{category_id}"
+
+
+def get_deletion_progress(category_id):
+    return cache.get(get_progress_key(category_id))
+
+
+def save_deletion_progress(category_id, progress):
+    progress["updated_at"] = time.time()
+    cache.set(get_progress_key(category_id), progress,
+              get_deletion_settings()["PROGRESS_TIMEOUT"])
+
+
+def is_deletion_running(category_id):
+    progress = get_deletion_progress(category_id)
+    return (
+        progress is not None
+        and progress["status"] == STATUS_RUNNING
+        and time.time() - progress["updated_at"] < get_deletion_settings()["STALE_AFTER"]
+    )
+
+
+def delete_products_in_batches(category_id, batch_size):
+    """
+    Delete the products of ``category_id`` oldest first, ``batch_size`` per
+    transaction, yielding the number deleted per batch. Only one batch of
+    ids and rows is held in memory at a time.
+    """
+    while True:
+        ids = list(
+            Product.objects.filter(category_id=category_id).order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return
+        # The category and its derived stats are about to go away.
+        with transaction.atomic(), suspend_incremental_updates():
+            deleted, _ = Product.objects.filter(pk__in=ids).delete()
+        yield deleted
+
+
+def run_category_deletion(category_id):
+    """Delete the products of a category flagged ``is_deleting``, then the
+    category itself, recording progress as it goes."""
+    config = get_deletion_settings()
+    progress = get_deletion_progress(category_id) or {
+        "category_id": category_id, "status": STATUS_RUNNING,
+        "total": None, "deleted": 0,
+    }
+    progress["status"] = STATUS_RUNNING
+    progress.pop("error", None)
+    try:
+        for deleted in delete_products_in_batches(category_id, config["BATCH_SIZE"]):
+            progress["deleted"] += deleted
+            save_deletion_progress(category_id, progress)
+        # Products created concurrently with the last batch go with the cascade.
+        with transaction.atomic():
+            Category.objects.filter(pk=category_id).delete()
+    except Exception as e:
+        progress.update(status=STATUS_FAILED, error=str(e))
+        save_deletion_progress(category_id, progress)
+        raise
+    invalidate_cache(f"{REDIS_KEY_PRODUCTS}*", f"{REDIS_KEY_CATEGORIES}*")
+    progress["status"] = STATUS_DONE
+    save_deletion_progress(category_id, progress)
+    return progress
+
+
+def _start_worker(category_id):
+    enqueue(run_category_deletion, category_id)
+
+
+def start_category_deletion(category):
+    """
+    Flag ``category`` as deleting and remove it. Categories with at most
+    ``INLINE_THRESHOLD`` products are deleted before returning, larger ones
+    by a background job. Returns the deletion progress.
+
+    A failed or stale deletion can be restarted by calling this again; it
+    resumes with the products that are left.
+    """
+    if category.is_deleting and is_deletion_running(category.pk):
+        raise ApiException(
+            message="Category is already being deleted.",
+            status_code=status.HTTP_409_CONFLICT,
+        )
+    Category.objects.filter(pk=category.pk).update(is_deleting=True)
+    total = Product.objects.filter(category_id=category.pk).count()
+    progress = {
+        "category_id": category.pk, "status": STATUS_RUNNING,
+        "total": total, "deleted": 0,
+    }
+    save_deletion_progress(category.pk, progress)
+
+    if total <= get_deletion_settings()["INLINE_THRESHOLD"]:
+        return run_category_deletion(category.pk)
+    transaction.on_commit(lambda: _start_worker(category.pk))
+    return progress
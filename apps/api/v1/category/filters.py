@@ -0,0 +1,26 @@
+import django_filters
+from .models import Category
+
+class StableOrderingFilter(django_filters.OrderingFilter):
+    """Orders by id after the requested fields, so tied rows keep their
+    place across pages."""
+
+    def filter(self, qs, value):
+        qs = super().filter(qs, value)
+        return qs.order_by(*qs.query.order_by, 'id') if value else qs
+
+
+class CategoryFilter(django_filters.FilterSet):
+    name = django_filters.CharFilter(field_name='name', lookup_expr='icontains', label='Name')
+    product_count_min = django_filters.NumberFilter(field_name='product_count', lookup_expr='gte', label='Product Count Min')
+    product_count_max = django_filters.NumberFilter(field_name='product_count', lookup_expr='lte', label='Product Count Max')
+    min_price_max = django_filters.NumberFilter(field_name='min_price', lookup_expr='lte', label='Cheapest Product Price Max')
+    max_price_min = django_filters.NumberFilter(field_name='max_price', lookup_expr='gte', label='Most Expensive Product Price Min')
+    ordering = StableOrderingFilter(
+        fields=('name', 'product_count', 'min_price', 'max_price'),
+        label='Ordering',
+    )
+
+    class Meta:
+        model = Category
+        fields = ['name', 'product_count_min', 'product_count_max', 'min_price_max', 'max_price_min']
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.api.constants.redis import REDIS_KEY_CATEGORIES
+from apps.api.utils.util import delete_cache_by_pattern
+from apps.api.v1.category.stats import RECONCILE_BATCH_SIZE, reconcile_category_stats
+
+
+class Command(BaseCommand):
+    help = ("Recompute the denormalized product_count, min_price and max_price "
+            "of every category from its products and fix any drift.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=RECONCILE_BATCH_SIZE,
+            help="Number of categories recomputed per transaction.")
+
+    def handle(self, *args, **options):
+        checked = fixed = 0
+        for batch_checked, batch_fixed in reconcile_category_stats(options["batch_size"]):
+            checked += batch_checked
+            fixed += batch_fixed
+        if fixed:
+            delete_cache_by_pattern(f"{REDIS_KEY_CATEGORIES}*")
+        self.stdout.write(f"Checked {checked} categories, fixed {fixed}.")
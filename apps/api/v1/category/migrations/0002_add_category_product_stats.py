@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:40
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Min
+
+
+def backfill_product_stats(apps, schema_editor):
+    Category = apps.get_model('category', 'Category')
+    Product = apps.get_model('product', 'Product')
+    rows = (
+        Product.objects.order_by().values('category_id')
+        .annotate(count=Count('id'), min_price=Min('price'), max_price=Max('price'))
+    )
+    for row in rows:
+        Category.objects.filter(pk=row['category_id']).update(
+            product_count=row['count'], min_price=row['min_price'],
+            max_price=row['max_price'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('category', '0001_create_categories_table'),
+        ('product', '0001_create_products_table'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='max_price',
+            field=models.DecimalField(db_index=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='min_price',
+            field=models.DecimalField(db_index=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='product_count',
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(backfill_product_stats, migrations.RunPython.noop),
+    ]
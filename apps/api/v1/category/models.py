@@ -3,6 +3,12 @@ from django.db import models
 class Category(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField(null=True)
+    # Denormalized from the category's products; see category/stats.py.
+    product_count = models.IntegerField(default=0, db_index=True)
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, db_index=True)
+    max_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, db_index=True)
+    # Set while the category's products are removed in batches; see category/deletion.py.
+    is_deleting = models.BooleanField(default=False, db_index=True)
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
@@ -4,4 +4,6 @@ from .models import Category
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
-        fields = '__all__'
+        exclude = ['is_deleting']
+        # Maintained from the category's products, never written directly.
+        read_only_fields = ['product_count', 'min_price', 'max_price']
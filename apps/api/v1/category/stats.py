@@ -0,0 +1,108 @@
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Max, Min, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+
+from apps.api.v1.product.models import Product
+from .models import Category
+
+RECONCILE_BATCH_SIZE = 500
+
+
+def _price_value(price):
+    field = Product._meta.get_field("price")
+    return Value(field.to_python(price),
+                 output_field=DecimalField(max_digits=10, decimal_places=2))
+
+
+def _extend_price_range(price):
+    """Update expressions widening ``min_price``/``max_price`` to ``price``."""
+    price = _price_value(price)
+    return {
+        "min_price": Least(Coalesce("min_price", price), price),
+        "max_price": Greatest(Coalesce("max_price", price), price),
+    }
+
+
+def apply_product_added(category_id, price):
+    Category.objects.filter(pk=category_id).update(
+        product_count=F("product_count") + 1, **_extend_price_range(price))
+
+
+def apply_product_removed(category_id, price):
+    """
+    Decrement the count in place unless the product held the category's
+    min or max price; only then are the price bounds recomputed.
+    """
+    price = Product._meta.get_field("price").to_python(price)
+    updated = (
+        Category.objects.filter(pk=category_id)
+        .exclude(min_price=price).exclude(max_price=price)
+        .update(product_count=F("product_count") - 1)
+    )
+    if not updated:
+        refresh_category_stats([category_id])
+
+
+def apply_product_changed(previous_category_id, previous_price, category_id, price):
+    if previous_category_id != category_id:
+        apply_product_removed(previous_category_id, previous_price)
+        apply_product_added(category_id, price)
+        return
+    previous_price = Product._meta.get_field("price").to_python(previous_price)
+    updated = (
+        Category.objects.filter(pk=category_id)
+        .exclude(min_price=previous_price).exclude(max_price=previous_price)
+        .update(**_extend_price_range(price))
+    )
+    if not updated:
+        refresh_category_stats([category_id])
+
+
+def refresh_category_stats(category_ids):
+    """
+    Recompute the stats of ``category_ids`` from their products. Returns
+    the number of categories whose stored stats were wrong.
+    """
+    category_ids = list(category_ids)
+    if not category_ids:
+        return 0
+    with transaction.atomic():
+        categories = list(
+            Category.objects.select_for_update().filter(pk__in=category_ids)
+            .only("product_count", "min_price", "max_price")
+        )
+        rows = (
+            Product.objects.filter(category_id__in=category_ids).order_by()
+            .values("category_id")
+            .annotate(count=Count("id"), min_price=Min("price"), max_price=Max("price"))
+        )
+        stats = {
+            row["category_id"]: (row["count"], row["min_price"], row["max_price"])
+            for row in rows
+        }
+        stale = []
+        for category in categories:
+            expected = stats.get(category.id, (0, None, None))
+            if (category.product_count, category.min_price, category.max_price) != expected:
+                category.product_count, category.min_price, category.max_price = expected
+                stale.append(category)
+        Category.objects.bulk_update(
+            stale, ["product_count", "min_price", "max_price"])
+    return len(stale)
+
+
+def reconcile_category_stats(batch_size=RECONCILE_BATCH_SIZE):
+    """
+    Recompute the stats of every category, ``batch_size`` categories per
+    transaction. Yields ``(categories checked, categories fixed)`` per batch.
+    """
+    last_id = 0
+    while True:
+        category_ids = list(
+            Category.objects.filter(pk__gt=last_id).order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not category_ids:
+            return
+        yield len(category_ids), refresh_category_stats(category_ids)
+        last_id = category_ids[-1]
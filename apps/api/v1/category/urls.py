@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import CategoryListView, CategoryDetailView
+from .views import CategoryListView, CategoryDetailView, CategoryDeletionView
 
 urlpatterns = [
     path('', CategoryListView.as_view(), name='category-list'),          
     path('<int:id>/', CategoryDetailView.as_view(), name='category-detail'),
+    path('<int:id>/deletion/', CategoryDeletionView.as_view(), name='category-deletion'),
 ]
@@ -0,0 +1,60 @@
+"""
+Bookkeeping for data derived from products: the category stats, the
+facet summary, the price index and the catalog snapshot. Single-row
+writes update them incrementally from signals; bulk writes suspend the
+signals, refresh the affected categories once and mark the price index
+and the snapshot stale.
+"""
+import threading
+from contextlib import contextmanager
+
+_state = threading.local()
+
+
+def incremental_updates_suspended():
+    return getattr(_state, "suspended", 0) > 0
+
+
+@contextmanager
+def suspend_incremental_updates():
+    """Skip the per-row signal handlers; the caller refreshes afterwards."""
+    _state.suspended = getattr(_state, "suspended", 0) + 1
+    try:
+        yield
+    finally:
+        _state.suspended -= 1
+
+
+def refresh_aggregates(category_ids):
+    """Recompute everything derived from the products of ``category_ids``."""
+    from apps.api.v1.category.stats import refresh_category_stats
+    from .facets import get_facet_settings, rebuild_summary
+
+    category_ids = set(category_ids)
+    if not category_ids:
+        return
+    refresh_category_stats(category_ids)
+    if get_facet_settings()["USE_SUMMARY"]:
+        rebuild_summary(category_ids)
+
+
+def refresh_product_aggregates(product_ids):
+    """Background job refreshing the categories of ``product_ids``, after
+    writes that didn't know the old prices."""
+    from .models import Product
+
+    refresh_aggregates(
+        Product.objects.filter(pk__in=product_ids)
+        .values_list("category_id", flat=True).distinct()
+    )
+
+
+def record_bulk_write(fields=None):
+    """Mark the price index and catalog snapshot stale after a bulk write
+    to ``fields`` (all of them if ``None``) commits."""
+    from .price_index import mark_price_index_stale
+    from .snapshot import reset_snapshot
+
+    if fields is None or 'price' in fields:
+        mark_price_index_stale()
+    reset_snapshot()
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ProductConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.api.v1.product'
+    label = 'product'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,174 @@
+from decimal import ROUND_FLOOR, Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Count, F, Sum, Value
+from django.db.models.functions import Cast, Mod, Round
+from rest_framework import status
+
+from apps.api.utils.exceptions import ApiException
+from .models import Product, ProductFacetSummary
+
+
+def get_facet_settings():
+    return {
+        "DEFAULT_BUCKET_SIZE": Decimal("10"),
+        "USE_SUMMARY": False,
+        "SUMMARY_BUCKET_SIZE": Decimal("10"),
+        **getattr(settings, "PRODUCT_FACETS", {}),
+    }
+
+
+def parse_bucket_size(value):
+    if value in (None, ""):
+        return Decimal(get_facet_settings()["DEFAULT_BUCKET_SIZE"])
+    try:
+        bucket_size = Decimal(value)
+    except InvalidOperation:
+        bucket_size = None
+    if (bucket_size is None or not bucket_size.is_finite() or bucket_size < Decimal("0.01")
+            or bucket_size % Decimal("0.01")):
+        raise ApiException(
+            message="bucket_size must be a multiple of 0.01.",
+            status_code=status.HTTP_400_BAD_REQUEST,
+        )
+    return bucket_size
+
+
+def get_bucket(price, bucket_size):
+    return int((Decimal(price) / Decimal(bucket_size)).to_integral_value(
+        rounding=ROUND_FLOOR))
+
+
+def bucket_expression(bucket_size):
+    """
+    ``get_bucket(price, bucket_size)`` in SQL. Prices and the bucket size
+    are compared in integer cents: SQLite divides decimals in floating
+    point, where ``floor(0.3 / 0.1)`` is 2.
+    """
+    cents = Cast(Round(F("price") * 100), BigIntegerField())
+    width = Value(int(Decimal(bucket_size) * 100), output_field=BigIntegerField())
+    # Integer division truncates; subtracting the floored remainder first
+    # makes it exact, negative prices included.
+    remainder = Mod(Mod(cents, width) + width, width)
+    return Cast((cents - remainder) / width, BigIntegerField())
+
+
+def build_facets(category_rows, bucket_counts, bucket_size):
+    categories = [
+        {"id": row["category_id"], "name": row["category__name"],
+         "count": row["count"]}
+        for row in category_rows if row["count"] > 0
+    ]
+    price_histogram = [
+        {"min": bucket * bucket_size, "max": (bucket + 1) * bucket_size,
+         "count": count}
+        for bucket, count in sorted(bucket_counts.items()) if count > 0
+    ]
+    return {
+        "count": sum(category["count"] for category in categories),
+        "bucket_size": bucket_size,
+        "categories": categories,
+        "price_histogram": price_histogram,
+    }
+
+
+def compute_facets(queryset, bucket_size):
+    """Facets of ``queryset`` using two GROUP BY aggregates."""
+    queryset = queryset.order_by()
+    category_rows = (
+        queryset.values("category_id", "category__name")
+        .annotate(count=Count("id"))
+        .order_by("category__name", "category_id")
+    )
+    bucket_rows = (
+        queryset.annotate(bucket=bucket_expression(bucket_size))
+        .values("bucket")
+        .annotate(count=Count("id"))
+    )
+    bucket_counts = {int(row["bucket"]): row["count"] for row in bucket_rows}
+    return build_facets(category_rows, bucket_counts, bucket_size)
+
+
+def compute_facets_from_summary(category_name, bucket_size):
+    """
+    Facets from ``ProductFacetSummary``; cost depends on the number of
+    categories and buckets, not on the number of products.
+
+    ``bucket_size`` must be a multiple of the summary bucket size, whose
+    buckets are merged to the requested width.
+    """
+    summary_bucket_size = Decimal(get_facet_settings()["SUMMARY_BUCKET_SIZE"])
+    ratio = int(bucket_size / summary_bucket_size)
+
+    rows = ProductFacetSummary.objects.all()
+    if category_name:
+        rows = rows.filter(category__name__icontains=category_name)
+    category_rows = (
+        rows.values("category_id", "category__name")
+        .annotate(count=Sum("count"))
+        .order_by("category__name", "category_id")
+    )
+    bucket_counts = {}
+    for row in rows.values("bucket").annotate(count=Sum("count")):
+        bucket = row["bucket"] // ratio
+        bucket_counts[bucket] = bucket_counts.get(bucket, 0) + row["count"]
+    return build_facets(category_rows, bucket_counts, bucket_size)
+
+
+def can_use_summary(filter_data, bucket_size):
+    config = get_facet_settings()
+    summary_bucket_size = Decimal(config["SUMMARY_BUCKET_SIZE"])
+    return (
+        config["USE_SUMMARY"]
+        and filter_data.get("price_min") is None
+        and filter_data.get("price_max") is None
+        and bucket_size % summary_bucket_size == 0
+    )
+
+
+def get_product_facets(filterset, bucket_size):
+    """Facets for a validated ``ProductFilter``, served from the summary
+    table when the filters allow it."""
+    filter_data = filterset.form.cleaned_data
+    if can_use_summary(filter_data, bucket_size):
+        return compute_facets_from_summary(filter_data.get("category"), bucket_size)
+    return compute_facets(filterset.qs, bucket_size)
+
+
+def apply_summary_delta(category_id, price, delta):
+    bucket = get_bucket(price, get_facet_settings()["SUMMARY_BUCKET_SIZE"])
+    rows = ProductFacetSummary.objects.filter(category_id=category_id, bucket=bucket)
+    if rows.update(count=F("count") + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            ProductFacetSummary.objects.create(
+                category_id=category_id, bucket=bucket, count=delta)
+    except IntegrityError:
+        # Created concurrently since our update.
+        rows.update(count=F("count") + delta)
+
+
+def rebuild_summary(category_ids=None):
+    """Recompute ``ProductFacetSummary`` from scratch, or only the rows of
+    ``category_ids``."""
+    summary_bucket_size = Decimal(get_facet_settings()["SUMMARY_BUCKET_SIZE"])
+    products = Product.objects.order_by()
+    summary = ProductFacetSummary.objects.all()
+    if category_ids is not None:
+        products = products.filter(category_id__in=category_ids)
+        summary = summary.filter(category_id__in=category_ids)
+    rows = (
+        products
+        .annotate(bucket=bucket_expression(summary_bucket_size))
+        .values("category_id", "bucket")
+        .annotate(count=Count("id"))
+    )
+    with transaction.atomic():
+        summary.delete()
+        ProductFacetSummary.objects.bulk_create([
+            ProductFacetSummary(category_id=row["category_id"],
+                                bucket=int(row["bucket"]), count=row["count"])
+            for row in rows
+        ], batch_size=1000)
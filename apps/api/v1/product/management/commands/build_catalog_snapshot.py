@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.api.v1.product.snapshot import build_snapshot, np
+
+
+class Command(BaseCommand):
+    help = ("Dump products and categories into a memory-mapped columnar "
+            "snapshot that product lists are served from.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path", default=None,
+            help="Snapshot directory (default: CATALOG_SNAPSHOT['PATH']).")
+        parser.add_argument(
+            "--every", type=float, default=None, metavar="SECONDS",
+            help="Keep running and rebuild the snapshot at this interval.")
+
+    def handle(self, *args, **options):
+        if np is None:
+            raise CommandError("Catalog snapshots require the numpy package.")
+        while True:
+            meta = build_snapshot(options["path"])
+            self.stdout.write(
+                f"Built snapshot {meta['name']} with {meta['products']} products "
+                f"and {meta['categories']} categories.")
+            if options["every"] is None:
+                return
+            time.sleep(options["every"])
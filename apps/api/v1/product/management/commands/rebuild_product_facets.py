@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.api.constants.redis import REDIS_KEY_PRODUCT_FACETS
+from apps.api.utils.util import delete_cache_by_pattern
+from apps.api.v1.product.facets import rebuild_summary
+from apps.api.v1.product.models import ProductFacetSummary
+
+
+class Command(BaseCommand):
+    help = ("Recompute the product facet summary table. Run it after enabling "
+            "PRODUCT_FACETS['USE_SUMMARY'] or changing SUMMARY_BUCKET_SIZE.")
+
+    def handle(self, *args, **options):
+        rebuild_summary()
+        delete_cache_by_pattern(f"{REDIS_KEY_PRODUCT_FACETS}*")
+        self.stdout.write(
+            f"Rebuilt {ProductFacetSummary.objects.count()} facet summary rows.")
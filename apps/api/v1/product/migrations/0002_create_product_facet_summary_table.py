@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('category', '0001_create_categories_table'),
+        ('product', '0001_create_products_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductFacetSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.IntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='category.category')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('category', 'bucket'), name='unique_facet_bucket')],
+            },
+        ),
+    ]
@@ -1,6 +1,105 @@
-from django.db import models
+from django.db import models, transaction
 from apps.api.v1.category.models import Category
 
+# Fields whose changes affect the category stats and the facet summary.
+AGGREGATE_FIELDS = frozenset({'price', 'category', 'category_id'})
+
+
+class ProductQuerySet(models.QuerySet):
+    """
+    Bulk writes bypass the model signals that maintain product-derived
+    aggregates, so they refresh the affected categories once instead.
+    Inside ``suspend_incremental_updates()`` the caller refreshes. Either
+    way the price index and catalog snapshot are marked stale.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from .aggregates import (
+            incremental_updates_suspended, record_bulk_write, refresh_aggregates,
+        )
+
+        record_bulk_write()
+        if incremental_updates_suspended():
+            return super().bulk_create(objs, *args, **kwargs)
+        objs = list(objs)
+        with transaction.atomic():
+            created = super().bulk_create(objs, *args, **kwargs)
+            refresh_aggregates(obj.category_id for obj in objs)
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        from .aggregates import (
+            incremental_updates_suspended, record_bulk_write,
+            refresh_aggregates, suspend_incremental_updates,
+        )
+
+        record_bulk_write(fields)
+        if (not AGGREGATE_FIELDS.intersection(fields)
+                or incremental_updates_suspended()):
+            return super().bulk_update(objs, fields, *args, **kwargs)
+        objs = list(objs)
+        with transaction.atomic():
+            category_ids = set(
+                self.model._base_manager.filter(pk__in=[obj.pk for obj in objs])
+                .values_list('category_id', flat=True)
+            )
+            category_ids.update(obj.category_id for obj in objs)
+            with suspend_incremental_updates():
+                rows = super().bulk_update(objs, fields, *args, **kwargs)
+            refresh_aggregates(category_ids)
+        return rows
+
+    def update(self, **kwargs):
+        from .aggregates import (
+            incremental_updates_suspended, record_bulk_write, refresh_aggregates,
+        )
+
+        record_bulk_write(kwargs)
+        if (not AGGREGATE_FIELDS.intersection(kwargs)
+                or incremental_updates_suspended()):
+            return super().update(**kwargs)
+        with transaction.atomic():
+            category_ids = set(
+                self.order_by().values_list('category_id', flat=True).distinct())
+            new_category = kwargs.get('category_id', kwargs.get('category'))
+            if new_category is not None:
+                category_ids.add(getattr(new_category, 'pk', new_category))
+            rows = super().update(**kwargs)
+            refresh_aggregates(category_ids)
+        return rows
+
+    update.alters_data = True
+
+    def update_rows(self, **kwargs):
+        """
+        A plain UPDATE without the bulk-write bookkeeping above. The caller
+        publishes the change to the derived data itself (see ``patching``).
+        """
+        return super().update(**kwargs)
+
+    update_rows.alters_data = True
+
+    def delete(self):
+        from .aggregates import (
+            incremental_updates_suspended, record_bulk_write,
+            refresh_aggregates, suspend_incremental_updates,
+        )
+
+        record_bulk_write()
+        if incremental_updates_suspended():
+            return super().delete()
+        with transaction.atomic():
+            category_ids = set(
+                self.order_by().values_list('category_id', flat=True).distinct())
+            with suspend_incremental_updates():
+                result = super().delete()
+            refresh_aggregates(category_ids)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Product(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField(null=True)
@@ -9,5 +108,27 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProductQuerySet.as_manager()
+
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+    def save(self, *args, **kwargs):
+        # The signal handlers updating derived aggregates run inside this
+        # transaction, so they commit or roll back with the row.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class ProductFacetSummary(models.Model):
+    """Product counts per category and price bucket, maintained incrementally
+    so facets can be served without scanning products."""
+    category = models.ForeignKey(Category, on_delete=models.CASCADE)
+    bucket = models.IntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['category', 'bucket'], name='unique_facet_bucket'),
+        ]
@@ -0,0 +1,163 @@
+"""
+Single-statement partial updates for products.
+
+A PATCH validates only the fields it carries and writes them with one
+``UPDATE ... WHERE id = ? [AND updated_at = ?]``. ``updated_at`` is the
+product's version. The UPDATE sets it itself, so the new version is known
+without reading the row back. ``If-Match`` preconditions are checked by
+the same statement. A product's ETag is its ``updated_at``, quoted, as
+the API serializes it.
+
+The UPDATE bypasses the model signals, so the derived data is updated
+from the ids alone. The price index drops entries by id, the snapshot
+records the ids, and a background job refreshes the category stats and
+facet summary. Category changes need the old category, so views send
+them through the regular save path instead.
+"""
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import serializers, status
+
+from apps.api.utils.exceptions import ApiException
+from apps.api.utils.jobs import enqueue_on_commit
+from .aggregates import refresh_product_aggregates
+from .models import Product
+from .price_index import record_price_change, to_cents
+from .snapshot import record_snapshot_change
+
+# Fields that can be written without knowing the row's previous values.
+PATCH_FIELDS = frozenset({"name", "description", "price"})
+
+_version_field = serializers.DateTimeField()
+
+
+def get_patch_settings():
+    return {
+        "MAX_BULK_ITEMS": 500,
+        **getattr(settings, "PRODUCT_PATCH", {}),
+    }
+
+
+def format_version(updated_at):
+    return _version_field.to_representation(updated_at)
+
+
+def make_etag(updated_at):
+    return f'"{format_version(updated_at)}"'
+
+
+def parse_version(tag):
+    """The ``updated_at`` named by an ETag or a bare version, or ``None``."""
+    tag = tag.strip()
+    # The version doesn't depend on the encoding, so a tag weakened by
+    # compression still names it.
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    try:
+        return parse_datetime(tag.strip('"'))
+    except ValueError:
+        return None
+
+
+def parse_if_match(header):
+    """
+    The versions an ``If-Match`` header accepts, or ``None`` if it accepts
+    any. Tags that name no version are dropped, so they never match.
+    """
+    if header is None or header.strip() == "*":
+        return None
+    # Versions are ISO 8601 timestamps, which contain no commas.
+    versions = (parse_version(tag) for tag in header.split(","))
+    return [version for version in versions if version is not None]
+
+
+def precondition_failed():
+    return ApiException(
+        message="Product has changed since the given version.",
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+    )
+
+
+def publish_patch(changes):
+    """
+    Update the derived data for ``changes``, a mapping of product id to
+    the fields written, once the transaction commits.
+    """
+    if not changes:
+        return
+    record_snapshot_change(*changes)
+    priced = sorted(id for id, fields in changes.items() if "price" in fields)
+    if priced:
+        record_price_change(
+            removed=priced,
+            added=[(to_cents(changes[id]["price"]), id) for id in priced],
+        )
+        enqueue_on_commit(refresh_product_aggregates, priced)
+
+
+def patch_product(product_id, fields, versions=None):
+    """
+    Write ``fields`` to the product with one UPDATE and return its new
+    ``updated_at``. ``versions`` are the ``updated_at`` values the product
+    may have, or ``None`` for any.
+    """
+    updated_at = timezone.now()
+    rows = Product.objects.filter(pk=product_id)
+    if versions is not None:
+        rows = rows.filter(updated_at__in=versions)
+    # A single statement needs no transaction of its own.
+    if not rows.update_rows(**fields, updated_at=updated_at):
+        if versions is not None and Product.objects.filter(pk=product_id).exists():
+            raise precondition_failed()
+        raise Product.DoesNotExist("Product matching query does not exist.")
+    publish_patch({product_id: fields})
+    return updated_at
+
+
+def bulk_patch_products(items):
+    """
+    Write many products with one UPDATE. ``items`` are ``(id, fields,
+    version)`` tuples, with ``version`` ``None`` to skip the precondition.
+    Returns the new ``updated_at`` and a mapping of each id to 200, 404 or
+    412.
+    """
+    updated_at = timezone.now()
+    ids = [id for id, _, _ in items]
+    values = {"updated_at": updated_at}
+    for name in sorted(set().union(*(fields for _, fields, _ in items))):
+        output_field = Product._meta.get_field(name)
+        values[name] = Case(
+            *(When(pk=id, then=Value(fields[name], output_field=output_field))
+              for id, fields, _ in items if name in fields),
+            default=F(name),
+        )
+    rows = Product.objects.filter(pk__in=ids)
+    versioned = [(id, version) for id, _, version in items if version is not None]
+    if versioned:
+        # A CASE keeps the statement flat, unlike one OR term per item.
+        rows = rows.filter(updated_at=Case(
+            *(When(pk=id, then=Value(version)) for id, version in versioned),
+            default=F("updated_at"),
+            output_field=models.DateTimeField(),
+        ))
+
+    with transaction.atomic():
+        if rows.update_rows(**values) == len(ids):
+            results = dict.fromkeys(ids, status.HTTP_200_OK)
+        else:
+            current = dict(
+                Product.objects.filter(pk__in=ids).values_list("pk", "updated_at"))
+            results = {
+                id: status.HTTP_404_NOT_FOUND if id not in current
+                else status.HTTP_200_OK if current[id] == updated_at
+                else status.HTTP_412_PRECONDITION_FAILED
+                for id in ids
+            }
+        publish_patch({
+            id: fields for id, fields, _ in items
+            if results[id] == status.HTTP_200_OK
+        })
+    return updated_at, results
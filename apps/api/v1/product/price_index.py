@@ -0,0 +1,324 @@
+"""
+In-memory price index for ``price_min``/``price_max`` list queries.
+
+Every process keeps the products sorted by ``(price, id)`` in two parallel
+``array('q')`` columns, with prices in cents. The products in a price
+range are a contiguous slice that ``bisect`` finds in O(log n). The list
+view then only counts the slice and loads the rows of the requested page
+by primary key. A second pair of columns sorted by id finds a product's
+indexed price, so writes can move a product without knowing its old
+price. That makes 32 bytes per product.
+
+Processes stay in sync through Redis. Every committed write increments a
+generation counter and pushes its ``(removed, added)`` delta, tagged with
+the new generation, onto a log capped at ``LOG_SIZE`` entries. Before a
+lookup, a process applies the deltas it has not seen yet, including its
+own. It rebuilds only when some are missing from the log, after bulk
+writes (which publish no delta), or when Redis lost the counter. The
+rebuild runs in a background thread; lookups return ``None`` until it is
+done, so the list view queries the database meanwhile.
+"""
+import json
+import logging
+import random
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from decimal import ROUND_CEILING, ROUND_FLOOR, Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+from django_redis import get_redis_connection
+from redis.commands.core import Script
+from redis.exceptions import RedisError
+
+from apps.api.constants.redis import REDIS_KEY_PRICE_INDEX
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = f"{REDIS_KEY_PRICE_INDEX}:generation"
+LOG_KEY = f"{REDIS_KEY_PRICE_INDEX}:log"
+
+# Bump the generation and log the write's delta under it, atomically so
+# the log has no holes. ARGV[1] is the JSON delta, null for bulk writes.
+PUBLISH_SCRIPT = """
+local generation = redis.call('INCR', KEYS[1])
+redis.call('LPUSH', KEYS[2], string.format('%d ', generation) .. ARGV[1])
+redis.call('LTRIM', KEYS[2], 0, tonumber(ARGV[2]) - 1)
+return generation
+"""
+
+# The current generation followed by the log entries newer than ARGV[1],
+# newest first. Returns only the generation when they can't all be in the
+# log, and nothing when the counter is gone.
+READ_LOG_SCRIPT = """
+local generation = tonumber(redis.call('GET', KEYS[1]))
+if generation == nil then
+    return nil
+end
+local behind = generation - tonumber(ARGV[1])
+if behind <= 0 or behind > tonumber(ARGV[2]) then
+    return {generation}
+end
+local entries = redis.call('LRANGE', KEYS[2], 0, behind - 1)
+table.insert(entries, 1, generation)
+return entries
+"""
+
+# Built once; the client is passed on every call.
+PUBLISH = Script(None, PUBLISH_SCRIPT.encode())
+READ_LOG = Script(None, READ_LOG_SCRIPT.encode())
+
+
+def get_price_index_settings():
+    return {
+        "ENABLED": True,
+        "REBUILD_CHUNK_SIZE": 10000,
+        "LOG_SIZE": 1000,
+        **getattr(settings, "PRICE_INDEX", {}),
+    }
+
+
+def to_cents(price, rounding=ROUND_FLOOR):
+    return int((Decimal(price) * 100).to_integral_value(rounding=rounding))
+
+
+class PriceIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.prices = array("q")
+        self.ids = array("q")
+        self.by_id_ids = array("q")
+        self.by_id_prices = array("q")
+        # Generation the arrays reflect; None when they must be rebuilt.
+        self.generation = None
+        self._rebuilding = False
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _read_generation(self):
+        redis_conn = get_redis_connection()
+        generation = redis_conn.get(GENERATION_KEY)
+        if generation is None:
+            # Start from a random value so an index built before Redis
+            # lost the counter can't match the restarted one.
+            redis_conn.set(GENERATION_KEY, random.getrandbits(48), nx=True)
+            generation = redis_conn.get(GENERATION_KEY)
+        return int(generation)
+
+    def rebuild(self):
+        """Reload the index from the database. Lookups keep using the
+        current arrays until the new ones are loaded."""
+        # Read the generation first: the deltas of writes committed after
+        # it are applied on top, even if the rows below already include them.
+        generation = self._read_generation()
+        chunk_size = get_price_index_settings()["REBUILD_CHUNK_SIZE"]
+        columns = {}
+        for order in (("price", "id"), ("id",)):
+            prices, ids = array("q"), array("q")
+            rows = (
+                Product.objects.order_by(*order).values_list("price", "id")
+                .iterator(chunk_size=chunk_size)
+            )
+            for price, id in rows:
+                prices.append(to_cents(price))
+                ids.append(id)
+            columns[order] = prices, ids
+        with self._lock:
+            self.prices, self.ids = columns[("price", "id")]
+            self.by_id_prices, self.by_id_ids = columns[("id",)]
+            self.generation = generation
+        logger.info("Rebuilt price index with %d products", len(self.ids))
+
+    def _start_rebuild(self):
+        if self._rebuilding:
+            return
+        self._rebuilding = True
+        threading.Thread(
+            target=self._rebuild_in_background, name="price-index-rebuild",
+            daemon=True).start()
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        except Exception:
+            logger.exception("Price index rebuild failed.")
+        finally:
+            connection.close()
+            self._rebuilding = False
+
+    def _catch_up(self):
+        """
+        Apply the deltas published since the index was built. Returns
+        False when the index must be rebuilt instead.
+        """
+        if self.generation is None:
+            return False
+        reply = READ_LOG(
+            keys=[GENERATION_KEY, LOG_KEY],
+            args=[self.generation, get_price_index_settings()["LOG_SIZE"]],
+            client=get_redis_connection(),
+        )
+        if reply is None:
+            return False
+        generation, *entries = reply
+        if generation == self.generation:
+            return True
+        deltas = []
+        for entry in reversed(entries):
+            entry_generation, delta = entry.split(b" ", 1)
+            delta = json.loads(delta)
+            if int(entry_generation) != self.generation + len(deltas) + 1 or delta is None:
+                return False
+            deltas.append(delta)
+        if self.generation + len(deltas) != generation:
+            return False
+        for removed, added in deltas:
+            self._apply(removed, added)
+        self.generation = generation
+        return True
+
+    def _position(self, cents, id):
+        lo = bisect_left(self.prices, cents)
+        hi = bisect_right(self.prices, cents, lo)
+        return bisect_left(self.ids, id, lo, hi)
+
+    def _apply(self, removed, added):
+        # Added ids are dropped first too, so applying a write that a
+        # rebuild already loaded leaves a single entry.
+        for id in (*removed, *(id for _, id in added)):
+            j = bisect_left(self.by_id_ids, id)
+            if j == len(self.by_id_ids) or self.by_id_ids[j] != id:
+                continue
+            i = self._position(self.by_id_prices[j], id)
+            del self.prices[i], self.ids[i]
+            del self.by_id_prices[j], self.by_id_ids[j]
+        for cents, id in added:
+            i = self._position(cents, id)
+            self.prices.insert(i, cents)
+            self.ids.insert(i, id)
+            j = bisect_left(self.by_id_ids, id)
+            self.by_id_ids.insert(j, id)
+            self.by_id_prices.insert(j, cents)
+
+    def record_write(self, removed=(), added=()):
+        """
+        Publish a committed write to every process, this one included.
+        ``removed`` are the ids it took out of the index (including the old
+        entries of moved products) and ``added`` the ``(cents, id)`` entries
+        it put in. Both are empty for a bulk write, which has every index
+        rebuilt.
+        """
+        delta = [list(removed), [list(entry) for entry in added]] if removed or added else None
+        try:
+            PUBLISH(
+                keys=[GENERATION_KEY, LOG_KEY],
+                args=[json.dumps(delta), get_price_index_settings()["LOG_SIZE"]],
+                client=get_redis_connection(),
+            )
+        except RedisError:
+            logger.warning("Price index log unavailable.", exc_info=True)
+            with self._lock:
+                self.generation = None
+
+    def lookup(self, price_min=None, price_max=None):
+        """
+        Return ``(count, fetch)`` for the products priced within the
+        bounds, where ``fetch(start, stop)`` returns the ids of that part
+        of the range in ``(price, id)`` order. Returns ``None`` while the
+        index is rebuilt.
+        """
+        with self._lock:
+            if not self._catch_up():
+                self.generation = None
+                self._start_rebuild()
+                return None
+            lo = 0 if price_min is None else bisect_left(
+                self.prices, to_cents(price_min, ROUND_CEILING))
+            hi = len(self.prices) if price_max is None else bisect_right(
+                self.prices, to_cents(price_max, ROUND_FLOOR))
+            generation = self.generation
+        hi = max(lo, hi)
+
+        def fetch(start, stop):
+            with self._lock:
+                if self.generation != generation:
+                    return None
+                return self.ids[lo + start:min(lo + stop, hi)].tolist()
+
+        return hi - lo, fetch
+
+
+class PriceRangeResult:
+    """
+    The products of a price range as a sliceable sequence for the
+    paginator. Only the sliced rows are loaded, by primary key.
+    """
+    ordered = True
+
+    def __init__(self, count, fetch, fallback):
+        self._count = count
+        self._fetch = fetch
+        # Queryset used when the index changes between count and slice.
+        self._fallback = fallback
+
+    def count(self):
+        return self._count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start, stop, _ = key.indices(self._count)
+        ids = self._fetch(start, stop)
+        if ids is None:
+            return list(self._fallback[start:stop])
+        rows = Product.objects.in_bulk(ids)
+        return [rows[id] for id in ids if id in rows]
+
+
+_index = PriceIndex()
+
+
+def get_price_index():
+    return _index
+
+
+def price_index_enabled():
+    return get_price_index_settings()["ENABLED"]
+
+
+def record_price_change(removed=(), added=()):
+    """
+    Update the price index once the current transaction commits. Writes
+    are published even while the index is disabled, so that enabling it
+    never serves an index that missed them.
+    """
+    transaction.on_commit(lambda: _index.record_write(removed, added))
+
+
+def mark_price_index_stale():
+    """Have every process rebuild its index after a bulk write commits."""
+    record_price_change()
+
+
+def lookup_price_range(price_min, price_max, fallback):
+    """
+    Products priced within the bounds, as a ``PriceRangeResult`` ordered
+    by price, or ``None`` if the index can't be used.
+    """
+    if not price_index_enabled():
+        return None
+    try:
+        result = _index.lookup(price_min, price_max)
+    except RedisError:
+        logger.warning("Price index unavailable, querying the database.",
+                       exc_info=True)
+        return None
+    if result is None:
+        return None
+    return PriceRangeResult(*result, fallback)
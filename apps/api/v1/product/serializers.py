@@ -6,3 +6,8 @@ class ProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = '__all__'
+
+    def validate_category(self, category):
+        if category.is_deleting:
+            raise serializers.ValidationError("Category is being deleted.")
+        return category
@@ -0,0 +1,107 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.api.v1.category.models import Category
+from apps.api.v1.category.stats import (
+    apply_product_added, apply_product_changed, apply_product_removed,
+)
+from .aggregates import incremental_updates_suspended
+from .facets import apply_summary_delta, get_bucket, get_facet_settings
+from .models import Product
+from .price_index import mark_price_index_stale, record_price_change, to_cents
+from .snapshot import record_snapshot_change, reset_snapshot
+
+
+def summary_enabled():
+    return get_facet_settings()["USE_SUMMARY"]
+
+
+@receiver(pre_save, sender=Product)
+def remember_previous_state(sender, instance, **kwargs):
+    instance._previous_state = None
+    if instance.pk and not incremental_updates_suspended():
+        instance._previous_state = (
+            Product.objects.filter(pk=instance.pk)
+            .values_list("category_id", "price").first()
+        )
+
+
+@receiver(post_save, sender=Product)
+def update_category_stats_on_save(sender, instance, created, **kwargs):
+    if incremental_updates_suspended():
+        return
+    previous = getattr(instance, "_previous_state", None)
+    if previous is None:
+        apply_product_added(instance.category_id, instance.price)
+        return
+    category_id, price = previous
+    if category_id != instance.category_id or price != Product._meta.get_field(
+            "price").to_python(instance.price):
+        apply_product_changed(category_id, price, instance.category_id, instance.price)
+
+
+@receiver(post_save, sender=Product)
+def update_facet_summary_on_save(sender, instance, created, **kwargs):
+    if incremental_updates_suspended() or not summary_enabled():
+        return
+    previous = getattr(instance, "_previous_state", None)
+    if previous is not None:
+        category_id, price = previous
+        bucket_size = get_facet_settings()["SUMMARY_BUCKET_SIZE"]
+        if (category_id == instance.category_id
+                and get_bucket(price, bucket_size) == get_bucket(instance.price, bucket_size)):
+            return
+        apply_summary_delta(category_id, price, -1)
+    apply_summary_delta(instance.category_id, instance.price, 1)
+
+
+@receiver(post_delete, sender=Product)
+def update_aggregates_on_delete(sender, instance, origin=None, **kwargs):
+    # Stats and summary rows of a deleted category go with the category.
+    if incremental_updates_suspended() or isinstance(origin, Category):
+        return
+    apply_product_removed(instance.category_id, instance.price)
+    if summary_enabled():
+        apply_summary_delta(instance.category_id, instance.price, -1)
+
+
+@receiver(post_save, sender=Product)
+def update_price_index_on_save(sender, instance, created, **kwargs):
+    if incremental_updates_suspended():
+        return
+    previous = getattr(instance, "_previous_state", None)
+    added = (to_cents(instance.price), instance.pk)
+    if previous is None:
+        record_price_change(added=[added])
+    elif to_cents(previous[1]) != added[0]:
+        record_price_change(removed=[instance.pk], added=[added])
+
+
+@receiver(post_delete, sender=Product)
+def update_price_index_on_delete(sender, instance, origin=None, **kwargs):
+    # Queryset and cascading deletes mark the index stale instead.
+    if incremental_updates_suspended() or isinstance(origin, Category):
+        return
+    record_price_change(removed=[instance.pk])
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def record_snapshot_change_on_write(sender, instance, origin=None, **kwargs):
+    # Queryset and cascading deletes reset the snapshot instead.
+    if incremental_updates_suspended() or isinstance(origin, Category):
+        return
+    record_snapshot_change(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+def reset_snapshot_on_category_change(sender, instance, created, **kwargs):
+    # Renames change which products the category filter matches.
+    if not created:
+        reset_snapshot()
+
+
+@receiver(post_delete, sender=Category)
+def mark_derived_data_stale_on_category_delete(sender, instance, **kwargs):
+    mark_price_index_stale()
+    reset_snapshot()
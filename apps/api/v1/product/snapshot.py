@@ -0,0 +1,413 @@
+"""
+Columnar, memory-mapped catalog snapshot for product list queries.
+
+``build_snapshot`` dumps products and categories into a directory of
+``.npy`` columns under ``CATALOG_SNAPSHOT['PATH']``. Text is stored as a
+string table, an offsets column into one UTF-8 blob. Datetimes are
+stored as epoch microseconds and prices in cents. It then points the
+``CURRENT`` file at the new directory. Workers open the columns with
+``mmap_mode='r'``, so all workers on a node share one page-cached copy,
+and they filter with vectorized NumPy operations. Only the rows of the
+requested page become ``Product`` instances.
+
+Product writes committed after a snapshot was built are recorded in a
+Redis sorted set, scored by Redis time. Queries skip those rows in the
+snapshot and read them from the database, then merge both into one
+ordered result. Bulk writes and category changes are recorded as a
+reset, and then queries go to the database until the next snapshot.
+
+Requires the optional ``numpy`` package. Without it, or without a
+snapshot, list queries use the database as before.
+"""
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import ROUND_CEILING, ROUND_FLOOR, Decimal
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django_redis import get_redis_connection
+from redis.commands.core import Script
+from redis.exceptions import RedisError
+
+from apps.api.constants.redis import REDIS_KEY_CATALOG_SNAPSHOT
+from apps.api.v1.category.models import Category
+from .models import Product
+from .price_index import to_cents
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+CURRENT_FILE = "CURRENT"
+DIRTY_KEY = f"{REDIS_KEY_CATALOG_SNAPSHOT}:dirty"
+RESET_KEY = f"{REDIS_KEY_CATALOG_SNAPSHOT}:reset"
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Record changed product ids (or a reset) at the current Redis time, so
+# every worker compares them against snapshot build times on one clock.
+RECORD_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+if #ARGV == 0 then
+    redis.call('SET', KEYS[2], tostring(now))
+else
+    for i = 1, #ARGV do
+        redis.call('ZADD', KEYS[1], now, ARGV[i])
+    end
+end
+return tostring(now)
+"""
+# Built once; the client is passed on every call.
+RECORD = Script(None, RECORD_SCRIPT.encode())
+
+
+def get_snapshot_settings():
+    return {
+        "ENABLED": False,
+        "PATH": Path(settings.BASE_DIR) / "snapshots" / "catalog",
+        # More changed rows than this since the snapshot and queries go
+        # to the database until the next one.
+        "MAX_DIRTY": 1000,
+        "CHUNK_SIZE": 10000,
+        # Dirty entries are kept this long after a snapshot supersedes
+        # them, for workers still reading the previous snapshot.
+        "DIRTY_RETENTION": 60 * 60,
+        **getattr(settings, "CATALOG_SNAPSHOT", {}),
+    }
+
+
+def snapshot_enabled():
+    return np is not None and get_snapshot_settings()["ENABLED"]
+
+
+def redis_time():
+    seconds, microseconds = get_redis_connection().time()
+    return seconds + microseconds / 1e6
+
+
+def to_micros(value):
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def from_micros(value):
+    return EPOCH + timedelta(microseconds=int(value))
+
+
+def from_cents(value):
+    return Decimal(int(value)).scaleb(-2)
+
+
+# Building
+
+def _write_strings(directory, name, values):
+    encoded = [value.encode() for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    np.save(directory / f"{name}_offsets.npy", offsets)
+    np.save(directory / f"{name}_data.npy", np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+
+def build_snapshot(path=None):
+    """
+    Dump the catalog into a new snapshot directory and make it current.
+    Returns the snapshot's metadata.
+    """
+    config = get_snapshot_settings()
+    root = Path(path or config["PATH"])
+    root.mkdir(parents=True, exist_ok=True)
+    # Writes committed after this instant are recorded as dirty with a
+    # later score; the ones before it are in the rows read below.
+    built_at = redis_time()
+    # A missing reset marker means Redis lost the recorded changes.
+    get_redis_connection().set(RESET_KEY, 0, nx=True)
+
+    columns = {name: [] for name in (
+        "id", "price", "category", "created_at", "updated_at",
+        "name", "description", "description_null")}
+    rows = (
+        Product.objects.order_by("id")
+        .values_list("id", "price", "category_id", "created_at",
+                     "updated_at", "name", "description")
+        .iterator(chunk_size=config["CHUNK_SIZE"])
+    )
+    for id, price, category_id, created_at, updated_at, name, description in rows:
+        columns["id"].append(id)
+        columns["price"].append(to_cents(price))
+        columns["category"].append(category_id)
+        columns["created_at"].append(to_micros(created_at))
+        columns["updated_at"].append(to_micros(updated_at))
+        columns["name"].append(name)
+        columns["description"].append(description or "")
+        columns["description_null"].append(description is None)
+    categories = list(Category.objects.order_by("id").values_list("id", "name"))
+
+    meta = {
+        "version": FORMAT_VERSION,
+        "name": f"{int(built_at * 1000)}-{uuid.uuid4().hex[:8]}",
+        "built_at": built_at,
+        "products": len(columns["id"]),
+        "categories": len(categories),
+    }
+    directory = root / meta["name"]
+    directory.mkdir()
+    for name in ("id", "price", "category", "created_at", "updated_at"):
+        np.save(directory / f"{name}.npy", np.array(columns[name], dtype=np.int64))
+    np.save(directory / "description_null.npy",
+            np.array(columns["description_null"], dtype=np.bool_))
+    _write_strings(directory, "name", columns["name"])
+    _write_strings(directory, "description", columns["description"])
+    prices = np.array(columns["price"], dtype=np.int64)
+    # Rows are in id order, so a stable sort by price orders by (price, id).
+    np.save(directory / "by_price.npy", np.argsort(prices, kind="stable"))
+    np.save(directory / "category_id.npy",
+            np.array([id for id, _ in categories], dtype=np.int64))
+    _write_strings(directory, "category_name", [name for _, name in categories])
+    (directory / "meta.json").write_text(json.dumps(meta))
+
+    pointer = root / f"{CURRENT_FILE}.tmp"
+    pointer.write_text(meta["name"])
+    os.replace(pointer, root / CURRENT_FILE)
+    _prune(root, keep={meta["name"]})
+    logger.info("Built catalog snapshot %s with %d products",
+                meta["name"], meta["products"])
+    return meta
+
+
+def _prune(root, keep):
+    """Remove all but the newest superseded snapshot. Workers that still
+    map a removed one keep reading it until they notice ``CURRENT``."""
+    superseded = sorted(
+        (entry for entry in root.iterdir()
+         if entry.is_dir() and entry.name not in keep),
+        key=lambda entry: entry.name)
+    for entry in superseded[:-1]:
+        shutil.rmtree(entry, ignore_errors=True)
+    try:
+        get_redis_connection().zremrangebyscore(
+            DIRTY_KEY, "-inf",
+            redis_time() - get_snapshot_settings()["DIRTY_RETENTION"])
+    except RedisError:
+        logger.warning("Could not trim catalog snapshot changes.", exc_info=True)
+
+
+# Change tracking
+
+def _record(ids=()):
+    try:
+        RECORD(keys=[DIRTY_KEY, RESET_KEY], args=list(ids),
+               client=get_redis_connection())
+    except RedisError:
+        # Lists may be served stale until the next snapshot.
+        logger.error("Could not record catalog snapshot change.", exc_info=True)
+
+
+def record_snapshot_change(*product_ids):
+    """Read ``product_ids`` from the database once the write commits."""
+    transaction.on_commit(lambda: _record(product_ids))
+
+
+def reset_snapshot():
+    """Stop serving from the current snapshot once the write commits."""
+    transaction.on_commit(_record)
+
+
+# Reading
+
+class StringColumn:
+    def __init__(self, directory, name):
+        self.offsets = np.load(directory / f"{name}_offsets.npy", mmap_mode="r")
+        self.data = np.load(directory / f"{name}_data.npy", mmap_mode="r")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        return self.data[self.offsets[index]:self.offsets[index + 1]].tobytes().decode()
+
+
+class CatalogSnapshot:
+    def __init__(self, directory):
+        directory = Path(directory)
+        self.meta = json.loads((directory / "meta.json").read_text())
+        if self.meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported catalog snapshot version {self.meta['version']}.")
+        self.name = self.meta["name"]
+        self.built_at = self.meta["built_at"]
+
+        def load(name):
+            return np.load(directory / f"{name}.npy", mmap_mode="r")
+
+        self.ids = load("id")
+        self.prices = load("price")
+        self.categories = load("category")
+        self.created_at = load("created_at")
+        self.updated_at = load("updated_at")
+        self.description_null = load("description_null")
+        self.by_price = load("by_price")
+        self.names = StringColumn(directory, "name")
+        self.descriptions = StringColumn(directory, "description")
+        self.category_ids = load("category_id")
+        self.category_names = StringColumn(directory, "category_name")
+
+    def __len__(self):
+        return len(self.ids)
+
+    def product(self, position):
+        """The product at ``position`` as an unsaved ``Product`` instance."""
+        return Product(
+            id=int(self.ids[position]),
+            name=self.names[position],
+            description=(None if self.description_null[position]
+                         else self.descriptions[position]),
+            price=from_cents(self.prices[position]),
+            category_id=int(self.categories[position]),
+            created_at=from_micros(self.created_at[position]),
+            updated_at=from_micros(self.updated_at[position]),
+        )
+
+    def select(self, category=None, price_min=None, price_max=None,
+               exclude_ids=(), by_price=False):
+        """
+        Positions of the products matching the filters, in id order, or in
+        ``(price, id)`` order with ``by_price``. ``category`` matches
+        category names case-insensitively, like the ``icontains`` filter.
+        """
+        mask = np.ones(len(self), dtype=np.bool_)
+        if category:
+            needle = category.lower()
+            matching = [
+                self.category_ids[i] for i in range(len(self.category_names))
+                if needle in self.category_names[i].lower()
+            ]
+            mask &= np.isin(self.categories, matching)
+        if price_min is not None:
+            mask &= self.prices >= to_cents(price_min, ROUND_CEILING)
+        if price_max is not None:
+            mask &= self.prices <= to_cents(price_max, ROUND_FLOOR)
+        if exclude_ids:
+            mask &= ~np.isin(self.ids, np.fromiter(exclude_ids, dtype=np.int64))
+        if by_price:
+            return self.by_price[mask[self.by_price]]
+        return np.flatnonzero(mask)
+
+
+class SnapshotResult:
+    """
+    A product list query answered from the snapshot and merged with the
+    database rows written since, as a sliceable sequence for the
+    paginator. ``db_rows`` holds those rows that match the filters, in
+    the same order.
+    """
+    ordered = True
+
+    def __init__(self, snapshot, positions, db_rows, by_price):
+        self.snapshot = snapshot
+        self.positions = positions
+        self.db_rows = db_rows
+        # Merged index of each database row: the number of snapshot rows
+        # sorting before it plus the database rows before it.
+        ids = snapshot.ids[positions]
+        if by_price:
+            prices = snapshot.prices[positions]
+            ranks = []
+            for product in db_rows:
+                cents = to_cents(product.price)
+                lo = int(np.searchsorted(prices, cents, "left"))
+                hi = int(np.searchsorted(prices, cents, "right"))
+                ranks.append(lo + int(np.searchsorted(ids[lo:hi], product.id)))
+        else:
+            ranks = [int(np.searchsorted(ids, product.id)) for product in db_rows]
+        self.db_positions = {rank + i: product
+                             for i, (rank, product) in enumerate(zip(ranks, db_rows))}
+
+    def count(self):
+        return len(self.positions) + len(self.db_rows)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start, stop, _ = key.indices(self.count())
+        db_before = sum(1 for position in self.db_positions if position < start)
+        page = []
+        for position in range(start, stop):
+            product = self.db_positions.get(position)
+            if product is None:
+                product = self.snapshot.product(int(self.positions[position - db_before]))
+            else:
+                db_before += 1
+            page.append(product)
+        return page
+
+
+_lock = threading.Lock()
+_current = {"pointer": None, "snapshot": None}
+
+
+def get_snapshot():
+    """The current snapshot, reopened when ``CURRENT`` changes, or ``None``."""
+    root = Path(get_snapshot_settings()["PATH"])
+    try:
+        name = (root / CURRENT_FILE).read_text().strip()
+    except FileNotFoundError:
+        return None
+    with _lock:
+        pointer = (str(root), name)
+        if _current["pointer"] != pointer:
+            _current["snapshot"] = CatalogSnapshot(root / name)
+            _current["pointer"] = pointer
+        return _current["snapshot"]
+
+
+def get_changes_since(built_at):
+    """Product ids written since ``built_at``, or ``None`` after a reset
+    or when the recorded changes were lost."""
+    pipe = get_redis_connection().pipeline(transaction=False)
+    pipe.get(RESET_KEY)
+    pipe.zrangebyscore(DIRTY_KEY, built_at, "+inf")
+    reset, dirty = pipe.execute()
+    if reset is None or float(reset) >= built_at:
+        return None
+    return {int(id) for id in dirty}
+
+
+def query_snapshot(cleaned_data, queryset):
+    """
+    Answer a product list query from the snapshot, or return ``None`` to
+    use the database. ``queryset`` is the filtered, ordered queryset the
+    rows written since the snapshot are read from.
+    """
+    if not snapshot_enabled():
+        return None
+    try:
+        snapshot = get_snapshot()
+        if snapshot is None:
+            return None
+        dirty = get_changes_since(snapshot.built_at)
+    except (OSError, ValueError, RedisError):
+        logger.warning("Catalog snapshot unavailable, querying the database.",
+                       exc_info=True)
+        return None
+    if dirty is None or len(dirty) > get_snapshot_settings()["MAX_DIRTY"]:
+        return None
+
+    price_min = cleaned_data.get("price_min")
+    price_max = cleaned_data.get("price_max")
+    by_price = price_min is not None or price_max is not None
+    positions = snapshot.select(
+        category=cleaned_data.get("category"), price_min=price_min,
+        price_max=price_max, exclude_ids=dirty, by_price=by_price)
+    db_rows = list(queryset.filter(pk__in=dirty)) if dirty else []
+    return SnapshotResult(snapshot, positions, db_rows, by_price)
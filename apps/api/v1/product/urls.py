@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import ProductListView, ProductDetailView
+from .views import ProductListView, ProductDetailView, ProductFacetView
 
 urlpatterns = [
     path('', ProductListView.as_view(), name='product-list'),          
+    path('facets/', ProductFacetView.as_view(), name='product-facets'),
     path('<int:id>/', ProductDetailView.as_view(), name='product-detail'),
 ]
@@ -1,201 +1,207 @@
+from django.db import transaction
 from rest_framework.views import APIView
-from rest_framework.pagination import PageNumberPagination
 from rest_framework import status
 from .models import Product
 from .serializers import ProductSerializer
 from apps.api.utils.response_formatter import format_response
 from apps.api.utils.exceptions import ApiException
 from .filters import ProductFilter
-from django.core.cache import cache
-from apps.api.constants.redis import REDIS_KEY_PRODUCTS
-from apps.api.utils.util import get_cache_key, delete_cache_by_pattern
-from rest_framework.response import Response
-
-
-class ProductListView(APIView):
-    def get(self, request):
-        try:
-            cache_key = get_cache_key(
-                REDIS_KEY_PRODUCTS, request.query_params)
-
-            cached_data = cache.get(cache_key)
-            if cached_data:
-                return Response(cached_data)
-
-            filterset = ProductFilter(
-                request.query_params, queryset=Product.objects.all())
-
-            if filterset.is_valid():
-                products = filterset.qs
+from .facets import get_product_facets, parse_bucket_size
+from .patching import (
+    PATCH_FIELDS, bulk_patch_products, format_version, get_patch_settings,
+    make_etag, parse_if_match, parse_version, patch_product,
+    precondition_failed,
+)
+from .price_index import lookup_price_range
+from .snapshot import query_snapshot
+from apps.api.constants.redis import (
+    REDIS_KEY_CATEGORIES, REDIS_KEY_PRODUCTS, REDIS_KEY_PRODUCT_FACETS)
+from apps.api.utils.resources import (
+    CachedDetailView, CachedListView, error_response,
+    get_or_fill_cached_response)
+from apps.api.utils.util import (
+    canonicalize_query_params, get_cache_key, normalize_param_value)
+
+
+class ProductResource:
+    queryset = Product.objects.all()
+    serializer_class = ProductSerializer
+    cache_prefix = REDIS_KEY_PRODUCTS
+    # Category stats are derived from products.
+    dependent_cache_prefixes = (REDIS_KEY_CATEGORIES,)
+
+
+class ProductListView(ProductResource, CachedListView):
+    filterset_class = ProductFilter
+
+    def filter_queryset(self, request):
+        filterset = self.get_filterset(request)
+        cleaned_data = filterset.form.cleaned_data
+        price_min = cleaned_data.get("price_min")
+        price_max = cleaned_data.get("price_max")
+        by_price = price_min is not None or price_max is not None
+        # Price ranges are listed in price order, whichever way they are served.
+        queryset = filterset.qs.order_by(*(("price", "id") if by_price else ("id",)))
+        from_snapshot = query_snapshot(cleaned_data, queryset)
+        if from_snapshot is not None:
+            return from_snapshot
+        if not by_price or cleaned_data.get("category"):
+            return queryset
+        indexed = lookup_price_range(price_min, price_max, queryset)
+        return queryset if indexed is None else indexed
+
+    def parse_bulk_patch(self, data):
+        """Validate a bulk PATCH payload into ``(id, fields, version)``."""
+        items = data.get("items") if isinstance(data, dict) else data
+        max_items = get_patch_settings()["MAX_BULK_ITEMS"]
+        if not isinstance(items, list) or not items or len(items) > max_items:
+            raise ApiException(
+                message=f"Expected a list of 1 to {max_items} items.",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+        parsed, errors, seen = [], {}, set()
+        for index, item in enumerate(items):
+            item = item if isinstance(item, dict) else {}
+            id, version = item.get("id"), item.get("version")
+            serializer = self.serializer_class(data=item, partial=True)
+            if not isinstance(id, int) or isinstance(id, bool) or id in seen:
+                errors[index] = {"id": ["A unique product id is required."]}
+            elif version is not None and (
+                    not isinstance(version, str) or parse_version(version) is None):
+                errors[index] = {"version": ["Not a product version."]}
+            elif not serializer.is_valid():
+                errors[index] = serializer.errors
+            elif not serializer.validated_data or not PATCH_FIELDS.issuperset(
+                    serializer.validated_data):
+                errors[index] = {"non_field_errors": [
+                    f"Expected some of: {', '.join(sorted(PATCH_FIELDS))}."]}
             else:
-                raise ApiException(
-                    message="Invalid filter parameters.",
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                )
-
-            paginator = PageNumberPagination()
-            paginator.page_size = 10
-
-            try:
-                paginated_products = paginator.paginate_queryset(
-                    products, request)
-            except Exception as e:
-                raise ApiException(
-                    message=str(e),
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                )
-
-            serializer = ProductSerializer(paginated_products, many=True)
-            paginator_data = paginator.get_paginated_response(serializer.data)
-
-            formatted_response = format_response(
-                success=True,
-                message="Products retrieved successfully.",
-                data=paginator_data.data['results'],
-                status_code=status.HTTP_200_OK
+                seen.add(id)
+                parsed.append((
+                    id, serializer.validated_data,
+                    None if version is None else parse_version(version),
+                ))
+        if errors:
+            raise ApiException(
+                message="Validation error occurred.",
+                status_code=status.HTTP_400_BAD_REQUEST,
+                data=errors,
             )
+        return parsed
 
-            formatted_response.data.update({
-                "count": paginator_data.data['count'],
-                "next": paginator_data.data['next'],
-                "previous": paginator_data.data['previous'],
-            })
-            cache.set(cache_key, formatted_response.data)
-
-            return formatted_response
-
-        except ApiException as e:
+    def patch(self, request):
+        """Patch many products, such as a price feed, with one UPDATE."""
+        try:
+            updated_at, results = bulk_patch_products(
+                self.parse_bulk_patch(request.data))
+            if status.HTTP_200_OK in results.values():
+                self.invalidate()
+            version = format_version(updated_at)
             return format_response(
-                success=False,
-                message=e.message,
-                data=None,
-                status_code=e.status_code,
+                success=True,
+                message="Products patched.",
+                data=[
+                    {"id": id, "status": code, "updated_at": version}
+                    if code == status.HTTP_200_OK else {"id": id, "status": code}
+                    for id, code in results.items()
+                ],
+                status_code=status.HTTP_200_OK,
             )
         except Exception as e:
-            return format_response(
-                success=False,
-                message=str(e),
-                data=None,
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+            return self.error_response(e)
+
+
+class ProductDetailView(ProductResource, CachedDetailView):
+    def patch_with_save(self, product_id, data, versions):
+        """Category changes move the incremental aggregates, so they are
+        saved through the model like a PUT, under the same precondition."""
+        with transaction.atomic():
+            product = self.get_queryset().select_for_update().get(id=product_id)
+            if versions is not None and product.updated_at not in versions:
+                raise precondition_failed()
+            serializer = self.serializer_class(product, data=data, partial=True)
+            if not serializer.is_valid():
+                raise ApiException(
+                    message="Validation error occurred.",
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    data=serializer.errors,
+                )
+            serializer.save()
+        return serializer.data, product.updated_at
 
-    def post(self, request):
+    def patch(self, request, id):
         try:
-            serializer = ProductSerializer(data=request.data)
-            if serializer.is_valid():
-                serializer.save()
-                delete_cache_by_pattern(f"{REDIS_KEY_PRODUCTS}*")
+            serializer = self.serializer_class(data=request.data, partial=True)
+            if not serializer.is_valid():
                 return format_response(
-                    success=True,
-                    message="Product created successfully.",
-                    data=serializer.data,
-                    status_code=status.HTTP_201_CREATED,
+                    success=False,
+                    message="Validation error occurred.",
+                    data=serializer.errors,
+                    status_code=status.HTTP_400_BAD_REQUEST,
                 )
-            return format_response(
-                success=False,
-                message="Validation error occurred.",
-                data=serializer.errors,
-                status_code=status.HTTP_400_BAD_REQUEST,
-            )
-        except Exception as e:
-            return format_response(
-                success=False,
-                message=str(e),
-                data=None,
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
-
-
-class ProductDetailView(APIView):
-    def get(self, _, id):
-        try:
-            cache_key = get_cache_key(REDIS_KEY_PRODUCTS, {"id": id})
-            cached_data = cache.get(cache_key)
-            if cached_data:
-                return Response(cached_data)
-            
-            product = Product.objects.get(id=id)
-            serializer = ProductSerializer(product)
+            fields = serializer.validated_data
+            if not fields:
+                raise ApiException(
+                    message="No fields to update.",
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                )
+            versions = parse_if_match(request.headers.get("If-Match"))
+            if PATCH_FIELDS.issuperset(fields):
+                updated_at = patch_product(id, fields, versions)
+                data = {
+                    "id": id,
+                    **{name: serializer.fields[name].to_representation(value)
+                       for name, value in fields.items()},
+                    "updated_at": format_version(updated_at),
+                }
+            else:
+                data, updated_at = self.patch_with_save(id, request.data, versions)
+            self.invalidate()
             response = format_response(
                 success=True,
-                message="Product retrieved successfully.",
-                data=serializer.data,
+                message="Product updated successfully.",
+                data=data,
                 status_code=status.HTTP_200_OK,
             )
-            
-            cache.set(cache_key, response.data)
+            response["ETag"] = make_etag(updated_at)
             return response
-        except Product.DoesNotExist:
-            return format_response(
-                success=False,
-                message="Product not found.",
-                data=None,
-                status_code=status.HTTP_404_NOT_FOUND,
-            )
         except Exception as e:
-            return format_response(
-                success=False,
-                message=str(e),
-                data=None,
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
-
-    def put(self, request, id):
-        try:
-            product = Product.objects.get(id=id)
-            serializer = ProductSerializer(product, data=request.data)
-            if serializer.is_valid():
-                serializer.save()
-                delete_cache_by_pattern(f"{REDIS_KEY_PRODUCTS}*")
-                return format_response(
-                    success=True,
-                    message="Product updated successfully.",
-                    data=serializer.data,
-                    status_code=status.HTTP_200_OK,
-                )
-            return format_response(
-                success=False,
-                message="Validation error occurred.",
-                data=serializer.errors,
+            return self.error_response(e)
+
+
+class ProductFacetView(APIView):
+    @staticmethod
+    def cache_key_for(query_params):
+        bucket_size = parse_bucket_size(query_params.get("bucket_size"))
+        canonical_params = canonicalize_query_params(
+            query_params, ProductFilter, page_query_param=None)
+        canonical_params["bucket_size"] = normalize_param_value(bucket_size)
+        return get_cache_key(
+            REDIS_KEY_PRODUCT_FACETS, dict(sorted(canonical_params.items())))
+
+    def build_response(self, request, bucket_size):
+        filterset = ProductFilter(
+            request.query_params, queryset=Product.objects.all())
+        if not filterset.is_valid():
+            raise ApiException(
+                message="Invalid filter parameters.",
                 status_code=status.HTTP_400_BAD_REQUEST,
             )
-        except Product.DoesNotExist:
-            return format_response(
-                success=False,
-                message="Product not found.",
-                data=None,
-                status_code=status.HTTP_404_NOT_FOUND,
-            )
-        except Exception as e:
-            return format_response(
-                success=False,
-                message=str(e),
-                data=None,
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+        return format_response(
+            success=True,
+            message="Product facets retrieved successfully.",
+            data=get_product_facets(filterset, bucket_size),
+            status_code=status.HTTP_200_OK,
+        )
 
-    def delete(self, request, id):
+    def get(self, request):
         try:
-            product = Product.objects.get(id=id)
-            product.delete()
-            delete_cache_by_pattern(f"{REDIS_KEY_PRODUCTS}*")
-            return format_response(
-                success=True,
-                message="Product deleted successfully.",
-                data=None,
-                status_code=status.HTTP_204_NO_CONTENT,
-            )
-        except Product.DoesNotExist:
-            return format_response(
-                success=False,
-                message="Product not found.",
-                data=None,
-                status_code=status.HTTP_404_NOT_FOUND,
-            )
+            bucket_size = parse_bucket_size(
+                request.query_params.get("bucket_size"))
+            cache_key = self.cache_key_for(request.query_params)
+
+            return get_or_fill_cached_response(
+                request, cache_key,
+                lambda: self.build_response(request, bucket_size))
         except Exception as e:
-            return format_response(
-                success=False,
-                message=str(e),
-                data=None,
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
+            return error_response(e)
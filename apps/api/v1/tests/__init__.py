@@ -1,5 +1,25 @@
 from .category.test_models import *
 from .category.test_views import *
+from .category.test_stats import *
+from .category.test_deletion import *
 
 from .product.test_models import *
-from .product.test_views import *
\ No newline at end of file
+from .product.test_views import *
+from .product.test_facets import *
+from .product.test_price_index import *
+from .product.test_snapshot import *
+from .product.test_patch import *
+
+from .performance.test_budgets import *
+
+from .utils.test_request_capture import *
+from .utils.test_renderers import *
+from .utils.test_compression import *
+from .utils.test_rate_limit import *
+from .utils.test_cache_keys import *
+from .utils.test_cache_warming import *
+from .utils.test_jobs import *
+from .utils.test_batch import *
+from .utils.test_resources import *
+from .utils.test_startup import *
+from .utils.test_redis_cache import *
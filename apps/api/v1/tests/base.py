@@ -0,0 +1,11 @@
+from django.test import TestCase, override_settings
+
+
+@override_settings(JOB_QUEUE={"BACKEND": "inline"}, PRICE_INDEX={"ENABLED": False})
+class ApiTestCase(TestCase):
+    """
+    Base for tests that go through the API. Background jobs run inline so
+    their effects are visible once the transaction commits, and product
+    lists are read from the database instead of the price index. Tests of
+    the other job backends or of the index override these settings.
+    """
@@ -0,0 +1,141 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.api.constants.redis import REDIS_KEY_CATEGORIES, REDIS_KEY_PRODUCTS
+from apps.api.utils.util import get_cache_key
+from apps.api.v1.category import deletion
+from apps.api.v1.category.models import Category
+from apps.api.v1.product.models import Product
+from apps.api.v1.tests.base import ApiTestCase
+
+DELETION_SETTINGS = {"BATCH_SIZE": 2, "INLINE_THRESHOLD": 3}
+
+
+@override_settings(CATEGORY_DELETION=DELETION_SETTINGS)
+class CategoryDeletionTests(ApiTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.detail_url = lambda id: f"/api/v1/categories/{id}/"
+        self.status_url = lambda id: f"/api/v1/categories/{id}/deletion/"
+        self.category = Category.objects.create(name="Books")
+        self.other = Category.objects.create(name="Games")
+        Product.objects.create(name="Game", price=10, category=self.other)
+        cache.clear()
+
+    def add_products(self, count):
+        Product.objects.bulk_create([
+            Product(name=f"Book {i}", price=10 + i, category=self.category)
+            for i in range(count)
+        ])
+
+    def test_small_category_deleted_inline(self):
+        """Test that small categories are deleted before responding."""
+        self.add_products(3)
+        response = self.client.delete(self.detail_url(self.category.id))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Category.objects.filter(id=self.category.id).exists())
+        self.assertEqual(Product.objects.count(), 1)
+
+    def test_products_deleted_in_batches(self):
+        """Test that products are removed in bounded batches."""
+        self.add_products(5)
+        self.assertEqual(
+            list(deletion.delete_products_in_batches(self.category.id, 2)), [2, 2, 1])
+        self.assertEqual(Product.objects.filter(category=self.category).count(), 0)
+
+    def test_large_category_deleted_in_background(self):
+        """Test that large categories are deleted by a background worker."""
+        self.add_products(5)
+        with mock.patch.object(deletion, "_start_worker") as start_worker, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(self.detail_url(self.category.id))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertTrue(response["Location"].endswith(self.status_url(self.category.id)))
+        self.assertEqual(response.json()["data"]["total"], 5)
+        start_worker.assert_called_once_with(self.category.id)
+
+        self.category.refresh_from_db()
+        self.assertTrue(self.category.is_deleting)
+        self.assertEqual(
+            self.client.get(self.detail_url(self.category.id)).status_code,
+            status.HTTP_404_NOT_FOUND)
+
+        deletion.run_category_deletion(self.category.id)
+        progress = self.client.get(self.status_url(self.category.id)).json()["data"]
+        self.assertEqual(progress["status"], deletion.STATUS_DONE)
+        self.assertEqual(progress["deleted"], 5)
+        self.assertFalse(Category.objects.filter(id=self.category.id).exists())
+
+    def test_progress_reported_per_batch(self):
+        """Test that progress is saved after every batch."""
+        self.add_products(5)
+        Category.objects.filter(id=self.category.id).update(is_deleting=True)
+        deleted = []
+        save = deletion.save_deletion_progress
+        with mock.patch.object(
+                deletion, "save_deletion_progress",
+                side_effect=lambda category_id, progress: (
+                    deleted.append(progress["deleted"]), save(category_id, progress))):
+            deletion.run_category_deletion(self.category.id)
+        # One save per batch, then the final "done".
+        self.assertEqual(deleted, [2, 4, 5, 5])
+
+    def test_caches_invalidated_once(self):
+        """Test that product and category caches are cleared once at the end."""
+        self.add_products(5)
+        product_key = get_cache_key(REDIS_KEY_PRODUCTS, {})
+        category_key = get_cache_key(REDIS_KEY_CATEGORIES, {})
+        cache.set(product_key, {"data": "cached"})
+        cache.set(category_key, {"data": "cached"})
+        with mock.patch.object(deletion, "invalidate_cache",
+                               wraps=deletion.invalidate_cache) as invalidate, \
+                self.captureOnCommitCallbacks(execute=True):
+            deletion.run_category_deletion(self.category.id)
+        invalidate.assert_called_once()
+        self.assertIsNone(cache.get(product_key))
+        self.assertIsNone(cache.get(category_key))
+
+    def test_running_deletion_conflicts(self):
+        """Test that a second delete of a running deletion is rejected."""
+        self.add_products(5)
+        with mock.patch.object(deletion, "_start_worker"):
+            self.client.delete(self.detail_url(self.category.id))
+            response = self.client.delete(self.detail_url(self.category.id))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_failed_deletion_can_resume(self):
+        """Test that a failed deletion is reported and can be restarted."""
+        self.add_products(3)
+        with mock.patch.object(deletion, "delete_products_in_batches",
+                               side_effect=RuntimeError("boom")):
+            response = self.client.delete(self.detail_url(self.category.id))
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        progress = self.client.get(self.status_url(self.category.id)).json()["data"]
+        self.assertEqual(progress["status"], deletion.STATUS_FAILED)
+
+        response = self.client.delete(self.detail_url(self.category.id))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Category.objects.filter(id=self.category.id).exists())
+
+    def test_products_rejected_for_deleting_category(self):
+        """Test that products cannot be added to a category being deleted."""
+        Category.objects.filter(id=self.category.id).update(is_deleting=True)
+        response = self.client.post(
+            "/api/v1/products/",
+            {"name": "Book", "price": 10, "category": self.category.id})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_deleting_category_hidden_from_list(self):
+        """Test that categories being deleted are not listed."""
+        Category.objects.filter(id=self.category.id).update(is_deleting=True)
+        data = self.client.get("/api/v1/categories/").json()["data"]
+        self.assertEqual([category["name"] for category in data], ["Games"])
+
+    def test_status_not_found(self):
+        """Test that the status endpoint 404s without a deletion."""
+        response = self.client.get(self.status_url(self.category.id))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
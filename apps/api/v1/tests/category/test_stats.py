@@ -0,0 +1,195 @@
+import warnings
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.paginator import UnorderedObjectListWarning
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.api.v1.category.models import Category
+from apps.api.v1.product.models import Product, ProductFacetSummary
+from apps.api.v1.tests.base import ApiTestCase
+from apps.api.v1.tests.product.test_facets import SUMMARY_SETTINGS
+
+
+class CategoryStatsTests(TestCase):
+    def setUp(self):
+        self.books = Category.objects.create(name="Books")
+        self.games = Category.objects.create(name="Games")
+        self.cheap = Product.objects.create(name="Cheap", price=5, category=self.books)
+        self.middle = Product.objects.create(name="Middle", price=12, category=self.books)
+        self.pricey = Product.objects.create(name="Pricey", price=30, category=self.books)
+
+    def assertStats(self, category, count, min_price, max_price):
+        category.refresh_from_db()
+        self.assertEqual(
+            (category.product_count, category.min_price, category.max_price),
+            (count,
+             None if min_price is None else Decimal(min_price),
+             None if max_price is None else Decimal(max_price)),
+        )
+
+    def test_stats_on_create(self):
+        """Test that creating products updates count and price range."""
+        self.assertStats(self.books, 3, "5", "30")
+        self.assertStats(self.games, 0, None, None)
+
+    def test_stats_on_price_change(self):
+        """Test that changing a price widens or recomputes the range."""
+        self.middle.price = 40
+        self.middle.save()
+        self.assertStats(self.books, 3, "5", "40")
+        self.cheap.price = 20
+        self.cheap.save()
+        self.assertStats(self.books, 3, "20", "40")
+
+    def test_stats_on_category_change(self):
+        """Test that moving a product updates both categories."""
+        self.pricey.category = self.games
+        self.pricey.save()
+        self.assertStats(self.books, 2, "5", "12")
+        self.assertStats(self.games, 1, "30", "30")
+
+    def test_stats_on_delete(self):
+        """Test that deleting products decrements and recomputes."""
+        self.middle.delete()
+        self.assertStats(self.books, 2, "5", "30")
+        self.cheap.delete()
+        self.pricey.delete()
+        self.assertStats(self.books, 0, None, None)
+
+    def test_stats_on_bulk_create(self):
+        """Test that bulk_create refreshes the affected categories."""
+        Product.objects.bulk_create([
+            Product(name="Game", price=60, category=self.games),
+            Product(name="Book", price=1, category=self.books),
+        ])
+        self.assertStats(self.books, 4, "1", "30")
+        self.assertStats(self.games, 1, "60", "60")
+
+    def test_stats_on_queryset_update(self):
+        """Test that queryset updates refresh old and new categories."""
+        Product.objects.filter(price__gte=10).update(category=self.games)
+        self.assertStats(self.books, 1, "5", "5")
+        self.assertStats(self.games, 2, "12", "30")
+        Product.objects.filter(category=self.games).update(price=7)
+        self.assertStats(self.games, 2, "7", "7")
+
+    def test_stats_on_bulk_update(self):
+        """Test that bulk_update refreshes the affected categories."""
+        self.cheap.price = 50
+        self.middle.category = self.games
+        Product.objects.bulk_update([self.cheap, self.middle], ["price", "category"])
+        self.assertStats(self.books, 2, "30", "50")
+        self.assertStats(self.games, 1, "12", "12")
+
+    def test_stats_on_queryset_delete(self):
+        """Test that queryset deletes refresh the category once."""
+        Product.objects.filter(price__lt=20).delete()
+        self.assertStats(self.books, 1, "30", "30")
+
+    def test_stats_rolled_back_with_product(self):
+        """Test that stats are not changed when the product write fails."""
+        with self.assertRaises(Exception):
+            Product.objects.create(name=None, price=1, category=self.books)
+        self.assertStats(self.books, 3, "5", "30")
+
+    @override_settings(PRODUCT_FACETS=SUMMARY_SETTINGS)
+    def test_bulk_paths_refresh_facet_summary(self):
+        """Test that bulk writes also refresh the facet summary."""
+        call_command("rebuild_product_facets", stdout=StringIO())
+        Product.objects.filter(price__lt=20).update(price=25)
+        rows = {
+            row.bucket: row.count
+            for row in ProductFacetSummary.objects.filter(
+                category=self.books, count__gt=0)
+        }
+        self.assertEqual(rows, {2: 2, 3: 1})
+
+    def test_reconcile_command(self):
+        """Test that the reconcile command fixes drifted stats in batches."""
+        Category.objects.filter(pk=self.books.pk).update(
+            product_count=99, min_price=0, max_price=None)
+        Category.objects.filter(pk=self.games.pk).update(product_count=4)
+        out = StringIO()
+        call_command("reconcile_category_stats", "--batch-size", "1", stdout=out)
+        self.assertIn("Checked 2 categories, fixed 2.", out.getvalue())
+        self.assertStats(self.books, 3, "5", "30")
+        self.assertStats(self.games, 0, None, None)
+
+
+class CategoryListStatsTests(ApiTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.category_url = "/api/v1/categories/"
+        self.books = Category.objects.create(name="Books")
+        self.games = Category.objects.create(name="Games")
+        self.empty = Category.objects.create(name="Empty")
+        for price in (5, 12):
+            Product.objects.create(name="Book", price=price, category=self.books)
+        Product.objects.create(name="Game", price=45, category=self.games)
+        cache.clear()
+
+    def names(self, params):
+        response = self.client.get(self.category_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [category["name"] for category in response.json()["data"]]
+
+    def test_list_exposes_stats(self):
+        """Test that categories are listed with their product stats."""
+        data = self.client.get(self.category_url, {"name": "books"}).json()["data"]
+        self.assertEqual(data[0]["product_count"], 2)
+        self.assertEqual(Decimal(data[0]["min_price"]), Decimal("5"))
+        self.assertEqual(Decimal(data[0]["max_price"]), Decimal("12"))
+
+    def test_list_ordering(self):
+        """Test that categories can be ordered by the stats."""
+        self.assertEqual(self.names({"ordering": "-product_count"}),
+                         ["Books", "Games", "Empty"])
+        self.assertEqual(self.names({"ordering": "-max_price"})[:2],
+                         ["Games", "Books"])
+
+    def test_list_order_stable(self):
+        """Test that pages are in id order by default and ties break by id."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", UnorderedObjectListWarning)
+            self.assertEqual(self.names({}), ["Books", "Games", "Empty"])
+        Category.objects.create(name="Toys")
+        cache.clear()
+        # Empty and Toys have no products; the older one comes first.
+        self.assertEqual(self.names({"ordering": "product_count"}),
+                         ["Empty", "Toys", "Games", "Books"])
+        self.assertEqual(self.names({"ordering": "-product_count"}),
+                         ["Books", "Games", "Empty", "Toys"])
+
+    def test_list_filters(self):
+        """Test that categories can be filtered by the stats."""
+        self.assertEqual(self.names({"product_count_min": 1, "ordering": "name"}),
+                         ["Books", "Games"])
+        self.assertEqual(self.names({"max_price_min": 20}), ["Games"])
+        self.assertEqual(self.names({"min_price_max": 10}), ["Books"])
+
+    def test_invalid_filter(self):
+        """Test that invalid filter values are rejected."""
+        response = self.client.get(self.category_url, {"product_count_min": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_stats_ignored_on_write(self):
+        """Test that the stats cannot be written through the API."""
+        response = self.client.post(
+            self.category_url, {"name": "New", "product_count": 10}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["data"]["product_count"], 0)
+
+    def test_product_write_invalidates_category_cache(self):
+        """Test that product writes invalidate cached category lists."""
+        self.assertEqual(self.client.get(self.category_url)["X-Cache"], "MISS")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/api/v1/products/",
+                             {"name": "New", "price": 1, "category": self.empty.id})
+        self.assertEqual(self.client.get(self.category_url)["X-Cache"], "MISS")
+        response = self.client.get(self.category_url, {"name": "empty"})
+        self.assertEqual(response.json()["data"][0]["product_count"], 1)
@@ -1,12 +1,12 @@
-from django.test import TestCase
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.core.cache import cache
 from apps.api.v1.category.models import Category
 from apps.api.constants.redis import REDIS_KEY_CATEGORIES
+from apps.api.v1.tests.base import ApiTestCase
 
 
-class CategoryViewTests(TestCase):
+class CategoryViewTests(ApiTestCase):
     def setUp(self):
         self.client = APIClient()
         self.category_url = "/api/v1/categories/"
@@ -29,7 +29,8 @@ class CategoryViewTests(TestCase):
             "success": True,
             "message": "Categories retrieved successfully.",
             "data": [
-                {"id": self.category.id, "name": self.category.name, "description": self.category.description},
+                {"id": self.category.id, "name": self.category.name, "description": self.category.description,
+                 "product_count": 0, "min_price": None, "max_price": None},
             ],
             "count": 1,
             "next": None,
@@ -86,7 +87,8 @@ class CategoryViewTests(TestCase):
         """Test that the cache is invalidated when a new category is created."""
         cache_key = f"{REDIS_KEY_CATEGORIES}:page=1"
         cache.set(cache_key, {"data": "cached data"})
-        self.client.post(self.category_url, self.category_data)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.category_url, self.category_data)
         self.assertIsNone(cache.get(cache_key))
 
     def test_category_cache_invalidation_on_update(self):
@@ -94,12 +96,14 @@ class CategoryViewTests(TestCase):
         cache_key = f"{REDIS_KEY_CATEGORIES}:page=1"
         cache.set(cache_key, {"data": "cached data"})
         updated_data = {"name": "Updated Category"}
-        self.client.put(self.detail_url(self.category.id), updated_data)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(self.detail_url(self.category.id), updated_data)
         self.assertIsNone(cache.get(cache_key))
 
     def test_category_cache_invalidation_on_delete(self):
         """Test that the cache is invalidated when a category is deleted."""
         cache_key = f"{REDIS_KEY_CATEGORIES}:page=1"
         cache.set(cache_key, {"data": "cached data"})
-        self.client.delete(self.detail_url(self.category.id))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(self.detail_url(self.category.id))
         self.assertIsNone(cache.get(cache_key))
@@ -0,0 +1,218 @@
+"""
+Performance budgets for API endpoints.
+
+Each scenario in ``budgets.json`` caps the SQL queries, Redis commands and
+wall time of one request against the catalog seeded by ``seed_catalog()``:
+
+    "products.list.miss": {"queries": 2, "redis_commands": 5, "ms": 60,
+                           "sql": [...], "redis": [...]}
+
+``sql`` and ``redis`` are the normalized statements and command names the
+budget was recorded with. When a count is exceeded, the failure shows a
+diff of the measured statements against them, so an N+1 shows up as a run
+of repeated ``+`` lines. Budgets are upper bounds: tighten them by editing
+the file, or rerun with ``PERFORMANCE_BUDGETS_RECORD=1`` to rewrite the
+counts and statements from the measurements (``ms`` is kept).
+
+Wall time is the fastest of ``runs`` requests. It is only checked when
+``PERFORMANCE_BUDGETS_TIME_FACTOR`` is set, scaling the ``ms`` budgets
+(``1`` on the machine they were recorded on), since timings on shared CI
+runners are too noisy for the default test run.
+Background jobs are recorded but not run, since they run off the request
+path.
+"""
+import difflib
+import json
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.db.backends.utils import CursorWrapper
+from redis.client import Pipeline, Redis
+
+from apps.api.v1.category.models import Category
+from apps.api.v1.product.models import Product
+
+BUDGETS_PATH = Path(__file__).with_name("budgets.json")
+
+# Literals vary between runs; the statement shapes don't.
+SQL_LITERALS = [
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\((?:\?, )+\?\)"), "(...)"),
+    (re.compile(r'"s\w+_x\d+"'), "?"),
+]
+
+
+def normalize_sql(sql):
+    for pattern, replacement in SQL_LITERALS:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+def load_budgets():
+    with open(BUDGETS_PATH) as f:
+        return json.load(f)
+
+
+def record_budget(name, measurement):
+    budgets = load_budgets()
+    budget = budgets.setdefault(name, {})
+    budget.update({
+        "queries": len(measurement.sql),
+        "redis_commands": len(measurement.redis),
+        "ms": budget.get("ms", max(50, round(measurement.ms * 5))),
+        "sql": measurement.sql,
+        "redis": measurement.redis,
+    })
+    with open(BUDGETS_PATH, "w") as f:
+        json.dump(dict(sorted(budgets.items())), f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def seed_catalog():
+    """A fixed catalog of 6 categories and 120 products."""
+    rng = random.Random(42)
+    categories = [
+        Category.objects.create(name=name)
+        for name in ("Books", "Games", "Music", "Garden", "Toys", "Kitchen")
+    ]
+    Product.objects.bulk_create([
+        Product(
+            name=f"Product {i}",
+            description=None if i % 4 else f"Description of product {i}",
+            price=Decimal(rng.randrange(100, 10000)) / 100,
+            category=categories[i % len(categories)],
+        )
+        for i in range(120)
+    ])
+    return categories
+
+
+@contextmanager
+def capture_queries():
+    """
+    Collect every SQL statement run, on any connection. Batch sub-requests
+    run on other threads, which ``CaptureQueriesContext`` would miss.
+    """
+    statements = []
+    execute = CursorWrapper._execute
+    executemany = CursorWrapper._executemany
+
+    def counting_execute(self, sql, *args):
+        statements.append(sql)
+        return execute(self, sql, *args)
+
+    def counting_executemany(self, sql, *args):
+        statements.append(sql)
+        return executemany(self, sql, *args)
+
+    with mock.patch.object(CursorWrapper, "_execute", counting_execute), \
+            mock.patch.object(CursorWrapper, "_executemany", counting_executemany):
+        yield statements
+
+
+@contextmanager
+def capture_redis_commands():
+    """Collect the name of every Redis command sent, pipelined or not."""
+    commands = []
+    lock = threading.Lock()
+    execute_command = Redis.execute_command
+    execute_pipeline = Pipeline.execute
+
+    def record(*names):
+        with lock:
+            commands.extend(str(name).upper() for name in names)
+
+    def counting_execute_command(self, *args, **options):
+        record(args[0])
+        return execute_command(self, *args, **options)
+
+    def counting_execute_pipeline(self, *args, **kwargs):
+        record(*(command_args[0] for command_args, _ in self.command_stack))
+        return execute_pipeline(self, *args, **kwargs)
+
+    with mock.patch.object(Redis, "execute_command", counting_execute_command), \
+            mock.patch.object(Pipeline, "execute", counting_execute_pipeline):
+        yield commands
+
+
+class Measurement:
+    def __init__(self, sql, redis, jobs, ms):
+        self.sql = sql
+        self.redis = redis
+        self.jobs = jobs
+        self.ms = ms
+
+
+class PerformanceBudgetMixin:
+    """Mixin for ``TestCase`` classes that check requests against budgets."""
+    runs = 3
+
+    def measure(self, make_request, cold=True):
+        """
+        Run ``make_request()`` ``runs`` times and measure the last run.
+        ``cold`` requests start from an empty cache; warm ones from the
+        cache the first run filled.
+        """
+        times = []
+        for _ in range(self.runs):
+            if cold:
+                cache.clear()
+            jobs = []
+            with capture_queries() as queries, \
+                    capture_redis_commands() as commands, \
+                    mock.patch("apps.api.utils.jobs.enqueue",
+                               lambda func, *args: jobs.append(getattr(func, "__name__", func))):
+                start = time.perf_counter()
+                # Commit hooks run in the request outside of tests.
+                with self.captureOnCommitCallbacks(execute=True):
+                    response = make_request()
+                times.append((time.perf_counter() - start) * 1000)
+            self.assertLess(response.status_code, 400, getattr(response, "data", None))
+        return Measurement(
+            [normalize_sql(sql) for sql in queries],
+            commands, jobs, min(times))
+
+    def budget_failures(self, budget, measurement):
+        failures = []
+        for label, key, measured, recorded in (
+                ("SQL queries", "queries", measurement.sql, budget.get("sql", [])),
+                ("Redis commands", "redis_commands", measurement.redis,
+                 budget.get("redis", []))):
+            if len(measured) > budget[key]:
+                diff = difflib.unified_diff(
+                    recorded, measured, "budgets.json", "measured", lineterm="", n=1)
+                failures.append(
+                    f"{label}: {len(measured)} > {budget[key]}\n"
+                    + "\n".join(f"    {line}" for line in diff))
+        time_factor = os.environ.get("PERFORMANCE_BUDGETS_TIME_FACTOR")
+        if time_factor is None:
+            return failures
+        time_factor = float(time_factor)
+        if measurement.ms > budget["ms"] * time_factor:
+            failures.append(
+                f"Wall time: {measurement.ms:.1f} ms > {budget['ms'] * time_factor:g} ms")
+        return failures
+
+    def assertWithinBudget(self, name, make_request, cold=True):
+        measurement = self.measure(make_request, cold)
+        if os.environ.get("PERFORMANCE_BUDGETS_RECORD"):
+            record_budget(name, measurement)
+            return measurement
+        budget = load_budgets().get(name)
+        if budget is None:
+            self.fail(f"No budget for {name!r} in {BUDGETS_PATH.name}; "
+                      "record one with PERFORMANCE_BUDGETS_RECORD=1.")
+        failures = self.budget_failures(budget, measurement)
+        if failures:
+            self.fail(f"{name} is over budget:\n" + "\n".join(failures))
+        return measurement
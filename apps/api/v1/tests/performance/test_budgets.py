@@ -0,0 +1,108 @@
+import os
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.api.v1.product.models import Product
+from apps.api.v1.tests.performance.budget import (
+    Measurement, PerformanceBudgetMixin, normalize_sql, seed_catalog,
+)
+
+
+class EndpointBudgetTests(PerformanceBudgetMixin, TestCase):
+    """Query, Redis command and wall time budgets from budgets.json."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.categories = seed_catalog()
+        cls.product_ids = list(Product.objects.order_by("id").values_list("id", flat=True))
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def get(self, path, params=None):
+        return lambda: self.client.get(path, params)
+
+    def test_product_list(self):
+        """Test that product list pages stay within budget, cached or not."""
+        self.assertWithinBudget("products.list.miss", self.get(
+            "/api/v1/products/", {"page": 2}))
+        self.assertWithinBudget("products.list.hit", self.get(
+            "/api/v1/products/", {"page": 2}), cold=False)
+
+    def test_product_list_filtered(self):
+        """Test that filtered product lists stay within budget."""
+        self.assertWithinBudget("products.list.filtered.miss", self.get(
+            "/api/v1/products/", {"category": "games", "price_min": 10, "price_max": 80}))
+
+    def test_product_detail(self):
+        """Test that product details stay within budget, cached or not."""
+        path = f"/api/v1/products/{self.product_ids[0]}/"
+        self.assertWithinBudget("products.detail.miss", self.get(path))
+        self.assertWithinBudget("products.detail.hit", self.get(path), cold=False)
+
+    def test_product_facets(self):
+        """Test that product facets stay within budget."""
+        self.assertWithinBudget("products.facets.miss", self.get(
+            "/api/v1/products/facets/", {"category": "books"}))
+
+    def test_product_patch(self):
+        """Test that a single product PATCH stays within budget."""
+        self.assertWithinBudget("products.patch", lambda: self.client.patch(
+            f"/api/v1/products/{self.product_ids[0]}/", {"price": "12.34"},
+            format="json"))
+
+    def test_product_bulk_patch(self):
+        """Test that a bulk price feed stays within budget."""
+        items = [{"id": id, "price": "9.99"} for id in self.product_ids[:50]]
+        self.assertWithinBudget("products.bulk_patch", lambda: self.client.patch(
+            "/api/v1/products/", items, format="json"))
+
+    def test_category_list(self):
+        """Test that category lists stay within budget, cached or not."""
+        self.assertWithinBudget("categories.list.miss", self.get(
+            "/api/v1/categories/", {"ordering": "-product_count"}))
+        self.assertWithinBudget("categories.list.hit", self.get(
+            "/api/v1/categories/", {"ordering": "-product_count"}), cold=False)
+
+    def test_category_detail(self):
+        """Test that category details stay within budget."""
+        self.assertWithinBudget("categories.detail.miss", self.get(
+            f"/api/v1/categories/{self.categories[0].id}/"))
+
+    # Test transactions lock the tables for the batch's worker threads.
+    @override_settings(BATCH={"WORKERS": 1})
+    def test_batch_reads(self):
+        """Test that a batch of reads stays within budget."""
+        self.assertWithinBudget("batch.reads.miss", lambda: self.client.post(
+            "/api/v1/batch/", {"requests": [
+                {"path": "/api/v1/products/?page=3"},
+                {"path": f"/api/v1/products/{self.product_ids[1]}/"},
+                {"path": "/api/v1/categories/"},
+            ]}, format="json"))
+
+
+class BudgetReportTests(PerformanceBudgetMixin, TestCase):
+    def test_normalize_sql(self):
+        """Test that literals are dropped from recorded statements."""
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'a''b' LIMIT 10"),
+            "SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?")
+
+    def test_failure_shows_query_diff(self):
+        """Test that an exceeded budget reports the extra statements."""
+        budget = {"queries": 1, "redis_commands": 2, "ms": 1000,
+                  "sql": ["SELECT list"], "redis": ["GET", "SET"]}
+        measurement = Measurement(
+            ["SELECT list", "SELECT item", "SELECT item"], ["GET"], [], 5)
+        failures = self.budget_failures(budget, measurement)
+        self.assertEqual(len(failures), 1)
+        self.assertIn("SQL queries: 3 > 1", failures[0])
+        self.assertIn("+SELECT item", failures[0])
+
+        measurement.ms = 2000
+        self.assertEqual(len(self.budget_failures(budget, measurement)), 1)
+        with mock.patch.dict(os.environ, {"PERFORMANCE_BUDGETS_TIME_FACTOR": "1.5"}):
+            self.assertIn("Wall time: 2000.0 ms > 1500 ms",
+                          self.budget_failures(budget, measurement)[-1])
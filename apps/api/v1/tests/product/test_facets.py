@@ -0,0 +1,193 @@
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.api.utils.exceptions import ApiException
+from apps.api.v1.category.models import Category
+from apps.api.v1.product.facets import compute_facets, get_bucket, rebuild_summary
+from apps.api.v1.product.models import Product, ProductFacetSummary
+from apps.api.v1.tests.base import ApiTestCase
+
+BOUNDARY_PRICES = ("0.30", "0.29", "0.70", "1.00", "-0.05", "-0.10", "12345678.90")
+
+SUMMARY_SETTINGS = {
+    "DEFAULT_BUCKET_SIZE": Decimal("10"),
+    "USE_SUMMARY": True,
+    "SUMMARY_BUCKET_SIZE": Decimal("10"),
+}
+
+
+class ProductFacetViewTests(ApiTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.facets_url = "/api/v1/products/facets/"
+        self.books = Category.objects.create(name="Books")
+        self.games = Category.objects.create(name="Games")
+        for price in (5, 12, 18):
+            Product.objects.create(name="Book", price=price, category=self.books)
+        for price in (25, 45):
+            Product.objects.create(name="Game", price=price, category=self.games)
+        cache.clear()
+
+    def test_category_counts(self):
+        """Test that products are counted per category."""
+        data = self.client.get(self.facets_url).json()["data"]
+        self.assertEqual(data["count"], 5)
+        self.assertEqual(data["categories"], [
+            {"id": self.books.id, "name": "Books", "count": 3},
+            {"id": self.games.id, "name": "Games", "count": 2},
+        ])
+
+    def test_price_histogram(self):
+        """Test that prices are bucketed by bucket_size."""
+        data = self.client.get(self.facets_url, {"bucket_size": 20}).json()["data"]
+        self.assertEqual(data["price_histogram"], [
+            {"min": 0.0, "max": 20.0, "count": 3},
+            {"min": 20.0, "max": 40.0, "count": 1},
+            {"min": 40.0, "max": 60.0, "count": 1},
+        ])
+
+    def test_filters_respected(self):
+        """Test that ProductFilter parameters narrow the facets."""
+        data = self.client.get(
+            self.facets_url, {"price_min": 10, "category": "book"}).json()["data"]
+        self.assertEqual(data["count"], 2)
+        self.assertEqual(data["categories"][0]["count"], 2)
+
+    def test_invalid_bucket_size(self):
+        """Test that an invalid bucket_size is rejected."""
+        for bucket_size in ("0", "0.015", "x"):
+            with self.subTest(bucket_size=bucket_size):
+                response = self.client.get(self.facets_url, {"bucket_size": bucket_size})
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_category_rename_invalidates(self):
+        """Test that renaming a category drops the cached facets."""
+        self.client.get(self.facets_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(
+                f"/api/v1/categories/{self.books.id}/", {"name": "Novels"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(self.facets_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(
+            [category["name"] for category in response.json()["data"]["categories"]],
+            ["Games", "Novels"])
+
+    def test_fractional_buckets_exact(self):
+        """Test that SQL buckets agree with get_bucket on bucket boundaries."""
+        for price in BOUNDARY_PRICES:
+            Product.objects.create(name="Edge", price=price, category=self.books)
+        for bucket_size in (Decimal("0.1"), Decimal("0.07"), Decimal("10")):
+            with self.subTest(bucket_size=bucket_size):
+                histogram = compute_facets(Product.objects.all(), bucket_size)["price_histogram"]
+                expected = {}
+                for price in Product.objects.values_list("price", flat=True):
+                    bucket = get_bucket(price, bucket_size)
+                    expected[bucket * bucket_size] = expected.get(bucket * bucket_size, 0) + 1
+                self.assertEqual({row["min"]: row["count"] for row in histogram}, expected)
+
+    def test_invalid_filter(self):
+        """Test that invalid filter values are rejected."""
+        response = self.client.get(self.facets_url, {"price_min": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_error_data_returned(self):
+        """Test that errors are formatted like the other cached views."""
+        error = ApiException(message="Busy.", status_code=503, data={"retry": True})
+        with mock.patch("apps.api.v1.product.views.get_product_facets", side_effect=error):
+            response = self.client.get(self.facets_url)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.json()["data"], {"retry": True})
+
+    def test_facets_cached_and_invalidated(self):
+        """Test that facets are cached and invalidated with product lists."""
+        self.assertEqual(self.client.get(self.facets_url)["X-Cache"], "MISS")
+        self.assertEqual(self.client.get(self.facets_url)["X-Cache"], "HIT")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/api/v1/products/",
+                             {"name": "New", "price": 1, "category": self.books.id})
+        response = self.client.get(self.facets_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["data"]["count"], 6)
+
+
+@override_settings(PRODUCT_FACETS=SUMMARY_SETTINGS)
+class ProductFacetSummaryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.facets_url = "/api/v1/products/facets/"
+        self.books = Category.objects.create(name="Books")
+        self.games = Category.objects.create(name="Games")
+        self.book = Product.objects.create(name="Book", price=5, category=self.books)
+        Product.objects.create(name="Book", price=12, category=self.books)
+        Product.objects.create(name="Game", price=25, category=self.games)
+        cache.clear()
+
+    def summary(self):
+        return {
+            (row.category_id, row.bucket): row.count
+            for row in ProductFacetSummary.objects.filter(count__gt=0)
+        }
+
+    def test_summary_maintained_on_create(self):
+        """Test that creating products increments the summary."""
+        self.assertEqual(self.summary(), {
+            (self.books.id, 0): 1, (self.books.id, 1): 1, (self.games.id, 2): 1,
+        })
+
+    def test_summary_maintained_on_update(self):
+        """Test that moving a product decrements its old bucket."""
+        self.book.price = 35
+        self.book.category = self.games
+        self.book.save()
+        self.assertEqual(self.summary(), {
+            (self.books.id, 1): 1, (self.games.id, 2): 1, (self.games.id, 3): 1,
+        })
+
+    def test_summary_maintained_on_delete(self):
+        """Test that deleting a product decrements the summary."""
+        self.book.delete()
+        self.assertEqual(self.summary(), {
+            (self.books.id, 1): 1, (self.games.id, 2): 1,
+        })
+
+    def test_summary_removed_with_category(self):
+        """Test that deleting a category drops its summary rows."""
+        self.books.delete()
+        self.assertEqual(self.summary(), {(self.games.id, 2): 1})
+
+    def test_summary_matches_aggregate(self):
+        """Test that summary-backed facets equal the aggregate ones."""
+        with self.assertNumQueries(2):
+            from_summary = self.client.get(
+                self.facets_url, {"bucket_size": 20, "category": "books"}).json()
+        cache.clear()
+        with override_settings(PRODUCT_FACETS={**SUMMARY_SETTINGS, "USE_SUMMARY": False}):
+            from_aggregate = self.client.get(
+                self.facets_url, {"bucket_size": 20, "category": "books"}).json()
+        self.assertEqual(from_summary, from_aggregate)
+
+    @override_settings(PRODUCT_FACETS={**SUMMARY_SETTINGS, "SUMMARY_BUCKET_SIZE": Decimal("0.1")})
+    def test_fractional_summary_rebuild_matches(self):
+        """Test that a rebuilt summary equals the incrementally kept one."""
+        ProductFacetSummary.objects.all().delete()
+        rebuild_summary()
+        for price in BOUNDARY_PRICES:
+            Product.objects.create(name="Edge", price=price, category=self.books)
+        maintained = self.summary()
+        rebuild_summary()
+        self.assertEqual(self.summary(), maintained)
+
+    def test_rebuild_command(self):
+        """Test that the summary can be rebuilt from products."""
+        expected = self.summary()
+        ProductFacetSummary.objects.all().delete()
+        call_command("rebuild_product_facets", stdout=StringIO())
+        self.assertEqual(self.summary(), expected)
@@ -0,0 +1,190 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.api.v1.category.models import Category
+from apps.api.v1.product.models import Product
+from apps.api.v1.product.price_index import PriceIndex
+from apps.api.v1.tests.base import ApiTestCase
+
+
+class ProductPatchTests(ApiTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.detail_url = lambda id: f"/api/v1/products/{id}/"
+        self.books = Category.objects.create(name="Books")
+        self.games = Category.objects.create(name="Games")
+        self.product = Product.objects.create(
+            name="Chess", description="Classic", price=20, category=self.books)
+        self.other = Product.objects.create(name="Go", price=30, category=self.books)
+        cache.clear()
+
+    def etag(self, product):
+        product.refresh_from_db()
+        response = self.client.get(self.detail_url(product.id))
+        return f'"{response.json()["data"]["updated_at"]}"'
+
+    def patch(self, id, data, if_match=None):
+        headers = {} if if_match is None else {"If-Match": if_match}
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.patch(self.detail_url(id), data, format="json",
+                                     headers=headers)
+
+    def test_patch_is_one_update(self):
+        """Test that a PATCH writes only its fields in one statement."""
+        with self.captureOnCommitCallbacks(execute=True), \
+                self.assertNumQueries(1) as queries:
+            response = self.client.patch(
+                self.detail_url(self.product.id), {"price": "25.50"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        sql = queries.captured_queries[0]["sql"]
+        self.assertTrue(sql.startswith("UPDATE"))
+        self.assertNotIn('"name"', sql)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.price, Decimal("25.50"))
+        self.assertEqual(self.product.description, "Classic")
+
+    def test_returns_new_version(self):
+        """Test that the response carries the new version as its ETag."""
+        old = self.etag(self.product)
+        response = self.patch(self.product.id, {"name": "Chess 2"})
+        data = response.json()["data"]
+        self.assertEqual(set(data), {"id", "name", "updated_at"})
+        self.assertEqual(response["ETag"], f'"{data["updated_at"]}"')
+        self.assertNotEqual(response["ETag"], old)
+        self.assertEqual(response["ETag"], self.etag(self.product))
+
+    def test_if_match(self):
+        """Test that If-Match accepts the current version only."""
+        stale = self.etag(self.product)
+        response = self.patch(self.product.id, {"price": 21}, if_match=stale)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        current = response["ETag"]
+
+        response = self.patch(self.product.id, {"price": 22}, if_match=stale)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        response = self.patch(self.product.id, {"price": 22},
+                              if_match=f'"bogus", W/{current}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.patch(self.product.id, {"price": 23}, if_match="*")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.price, 23)
+
+    def test_missing_product(self):
+        """Test that patching a missing product returns 404."""
+        response = self.patch(999, {"price": 1})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.patch(999, {"price": 1}, if_match='"x"')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_validates_given_fields_only(self):
+        """Test that only the provided fields are validated."""
+        response = self.patch(self.product.id, {"price": "abc"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("price", response.json()["data"])
+        response = self.patch(self.product.id, {})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_category_change_moves_stats(self):
+        """Test that category changes go through save and move the stats."""
+        response = self.patch(
+            self.product.id, {"category": self.games.id},
+            if_match=self.etag(self.product))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["ETag"], f'"{response.json()["data"]["updated_at"]}"')
+        self.games.refresh_from_db()
+        self.books.refresh_from_db()
+        self.assertEqual((self.games.product_count, self.books.product_count), (1, 1))
+
+    def test_derived_data_refreshed(self):
+        """Test that stats, caches and the price index follow a PATCH."""
+        self.client.get("/api/v1/products/")
+        index = PriceIndex()
+        with override_settings(PRICE_INDEX={"ENABLED": True}), \
+                mock.patch("apps.api.v1.product.price_index._index", index):
+            index.rebuild()
+            with mock.patch.object(index, "_start_rebuild") as rebuild:
+                self.patch(self.product.id, {"price": 99})
+                count, fetch = index.lookup(Decimal("50"))
+            rebuild.assert_not_called()
+        self.assertEqual(fetch(0, count), [self.product.id])
+        self.books.refresh_from_db()
+        self.assertEqual(self.books.max_price, Decimal("99"))
+        response = self.client.get("/api/v1/products/")
+        self.assertEqual(response["X-Cache"], "MISS")
+
+
+class ProductBulkPatchTests(ApiTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.product_url = "/api/v1/products/"
+        self.books = Category.objects.create(name="Books")
+        self.products = [
+            Product.objects.create(name=f"P{i}", price=10 + i, category=self.books)
+            for i in range(4)
+        ]
+        cache.clear()
+
+    def bulk_patch(self, items):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.patch(self.product_url, items, format="json")
+
+    def test_price_feed(self):
+        """Test that a feed is written with one UPDATE."""
+        items = [{"id": p.id, "price": f"{i}.99"} for i, p in enumerate(self.products)]
+        with self.captureOnCommitCallbacks(execute=True), \
+                self.assertNumQueries(3) as queries:
+            response = self.client.patch(self.product_url, items, format="json")
+        # The UPDATE between the savepoint statements of the transaction.
+        self.assertTrue(queries.captured_queries[1]["sql"].startswith("UPDATE"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({item["status"] for item in response.json()["data"]}, {200})
+        self.assertEqual(
+            [str(p.price) for p in Product.objects.order_by("id")],
+            ["0.99", "1.99", "2.99", "3.99"])
+        self.books.refresh_from_db()
+        self.assertEqual(self.books.min_price, Decimal("0.99"))
+
+    def test_per_item_results(self):
+        """Test that conflicts and missing ids don't block the other items."""
+        first, second = self.products[:2]
+        stale = first.updated_at.isoformat()
+        first.name = "Changed"
+        first.save()
+        response = self.bulk_patch({"items": [
+            {"id": first.id, "price": 1, "version": f'"{stale}"'},
+            {"id": second.id, "price": 2, "name": "Renamed",
+             "version": second.updated_at.isoformat()},
+            {"id": 999, "price": 3},
+        ]})
+        self.assertEqual(
+            [(item["id"], item["status"]) for item in response.json()["data"]],
+            [(first.id, 412), (second.id, 200), (999, 404)])
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.price, 10)
+        self.assertEqual((second.name, second.price), ("Renamed", 2))
+
+    def test_invalid_items(self):
+        """Test that any invalid item rejects the whole feed."""
+        product = self.products[0]
+        for items in ([], [{"id": product.id, "price": "x"}],
+                      [{"id": product.id, "category": self.books.id}],
+                      [{"id": product.id, "price": 1}, {"id": product.id, "price": 2}],
+                      [{"id": product.id, "price": 1, "version": "soon"}]):
+            with self.subTest(items=items):
+                response = self.bulk_patch(items)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        product.refresh_from_db()
+        self.assertEqual(product.price, 10)
+
+    @override_settings(PRODUCT_PATCH={"MAX_BULK_ITEMS": 2})
+    def test_max_items(self):
+        """Test that feeds above MAX_BULK_ITEMS are rejected."""
+        response = self.bulk_patch([{"id": p.id, "price": 1} for p in self.products])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
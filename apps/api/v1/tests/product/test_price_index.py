@@ -0,0 +1,210 @@
+import subprocess
+import sys
+import threading
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django_redis import get_redis_connection
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.api.v1.category.models import Category
+from apps.api.v1.product.models import Product
+from apps.api.v1.product.price_index import (
+    GENERATION_KEY, PriceIndex, get_price_index,
+)
+from apps.api.v1.tests.base import ApiTestCase
+
+INDEX_ENABLED = {"ENABLED": True}
+
+
+@override_settings(PRICE_INDEX=INDEX_ENABLED)
+class PriceIndexTests(ApiTestCase):
+    def setUp(self):
+        cache.clear()
+        self.books = Category.objects.create(name="Books")
+        self.products = {
+            price: Product.objects.create(name=f"P{price}", price=price, category=self.books)
+            for price in ("5.00", "10.00", "10.00", "12.50", "30.00")
+        }
+        self.index = PriceIndex()
+        self.index.rebuild()
+
+    def assertRebuilds(self):
+        """Check that the next lookup starts a rebuild, then run it."""
+        with mock.patch.object(self.index, "_start_rebuild") as start_rebuild:
+            self.assertIsNone(self.index.lookup())
+        start_rebuild.assert_called_once()
+        self.index.rebuild()
+
+    def ids_in(self, price_min=None, price_max=None):
+        count, fetch = self.index.lookup(price_min, price_max)
+        ids = fetch(0, count)
+        self.assertEqual(len(ids), count)
+        return ids
+
+    def prices_in(self, price_min=None, price_max=None):
+        ids = self.ids_in(price_min, price_max)
+        prices = Product.objects.in_bulk(ids)
+        return [str(prices[id].price) for id in ids]
+
+    def test_range_lookup(self):
+        """Test that ranges are inclusive and ordered by price and id."""
+        self.assertEqual(self.prices_in(), ["5.00", "10.00", "10.00", "12.50", "30.00"])
+        self.assertEqual(self.prices_in(Decimal("10"), Decimal("12.5")),
+                         ["10.00", "10.00", "12.50"])
+        self.assertEqual(self.prices_in(price_max=Decimal("9.99")), ["5.00"])
+        self.assertEqual(self.prices_in(Decimal("10.001")), ["12.50", "30.00"])
+        self.assertEqual(self.prices_in(Decimal("50")), [])
+        self.assertEqual(self.prices_in(Decimal("20"), Decimal("10")), [])
+
+    def test_fetch_slices(self):
+        """Test that fetch returns only the requested part of the range."""
+        all_ids = self.ids_in(Decimal("10"))
+        count, fetch = self.index.lookup(Decimal("10"))
+        self.assertEqual(fetch(1, 3), all_ids[1:3])
+        self.assertEqual(fetch(2, 99), all_ids[2:])
+
+    def test_single_writes_applied_in_place(self):
+        """Test that this process's own writes update the index in place."""
+        self.ids_in()
+        with mock.patch.object(self.index, "_start_rebuild") as rebuild, \
+                mock.patch("apps.api.v1.product.price_index._index", self.index):
+            with self.captureOnCommitCallbacks(execute=True):
+                created = Product.objects.create(name="New", price=11, category=self.books)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.products["30.00"].price = 1
+                self.products["30.00"].save()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.products["5.00"].delete()
+            self.assertEqual(self.prices_in(),
+                             ["1.00", "10.00", "10.00", "11.00", "12.50"])
+        rebuild.assert_not_called()
+        self.assertIn(created.id, self.ids_in(Decimal("11"), Decimal("11")))
+
+    def test_bulk_writes_rebuild(self):
+        """Test that bulk writes make the next lookup rebuild the index."""
+        self.ids_in()
+        with mock.patch("apps.api.v1.product.price_index._index", self.index):
+            with self.captureOnCommitCallbacks(execute=True):
+                Product.objects.filter(price__lt=11).update(price=40)
+        self.assertRebuilds()
+        self.assertEqual(self.prices_in(Decimal("20")), ["30.00", "40.00", "40.00", "40.00"])
+
+    def test_writes_by_other_processes_applied(self):
+        """Test that deltas published by another process are applied in place."""
+        self.ids_in()
+        product = self.products["12.50"]
+        Product.objects.filter(pk=product.pk).update(price=99)
+        subprocess.run([
+            sys.executable, "-c",
+            "import django; django.setup(); "
+            "from apps.api.v1.product.price_index import get_price_index; "
+            f"get_price_index().record_write([{product.pk}], [(9900, {product.pk})])",
+        ], cwd=settings.BASE_DIR, check=True)
+        with mock.patch.object(self.index, "_start_rebuild") as rebuild:
+            self.assertEqual(self.prices_in(Decimal("50")), ["99.00"])
+        rebuild.assert_not_called()
+
+    def test_write_loaded_by_rebuild_applied_once(self):
+        """Test that a delta already included by a rebuild is not doubled."""
+        created = Product.objects.create(name="New", price=11, category=self.books)
+        self.index.rebuild()
+        PriceIndex().record_write(added=[(1100, created.id)])
+        self.assertEqual(self.prices_in(Decimal("11"), Decimal("11")), ["11.00"])
+
+    def test_gap_in_log_rebuilds(self):
+        """Test that writes missing from the log force a rebuild."""
+        self.ids_in()
+        Product.objects.filter(pk=self.products["12.50"].pk).update(price=99)
+        get_redis_connection().incr(GENERATION_KEY)
+        self.assertRebuilds()
+        self.assertEqual(self.prices_in(Decimal("50")), ["99.00"])
+
+    @override_settings(PRICE_INDEX={**INDEX_ENABLED, "LOG_SIZE": 2})
+    def test_trimmed_log_rebuilds(self):
+        """Test that falling further behind than the log reaches rebuilds."""
+        self.ids_in()
+        writer = PriceIndex()
+        for price in (96, 97, 98):
+            writer.record_write([self.products["5.00"].pk], [(price * 100, self.products["5.00"].pk)])
+        Product.objects.filter(pk=self.products["5.00"].pk).update(price=98)
+        self.assertRebuilds()
+        self.assertEqual(self.prices_in(Decimal("50")), ["98.00"])
+
+    def test_lost_generation_rebuilds(self):
+        """Test that losing the counter in Redis forces a rebuild."""
+        self.ids_in()
+        Product.objects.filter(pk=self.products["5.00"].pk).update(price=77)
+        cache.clear()
+        self.assertRebuilds()
+        self.assertEqual(self.prices_in(Decimal("50")), ["77.00"])
+
+    def test_rebuilt_in_background(self):
+        """Test that lookups fall back to the database during a rebuild."""
+        index = PriceIndex()
+        started, release = threading.Event(), threading.Event()
+
+        def rebuild():
+            started.set()
+            release.wait(5)
+
+        with mock.patch.object(index, "rebuild", side_effect=rebuild) as mocked:
+            self.assertIsNone(index.lookup())
+            self.assertTrue(started.wait(5))
+            self.assertIsNone(index.lookup())
+            release.set()
+        mocked.assert_called_once()
+
+
+@override_settings(PRICE_INDEX=INDEX_ENABLED)
+class PriceIndexListViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.product_url = "/api/v1/products/"
+        books = Category.objects.create(name="Books")
+        games = Category.objects.create(name="Games")
+        for i in range(25):
+            Product.objects.create(name=f"Item {i}", price=50 - i,
+                                   category=books if i % 2 else games)
+        cache.clear()
+        get_price_index().rebuild()
+
+    def get_list(self, params):
+        response = self.client.get(self.product_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def test_served_from_index(self):
+        """Test that only the page's rows are queried, in price order."""
+        # One query loads the page by primary key; the count is indexed.
+        with self.assertNumQueries(1):
+            data = self.get_list({"price_min": 30, "price_max": "45.5", "page": 2})
+        self.assertEqual(data["count"], 16)
+        self.assertEqual([Decimal(str(p["price"])) for p in data["data"]],
+                         [Decimal(price) for price in range(40, 46)])
+        self.assertIsNone(data["next"])
+
+    def test_matches_database(self):
+        """Test that indexed and database lists agree."""
+        for params in ({"price_min": 26}, {"price_max": 40, "page": 2},
+                       {"price_min": 99}, {"price_min": 30, "category": "books"}):
+            with self.subTest(params=params):
+                indexed = self.get_list(params)
+                with self.settings(PRICE_INDEX={"ENABLED": False}):
+                    cache.clear()
+                    database = self.get_list(params)
+                # Clearing the cache also dropped the generation counter.
+                get_price_index().rebuild()
+                self.assertEqual(indexed["count"], database["count"])
+                self.assertEqual(indexed["data"], database["data"])
+
+    def test_unfiltered_list_unchanged(self):
+        """Test that lists without a price filter don't use the index."""
+        with mock.patch.object(PriceIndex, "lookup") as lookup:
+            self.get_list({})
+            self.get_list({"category": "games"})
+        lookup.assert_not_called()
@@ -0,0 +1,136 @@
+import shutil
+import tempfile
+import unittest
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.api.constants.redis import REDIS_KEY_PRODUCTS
+from apps.api.v1.category.models import Category
+from apps.api.v1.product.models import Product
+from apps.api.v1.product.snapshot import (
+    CatalogSnapshot, build_snapshot, get_snapshot, np,
+)
+from apps.api.v1.tests.base import ApiTestCase
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class CatalogSnapshotTests(ApiTestCase):
+    def setUp(self):
+        self.path = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.path, ignore_errors=True)
+        self.enterContext(self.settings(CATALOG_SNAPSHOT={
+            "ENABLED": True, "PATH": self.path, "MAX_DIRTY": 5}))
+        self.client = APIClient()
+        self.product_url = "/api/v1/products/"
+        self.books = Category.objects.create(name="Books")
+        self.games = Category.objects.create(name="Board Games")
+        for i in range(14):
+            Product.objects.create(
+                name=f"Item {i} ✓", price=f"{(i * 7) % 20}.50",
+                description=None if i % 3 else f"About item {i}",
+                category=self.books if i % 2 else self.games)
+        cache.clear()
+        build_snapshot()
+
+    def get_list(self, params):
+        # Drop cached lists only; flushing would lose the recorded changes.
+        cache.delete_pattern(f"{REDIS_KEY_PRODUCTS}*")
+        response = self.client.get(self.product_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()
+
+    def assertMatchesDatabase(self, params_list):
+        for params in params_list:
+            with self.subTest(params=params):
+                snapshot = self.get_list(params)
+                with self.settings(CATALOG_SNAPSHOT={"ENABLED": False}):
+                    database = self.get_list(params)
+                self.assertEqual(snapshot["count"], database["count"])
+                self.assertEqual(snapshot["data"], database["data"])
+                self.assertEqual(snapshot["next"], database["next"])
+
+    def test_columns_round_trip(self):
+        """Test that every field is read back from the snapshot unchanged."""
+        snapshot = get_snapshot()
+        self.assertEqual(len(snapshot), 14)
+        for position, product in enumerate(Product.objects.order_by("id")):
+            restored = snapshot.product(position)
+            for field in ("id", "name", "description", "price", "category_id",
+                          "created_at", "updated_at"):
+                self.assertEqual(getattr(restored, field), getattr(product, field))
+
+    def test_served_without_queries(self):
+        """Test that list queries are answered from the snapshot alone."""
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                self.product_url, {"category": "GAMES", "price_min": "5", "page": 1})
+        self.assertEqual(response.json()["count"], 4)
+
+    def test_matches_database(self):
+        """Test that filters, ordering and pages agree with the database."""
+        self.assertMatchesDatabase([
+            {}, {"page": 2}, {"category": "book"}, {"price_min": "4.5"},
+            {"price_max": 10, "category": "games"}, {"price_min": "19.51"},
+        ])
+
+    def test_merges_rows_written_since(self):
+        """Test that rows written after the snapshot come from the database."""
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(name="New", price="3.50", category=self.books)
+        first, second = Product.objects.order_by("id")[:2]
+        with self.captureOnCommitCallbacks(execute=True):
+            first.price = 99
+            first.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertMatchesDatabase([
+            {}, {"page": 2}, {"price_min": "3"}, {"price_max": "3.5"},
+            {"category": "books", "price_min": 1},
+        ])
+
+    def test_falls_back_after_reset(self):
+        """Test that bulk writes send queries to the database."""
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(price__lt=10).update(price=1)
+        with mock.patch.object(CatalogSnapshot, "select") as select:
+            self.assertMatchesDatabase([{}, {"price_max": 1}])
+        select.assert_not_called()
+
+    def test_falls_back_when_changes_lost(self):
+        """Test that a Redis flush sends queries to the database."""
+        cache.clear()
+        with mock.patch.object(CatalogSnapshot, "select") as select:
+            self.get_list({})
+        select.assert_not_called()
+
+    def test_falls_back_with_too_many_changes(self):
+        """Test that more than MAX_DIRTY changes use the database."""
+        for product in Product.objects.all()[:6]:
+            with self.captureOnCommitCallbacks(execute=True):
+                product.save()
+        with mock.patch.object(CatalogSnapshot, "select") as select:
+            self.get_list({})
+        select.assert_not_called()
+
+    def test_rebuild_switches_and_prunes(self):
+        """Test that workers switch to a rebuilt snapshot and old ones go."""
+        old = get_snapshot()
+        Product.objects.create(name="Later", price=1, category=self.books)
+        build_snapshot()
+        build_snapshot()
+        self.assertNotEqual(get_snapshot().name, old.name)
+        self.assertEqual(len(get_snapshot()), 15)
+        directories = [entry for entry in self.path.iterdir() if entry.is_dir()]
+        self.assertEqual(len(directories), 2)
+
+    def test_command(self):
+        """Test that the command builds a snapshot."""
+        out = StringIO()
+        call_command("build_catalog_snapshot", stdout=out)
+        self.assertIn("with 14 products and 2 categories", out.getvalue())
@@ -1,13 +1,16 @@
-from django.test import TestCase
+import warnings
+
+from django.core.paginator import UnorderedObjectListWarning
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.core.cache import cache
 from apps.api.v1.product.models import Product
 from apps.api.v1.category.models import Category
 from apps.api.constants.redis import REDIS_KEY_PRODUCTS
+from apps.api.v1.tests.base import ApiTestCase
 
 
-class ProductViewTests(TestCase):
+class ProductViewTests(ApiTestCase):
     def setUp(self):
         self.client = APIClient()
         category = Category.objects.create(name="Test Category")
@@ -26,6 +29,14 @@ class ProductViewTests(TestCase):
         self.assertIn("data", response.json())
         self.assertIn("count", response.json())
 
+    def test_product_list_ordered_by_id(self):
+        """Test that database lists are paginated in id order."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", UnorderedObjectListWarning)
+            response = self.client.get(self.product_url)
+        ids = [product["id"] for product in response.json()["data"]]
+        self.assertEqual(ids, sorted(ids))
+
     def test_get_product_list_cached(self):
         """Test retrieving the list of products from cache."""
         cache_key = f"{REDIS_KEY_PRODUCTS}:page=1"
@@ -103,7 +114,8 @@ class ProductViewTests(TestCase):
         """Test that the cache is invalidated when a new product is created."""
         cache_key = f"{REDIS_KEY_PRODUCTS}:page=1"
         cache.set(cache_key, {"data": "cached data"})
-        self.client.post(self.product_url, self.product_data)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.product_url, self.product_data)
         self.assertIsNone(cache.get(cache_key))
 
     def test_product_cache_invalidation_on_update(self):
@@ -111,12 +123,14 @@ class ProductViewTests(TestCase):
         cache_key = f"{REDIS_KEY_PRODUCTS}:page=1"
         cache.set(cache_key, {"data": "cached data"})
         updated_data = {"name": "Updated Product", "price": 120.0, "category": self.product.category.id}
-        self.client.put(self.detail_url(self.product.id), updated_data)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(self.detail_url(self.product.id), updated_data)
         self.assertIsNone(cache.get(cache_key))
 
     def test_product_cache_invalidation_on_delete(self):
         """Test that the cache is invalidated when a product is deleted."""
         cache_key = f"{REDIS_KEY_PRODUCTS}:page=1"
         cache.set(cache_key, {"data": "cached data"})
-        self.client.delete(self.detail_url(self.product.id))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(self.detail_url(self.product.id))
         self.assertIsNone(cache.get(cache_key))
@@ -0,0 +1,126 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.api.constants.redis import REDIS_KEY_PRODUCTS
+from apps.api.utils.util import get_cache_key
+from apps.api.v1.category.models import Category
+from apps.api.v1.product.models import Product
+
+
+@override_settings(BATCH={"MAX_REQUESTS": 5, "WORKERS": 1})
+class BatchViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.batch_url = "/api/v1/batch/"
+        self.category = Category.objects.create(name="Books")
+        self.products = [
+            Product.objects.create(name=f"Book {i}", price=10 + i, category=self.category)
+            for i in range(3)
+        ]
+        cache.clear()
+
+    def screen_requests(self):
+        return [
+            {"method": "GET", "path": f"/api/v1/categories/{self.category.id}/"},
+            {"method": "GET", "path": "/api/v1/products/?category=books"},
+            {"method": "GET", "path": f"/api/v1/products/{self.products[0].id}/"},
+            {"method": "GET", "path": f"/api/v1/products/{self.products[1].id}/"},
+        ]
+
+    def batch(self, requests):
+        return self.client.post(self.batch_url, {"requests": requests}, format="json")
+
+    def test_results_in_order(self):
+        """Test that sub-requests are answered in request order."""
+        response = self.batch(self.screen_requests() + [
+            {"method": "GET", "path": "/api/v1/unknown/"}])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()["data"]
+        self.assertEqual([r["status"] for r in results], [200, 200, 200, 200, 404])
+        self.assertEqual(results[0]["body"]["data"]["name"], "Books")
+        self.assertEqual(results[1]["body"]["count"], 3)
+        self.assertEqual(results[2]["body"]["data"]["name"], "Book 0")
+        self.assertEqual(results[3]["body"]["data"]["name"], "Book 1")
+        self.assertEqual(results[2]["headers"]["X-Cache"], "MISS")
+
+    def test_reads_share_one_get_many(self):
+        """Test that cached reads are served from a single get_many."""
+        self.batch(self.screen_requests())
+        with mock.patch.object(cache, "get", wraps=cache.get) as cache_get, \
+                mock.patch.object(cache, "get_many", wraps=cache.get_many) as get_many:
+            results = self.batch(self.screen_requests()).json()["data"]
+        get_many.assert_called_once()
+        self.assertEqual(len(get_many.call_args.args[0]), 4)
+        cache_get.assert_not_called()
+        self.assertEqual([r["headers"]["X-Cache"] for r in results], ["HIT"] * 4)
+
+    def test_concurrent_reads(self):
+        """Test that reads run on worker threads still come back in order."""
+        self.batch(self.screen_requests())
+        # Worker threads can't see the test transaction, so only cache hits.
+        with self.settings(BATCH={"MAX_REQUESTS": 5, "WORKERS": 4}):
+            results = self.batch(self.screen_requests()).json()["data"]
+        self.assertEqual([r["headers"]["X-Cache"] for r in results], ["HIT"] * 4)
+        self.assertEqual([r["body"]["data"]["name"] for r in results[2:]],
+                         ["Book 0", "Book 1"])
+
+    def test_reads_after_write_see_the_write(self):
+        """Test that reads following a write skip the stale cache."""
+        product = self.products[0]
+        detail_path = f"/api/v1/products/{product.id}/"
+        self.batch([{"method": "GET", "path": detail_path}])
+        self.assertIsNotNone(cache.get(get_cache_key(REDIS_KEY_PRODUCTS, {"id": product.id})))
+
+        results = self.batch([
+            {"method": "PUT", "path": detail_path,
+             "body": {"name": "Renamed", "price": "10.00", "category": self.category.id}},
+            {"method": "GET", "path": detail_path},
+        ]).json()["data"]
+        self.assertEqual(results[0]["status"], 200)
+        self.assertEqual(results[1]["body"]["data"]["name"], "Renamed")
+
+    def test_write_sub_requests(self):
+        """Test that writes are dispatched with their JSON body."""
+        results = self.batch([
+            {"method": "POST", "path": "/api/v1/products/",
+             "body": {"name": "New", "price": "1.00", "category": self.category.id}},
+            {"method": "DELETE", "path": f"/api/v1/products/{self.products[2].id}/"},
+        ]).json()["data"]
+        self.assertEqual([r["status"] for r in results], [201, 204])
+        self.assertTrue(Product.objects.filter(name="New").exists())
+        self.assertFalse(Product.objects.filter(id=self.products[2].id).exists())
+
+    def test_invalid_batches(self):
+        """Test that malformed, oversized and nested batches are rejected."""
+        for requests in (
+            [],
+            [{"method": "GET", "path": "/api/v1/products/"}] * 6,
+            [{"method": "TRACE", "path": "/api/v1/products/"}],
+            [{"method": "GET", "path": "api/v1/products/"}],
+            [{"method": "POST", "path": self.batch_url, "body": {"requests": []}}],
+        ):
+            with self.subTest(requests=requests):
+                self.assertEqual(self.batch(requests).status_code,
+                                 status.HTTP_400_BAD_REQUEST)
+
+    def test_non_api_paths_rejected(self):
+        """Test that sub-requests can't reach views outside the API."""
+        for path in ("/admin/", "/admin/login/", "/api/v2/products/", "/"):
+            with self.subTest(path=path), \
+                    mock.patch("apps.api.utils.batch.dispatch_internal_request") as dispatch:
+                response = self.batch([{"method": "POST", "path": path, "body": {}}])
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                dispatch.assert_not_called()
+
+    @override_settings(RATE_LIMIT={"CAPACITY": 3, "REFILL_RATE": 0.001,
+                                   "HIT_COST": 1, "MISS_COST": 1, "WRITE_COST": 1})
+    def test_sub_requests_rate_limited(self):
+        """Test that every sub-request is charged to the client's bucket."""
+        path = f"/api/v1/products/{self.products[0].id}/"
+        results = self.batch([{"method": "GET", "path": path}] * 4).json()["data"]
+        self.assertEqual([r["status"] for r in results], [200, 200, 200, 429])
+        self.assertIn("Retry-After", results[3]["headers"])
@@ -0,0 +1,91 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import QueryDict
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from apps.api.constants.redis import REDIS_KEY_PRODUCTS
+from apps.api.utils.util import canonicalize_query_params, get_cache_key
+from apps.api.v1.category.models import Category
+from apps.api.v1.product.filters import ProductFilter
+from apps.api.v1.product.models import Product
+from apps.api.v1.tests.base import ApiTestCase
+
+
+def product_key(query_string):
+    params = canonicalize_query_params(QueryDict(query_string), ProductFilter)
+    return get_cache_key(REDIS_KEY_PRODUCTS, params)
+
+
+class CanonicalCacheKeyTests(TestCase):
+    def test_parameter_order_ignored(self):
+        """Test that parameter order does not change the key."""
+        self.assertEqual(product_key("price_min=1&price_max=5"),
+                         product_key("price_max=5&price_min=1"))
+
+    def test_unknown_parameters_dropped(self):
+        """Test that parameters the view ignores do not change the key."""
+        self.assertEqual(product_key("utm_source=mail&_=123"), product_key(""))
+
+    def test_first_page_same_as_no_page(self):
+        """Test that page=1 and no page share a key."""
+        self.assertEqual(product_key("page=1"), product_key(""))
+        self.assertNotEqual(product_key("page=2"), product_key(""))
+
+    def test_decimal_values_normalized(self):
+        """Test that equivalent decimals share a key."""
+        self.assertEqual(product_key("price_min=10"), product_key("price_min=10.00"))
+
+    def test_case_insensitive_filter_normalized(self):
+        """Test that case variants of icontains filters share a key."""
+        self.assertEqual(product_key("category=Books"), product_key("category=books"))
+
+    def test_empty_filters_dropped(self):
+        """Test that empty filter values do not change the key."""
+        self.assertEqual(product_key("category=&price_min="), product_key(""))
+
+    def test_invalid_filters_kept(self):
+        """Test that invalid values do not collide with valid keys."""
+        self.assertNotEqual(product_key("price_min=abc"), product_key(""))
+
+    def test_long_keys_hashed(self):
+        """Test that long query strings are replaced by a digest."""
+        key = product_key("category=" + "x" * 500)
+        self.assertTrue(key.startswith(f"{REDIS_KEY_PRODUCTS}?sha1="))
+        self.assertLess(len(key), 100)
+
+
+class CanonicalListViewTests(ApiTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        category = Category.objects.create(name="Books")
+        for i in range(15):
+            Product.objects.create(name=f"Product {i}", price=10 + i,
+                                   category=category)
+        cache.clear()
+
+    def test_equivalent_queries_share_cache_entry(self):
+        """Test that equivalent query strings hit the same cache entry."""
+        first = self.client.get("/api/v1/products/?price_min=10.00&category=BOOKS")
+        second = self.client.get("/api/v1/products/?category=books&price_min=10&page=1")
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+
+    def test_links_use_canonical_parameters(self):
+        """Test that pagination links do not echo ignored parameters."""
+        response = self.client.get("/api/v1/products/?junk=1&price_min=10.00")
+        self.assertEqual(response.json()["next"],
+                         "http://testserver/api/v1/products/?page=2&price_min=10")
+
+    def test_cache_key_report(self):
+        """Test that the report counts keys and duplicate payloads."""
+        self.client.get("/api/v1/products/")
+        self.client.get("/api/v1/products/?price_min=1")
+        self.client.get("/api/v1/products/?page=2")
+        out = StringIO()
+        call_command("cache_key_report", stdout=out)
+        self.assertIn(
+            f"{REDIS_KEY_PRODUCTS}: keys=3 unique_payloads=2 duplicate_keys=1",
+            out.getvalue())
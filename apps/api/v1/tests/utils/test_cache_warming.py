@@ -0,0 +1,147 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+
+from apps.api.constants.redis import REDIS_KEY_CATEGORIES, REDIS_KEY_PRODUCTS
+from apps.api.utils import cache_warming
+from apps.api.utils.cache_warming import hot_targets_from_capture, warm_targets
+from apps.api.utils.compression import get_variant_cache_key
+from apps.api.utils.util import delete_cache_by_pattern, get_cache_key
+from apps.api.v1.category.models import Category
+from apps.api.v1.product.models import Product
+from apps.api.v1.tests.base import ApiTestCase
+
+
+@override_settings(
+    ALLOWED_HOSTS=["localhost", "testserver"],
+    RESPONSE_COMPRESSION={"ENCODINGS": ["gzip"], "MIN_SIZE": 100},
+)
+class CacheWarmingTests(ApiTestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Books")
+        self.products = [
+            Product.objects.create(name=f"Product {i}", price=10 + i,
+                                   category=self.category)
+            for i in range(12)
+        ]
+        cache.clear()
+
+    def test_warm_targets(self):
+        """Test that warming fills list, filtered and detail entries."""
+        product = self.products[0]
+        statuses, written = warm_targets([
+            "/api/v1/products/",
+            "/api/v1/products/?page=2",
+            "/api/v1/products/?price_min=15.00",
+            f"/api/v1/products/{product.id}/",
+        ], workers=1)
+
+        self.assertEqual(set(statuses.values()), {200})
+        self.assertIsNotNone(cache.get(get_cache_key(REDIS_KEY_PRODUCTS, {})))
+        self.assertIsNotNone(cache.get(get_cache_key(REDIS_KEY_PRODUCTS, {"page": "2"})))
+        self.assertIsNotNone(cache.get(
+            get_cache_key(REDIS_KEY_PRODUCTS, {"price_min": "15"})))
+        detail = cache.get(get_cache_key(REDIS_KEY_PRODUCTS, {"id": product.id}))
+        self.assertEqual(detail["data"]["name"], product.name)
+        self.assertGreaterEqual(written, 4)
+
+    def test_warm_stores_compressed_variants(self):
+        """Test that warmed list pages are precompressed."""
+        warm_targets(["/api/v1/products/"], workers=1)
+        cache_key = get_cache_key(REDIS_KEY_PRODUCTS, {})
+        self.assertIsNotNone(cache.get(get_variant_cache_key(cache_key, "gzip")))
+
+    def test_warm_writes_are_pipelined(self):
+        """Test that entries are written with set_many, not one by one."""
+        with mock.patch.object(cache, "set", wraps=cache.set) as cache_set, \
+                mock.patch.object(cache, "set_many", wraps=cache.set_many) as set_many:
+            warm_targets(["/api/v1/products/", "/api/v1/categories/"], workers=1)
+        cache_set.assert_not_called()
+        set_many.assert_called_once()
+
+    def test_invalidation_during_warm_wins(self):
+        """Test that entries computed before an invalidation aren't stored."""
+        render_target = cache_warming.render_target
+
+        def render_then_invalidate(target, environ):
+            rendered = render_target(target, environ)
+            delete_cache_by_pattern(f"{REDIS_KEY_PRODUCTS}*")
+            return rendered
+
+        with mock.patch.object(cache_warming, "render_target", render_then_invalidate):
+            statuses, written = warm_targets(["/api/v1/products/"], workers=1)
+        self.assertEqual(statuses, {"/api/v1/products/": 200})
+        self.assertEqual(written, 0)
+        self.assertIsNone(cache.get(get_cache_key(REDIS_KEY_PRODUCTS, {})))
+
+        set_many = cache.set_many
+
+        def set_many_then_invalidate(data):
+            set_many(data)
+            delete_cache_by_pattern(f"{REDIS_KEY_CATEGORIES}*")
+
+        with mock.patch.object(cache, "set_many", set_many_then_invalidate):
+            _, written = warm_targets(["/api/v1/products/"], workers=1)
+        self.assertEqual(written, 0)
+        self.assertIsNone(cache.get(get_cache_key(REDIS_KEY_PRODUCTS, {})))
+
+    def test_warm_reports_failures(self):
+        """Test that failing targets are reported and not cached."""
+        statuses, _ = warm_targets(
+            ["/api/v1/products/999999/", "/api/v1/unknown/"], workers=1)
+        self.assertEqual(statuses["/api/v1/products/999999/"], 404)
+        self.assertEqual(statuses["/api/v1/unknown/"], 404)
+
+    def test_links_use_base_url(self):
+        """Test that cached pagination links use the configured base URL."""
+        warm_targets(["/api/v1/products/"], workers=1,
+                     base_url="https://localhost:8443")
+        data = cache.get(get_cache_key(REDIS_KEY_PRODUCTS, {}))
+        self.assertEqual(data["next"], "https://localhost:8443/api/v1/products/?page=2")
+
+    def test_hot_targets_from_capture(self):
+        """Test that the most frequent successful GETs are picked."""
+        records = (
+            [{"method": "GET", "path": "/api/v1/products/", "query": {"page": ["2"]},
+              "status": 200}] * 3
+            + [{"method": "GET", "path": "/api/v1/categories/", "query": {},
+                "status": 200}] * 2
+            + [{"method": "POST", "path": "/api/v1/products/", "query": {},
+                "status": 201}] * 5
+            + [{"method": "GET", "path": "/api/v1/products/1/", "query": {},
+                "status": 404}] * 5
+        )
+        with tempfile.TemporaryDirectory() as capture_dir:
+            path = Path(capture_dir) / "requests.jsonl"
+            path.write_text("\n".join(json.dumps(r) for r in records))
+            targets = hot_targets_from_capture([path], top=5)
+        self.assertEqual(targets, ["/api/v1/products/?page=2", "/api/v1/categories/"])
+
+    def test_warm_cache_command(self):
+        """Test the warm_cache management command."""
+        out = StringIO()
+        call_command("warm_cache", "/api/v1/categories/", "--workers", "1",
+                     stdout=out)
+        self.assertIn("Warmed 1/1 targets", out.getvalue())
+        self.assertIsNotNone(cache.get(get_cache_key(REDIS_KEY_CATEGORIES, {})))
+
+    @override_settings(CACHE_WARMING={"REWARM_ON_INVALIDATE": True})
+    def test_rewarm_scheduled_after_invalidation(self):
+        """Test that a write schedules a background rewarm on commit."""
+        with mock.patch.object(cache_warming, "_start_rewarm") as start_rewarm:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.delete(f"/api/v1/products/{self.products[0].id}/")
+        start_rewarm.assert_called_once()
+
+    def test_rewarm_disabled_by_default(self):
+        """Test that no rewarm is scheduled unless enabled."""
+        with mock.patch.object(cache_warming, "_start_rewarm") as start_rewarm:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.delete(f"/api/v1/products/{self.products[0].id}/")
+        start_rewarm.assert_not_called()
@@ -0,0 +1,134 @@
+import gzip
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.api.constants.redis import REDIS_KEY_PRODUCTS
+from apps.api.utils import compression
+from apps.api.utils.compression import get_variant_cache_key, negotiate_encoding
+from apps.api.utils.util import get_cache_key
+from apps.api.v1.category.models import Category
+from apps.api.v1.product.models import Product
+from apps.api.v1.tests.base import ApiTestCase
+
+
+class NegotiateEncodingTests(TestCase):
+    def test_no_header(self):
+        """Test that a missing header means no compression."""
+        self.assertIsNone(negotiate_encoding(""))
+
+    @override_settings(RESPONSE_COMPRESSION={"ENCODINGS": ["gzip"]})
+    def test_gzip(self):
+        """Test that gzip is chosen when the client accepts it."""
+        self.assertEqual(negotiate_encoding("gzip, deflate"), "gzip")
+
+    @override_settings(RESPONSE_COMPRESSION={"ENCODINGS": ["gzip"]})
+    def test_refused_encoding(self):
+        """Test that q=0 disables an encoding."""
+        self.assertIsNone(negotiate_encoding("gzip;q=0, deflate"))
+
+    @override_settings(RESPONSE_COMPRESSION={"ENCODINGS": ["gzip"]})
+    def test_wildcard(self):
+        """Test that a wildcard accepts any available encoding."""
+        self.assertEqual(negotiate_encoding("*"), "gzip")
+
+    def test_client_quality_wins(self):
+        """Test that the client preference wins over server order."""
+        with mock.patch.dict(compression.CODECS, {"br": None, "gzip": None}):
+            with override_settings(RESPONSE_COMPRESSION={"ENCODINGS": ["br", "gzip"]}):
+                self.assertEqual(negotiate_encoding("br;q=0.5, gzip"), "gzip")
+                self.assertEqual(negotiate_encoding("br, gzip"), "br")
+
+
+@override_settings(RESPONSE_COMPRESSION={"ENCODINGS": ["gzip"], "MIN_SIZE": 100})
+class CompressedResponseTests(ApiTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.product_url = "/api/v1/products/"
+        category = Category.objects.create(name="Test Category")
+        for i in range(5):
+            Product.objects.create(
+                name=f"Product {i}", description="Description " * 10,
+                price=10 + i, category=category)
+        cache.clear()
+
+    def get(self, url, **extra):
+        return self.client.get(url, HTTP_ACCEPT_ENCODING="gzip", **extra)
+
+    def test_list_response_is_compressed(self):
+        """Test that list responses are gzip-compressed when accepted."""
+        response = self.get(self.product_url)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        data = json.loads(gzip.decompress(response.content))
+        self.assertEqual(data["count"], 5)
+
+    def test_uncompressed_without_accept_encoding(self):
+        """Test that clients not accepting gzip get identity responses."""
+        response = self.client.get(self.product_url)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.json()["count"], 5)
+
+    def test_compressed_variant_is_cached(self):
+        """Test that the compressed body is stored next to the cache entry."""
+        response = self.get(self.product_url)
+        cache_key = get_cache_key(REDIS_KEY_PRODUCTS, {})
+        self.assertEqual(
+            cache.get(get_variant_cache_key(cache_key, "gzip")), response.content)
+
+    def test_cache_hit_served_without_compressing(self):
+        """Test that a cache hit is a byte copy of the stored variant."""
+        first = self.get(self.product_url)
+        compress = mock.Mock()
+        with mock.patch.dict(compression.CODECS, {"gzip": compress}):
+            second = self.get(self.product_url)
+        compress.assert_not_called()
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(second["Content-Encoding"], "gzip")
+        self.assertEqual(second.content, first.content)
+
+    def test_detail_variant_is_cached(self):
+        """Test that detail responses get a compressed variant too."""
+        product = Product.objects.first()
+        product.description = "Long description " * 20
+        product.save()
+        self.get(f"{self.product_url}{product.id}/")
+        cache_key = get_cache_key(REDIS_KEY_PRODUCTS, {"id": product.id})
+        self.assertIsNotNone(cache.get(get_variant_cache_key(cache_key, "gzip")))
+
+    def test_variants_invalidated_on_write(self):
+        """Test that writes drop the compressed variants as well."""
+        self.get(self.product_url)
+        cache_key = get_cache_key(REDIS_KEY_PRODUCTS, {})
+        product = Product.objects.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"{self.product_url}{product.id}/")
+        self.assertIsNone(cache.get(get_variant_cache_key(cache_key, "gzip")))
+
+    def test_indented_rendering_not_shared(self):
+        """Test that indented JSON is neither stored nor served as the variant."""
+        indented = "application/json; indent=4"
+        first = self.get(self.product_url, HTTP_ACCEPT=indented)
+        self.assertIn(b"\n    ", gzip.decompress(first.content))
+        cache_key = get_cache_key(REDIS_KEY_PRODUCTS, {})
+        self.assertIsNone(cache.get(get_variant_cache_key(cache_key, "gzip")))
+
+        plain = self.get(self.product_url, HTTP_ACCEPT="application/json")
+        self.assertNotIn(b"\n", gzip.decompress(plain.content))
+        again = self.get(self.product_url, HTTP_ACCEPT=indented)
+        self.assertEqual(again["X-Cache"], "HIT")
+        self.assertIn(b"\n    ", gzip.decompress(again.content))
+
+    def test_html_rendering_not_cached(self):
+        """Test that a browsable API request doesn't fill the JSON variant."""
+        self.get(self.product_url, HTTP_ACCEPT="text/html")
+        cache_key = get_cache_key(REDIS_KEY_PRODUCTS, {})
+        self.assertIsNone(cache.get(get_variant_cache_key(cache_key, "gzip")))
+
+        response = self.get(self.product_url, HTTP_ACCEPT="application/json")
+        self.assertEqual(response["Content-Type"], "application/json")
+        data = json.loads(gzip.decompress(response.content))
+        self.assertEqual(data["count"], 5)
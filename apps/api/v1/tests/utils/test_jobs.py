@@ -0,0 +1,157 @@
+import threading
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.api.utils import jobs
+from apps.api.utils.jobs import (
+    InlineJobQueue, RedisJobQueue, ThreadJobQueue, enqueue, enqueue_on_commit,
+    get_job_key, get_job_settings, get_queue_stats,
+)
+from apps.api.v1.tests.base import ApiTestCase
+
+calls = []
+release = threading.Event()
+
+
+def record_job(value):
+    calls.append(value)
+
+
+def flaky_job(failures):
+    calls.append(failures)
+    if len(calls) <= failures:
+        raise RuntimeError("flaky")
+
+
+def blocking_job():
+    release.wait(5)
+
+
+def make_queue(queue_class, **config):
+    return queue_class({**get_job_settings(), "RETRY_DELAY": 0, **config})
+
+
+class JobQueueTests(SimpleTestCase):
+    def setUp(self):
+        calls.clear()
+        release.clear()
+
+    def test_job_key(self):
+        """Test that jobs are identified by function path and arguments."""
+        self.assertEqual(
+            get_job_key(record_job, (1, "a")),
+            f'["{__name__}.record_job",[1,"a"]]')
+
+    def test_inline_runs_immediately(self):
+        """Test that the inline backend runs jobs in the caller."""
+        job_queue = make_queue(InlineJobQueue)
+        job_queue.enqueue(get_job_key(record_job, [1]))
+        self.assertEqual(calls, [1])
+        self.assertEqual(job_queue.stats()["succeeded"], 1)
+
+    def test_retries(self):
+        """Test that failing jobs are retried up to MAX_RETRIES times."""
+        job_queue = make_queue(InlineJobQueue, MAX_RETRIES=3)
+        with self.assertLogs("apps.api.utils.jobs", "WARNING"):
+            job_queue.enqueue(get_job_key(flaky_job, [2]))
+        self.assertEqual(len(calls), 3)
+        stats = job_queue.stats()
+        self.assertEqual((stats["retried"], stats["succeeded"], stats["failed"]), (2, 1, 0))
+
+    def test_gives_up_after_max_retries(self):
+        """Test that a job failing every attempt is counted as failed."""
+        job_queue = make_queue(InlineJobQueue, MAX_RETRIES=1)
+        with self.assertLogs("apps.api.utils.jobs", "ERROR"):
+            job_queue.enqueue(get_job_key(flaky_job, [10]))
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(job_queue.stats()["failed"], 1)
+
+    def test_thread_queue_deduplicates(self):
+        """Test that identical pending jobs are queued once."""
+        job_queue = make_queue(ThreadJobQueue, WORKERS=1)
+        job_queue.enqueue(get_job_key(blocking_job, []))
+        # Wait for the worker to pick up the blocking job.
+        while job_queue.depth():
+            release.wait(0.01)
+        self.assertTrue(job_queue.enqueue(get_job_key(record_job, [1])))
+        self.assertFalse(job_queue.enqueue(get_job_key(record_job, [1])))
+        self.assertTrue(job_queue.enqueue(get_job_key(record_job, [2])))
+        self.assertEqual(job_queue.stats()["depth"], 2)
+        release.set()
+        job_queue.join()
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual(job_queue.stats()["deduplicated"], 1)
+
+    def test_thread_queue_retries(self):
+        """Test that the thread backend requeues failed jobs."""
+        job_queue = make_queue(ThreadJobQueue, WORKERS=1, MAX_RETRIES=2)
+        with self.assertLogs("apps.api.utils.jobs", "WARNING"):
+            job_queue.enqueue(get_job_key(flaky_job, [1]))
+            for _ in range(500):
+                if job_queue.stats()["succeeded"]:
+                    break
+                release.wait(0.01)
+        self.assertEqual(len(calls), 2)
+
+
+class RedisJobQueueTests(SimpleTestCase):
+    def setUp(self):
+        calls.clear()
+        cache.clear()
+        self.job_queue = make_queue(RedisJobQueue, WORKERS=0)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_enqueue_and_run(self):
+        """Test that jobs are pushed to Redis, deduplicated and run."""
+        self.assertTrue(self.job_queue.enqueue(get_job_key(record_job, [1])))
+        self.assertFalse(self.job_queue.enqueue(get_job_key(record_job, [1])))
+        self.assertEqual(self.job_queue.depth(), 1)
+        self.assertTrue(self.job_queue.run_one(timeout=1))
+        self.assertEqual(calls, [1])
+        self.assertEqual(self.job_queue.depth(), 0)
+        # No longer pending, so it can be queued again.
+        self.assertTrue(self.job_queue.enqueue(get_job_key(record_job, [1])))
+
+    def test_stats_shared_in_redis(self):
+        """Test that counters are kept in Redis for all processes."""
+        self.job_queue.enqueue(get_job_key(record_job, [1]))
+        self.job_queue.enqueue(get_job_key(record_job, [1]))
+        self.job_queue.run_one(timeout=1)
+        stats = make_queue(RedisJobQueue, WORKERS=0).stats()
+        self.assertEqual(
+            {k: stats[k] for k in ("depth", "enqueued", "deduplicated", "succeeded")},
+            {"depth": 0, "enqueued": 1, "deduplicated": 1, "succeeded": 1})
+
+
+class EnqueueOnCommitTests(ApiTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_runs_after_commit(self):
+        """Test that jobs are only queued once the transaction commits."""
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue_on_commit(record_job, 1)
+            self.assertEqual(calls, [])
+        self.assertEqual(calls, [1])
+
+    def test_backend_follows_settings(self):
+        """Test that the queue is rebuilt when JOB_QUEUE changes."""
+        self.assertIsInstance(jobs.get_job_queue(), InlineJobQueue)
+        with override_settings(JOB_QUEUE={"BACKEND": "thread", "WORKERS": 0}):
+            self.assertIsInstance(jobs.get_job_queue(), ThreadJobQueue)
+            enqueue(record_job, 2)
+            self.assertEqual(get_queue_stats()["enqueued"], 1)
+        self.assertEqual(calls, [])
+
+    def test_stats_endpoint(self):
+        """Test that the queue depth and counters are exposed."""
+        response = APIClient().get("/api/v1/jobs/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()["data"]
+        self.assertEqual(data["backend"], "inline")
+        self.assertIn("depth", data)
@@ -0,0 +1,111 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django_redis import get_redis_connection
+from rest_framework import status
+from redis import Redis
+from rest_framework.test import APIClient
+
+from apps.api.utils.exceptions import ApiException
+from apps.api.utils.rate_limit import consume_tokens, recompute_slot
+from apps.api.v1.category.models import Category
+
+RATE_LIMIT = {
+    "ENABLED": True,
+    "CAPACITY": 6,
+    "REFILL_RATE": 0.001,
+    "HIT_COST": 1,
+    "MISS_COST": 5,
+    "WRITE_COST": 5,
+    "MAX_CONCURRENT_RECOMPUTES": 1,
+}
+
+
+@override_settings(RATE_LIMIT=RATE_LIMIT)
+class RateLimitTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.category_url = "/api/v1/categories/"
+        Category.objects.create(name="Existing Category")
+        cache.clear()
+
+    def test_token_bucket(self):
+        """Test that a bucket allows up to its capacity."""
+        results = [consume_tokens("store:ratelimit:test", 2)[0] for _ in range(4)]
+        self.assertEqual(results, [True, True, True, False])
+
+    def test_scripts_built_once(self):
+        """Test that calls reuse the scripts, even after a script flush."""
+        get_redis_connection().script_flush()
+        with mock.patch.object(Redis, "register_script") as register_script:
+            results = [consume_tokens("store:ratelimit:test", 2)[0] for _ in range(4)]
+        register_script.assert_not_called()
+        self.assertEqual(results, [True, True, True, False])
+
+    def test_retry_after(self):
+        """Test that a rejected call reports when to retry."""
+        consume_tokens("store:ratelimit:test", 6)
+        allowed, retry_after = consume_tokens("store:ratelimit:test", 1)
+        self.assertFalse(allowed)
+        self.assertGreater(retry_after, 0)
+
+    def test_cache_misses_cost_more(self):
+        """Test that a miss costs MISS_COST and hits cost HIT_COST."""
+        first = self.client.get(self.category_url)
+        self.assertEqual(first["X-Cache"], "MISS")
+        second = self.client.get(self.category_url)
+        self.assertEqual(second["X-Cache"], "HIT")
+
+        response = self.client.get(self.category_url)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn("Retry-After", response)
+        self.assertFalse(response.json()["success"])
+
+    def test_buckets_are_per_client(self):
+        """Test that one client running out does not limit another."""
+        for _ in range(3):
+            self.client.get(self.category_url, REMOTE_ADDR="10.0.0.1")
+        response = self.client.get(self.category_url, REMOTE_ADDR="10.0.0.2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_buckets_are_per_route(self):
+        """Test that routes are limited independently."""
+        for _ in range(3):
+            self.client.get(self.category_url)
+        response = self.client.get("/api/v1/products/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(RATE_LIMIT={**RATE_LIMIT, "ENABLED": False})
+    def test_disabled(self):
+        """Test that nothing is limited when disabled."""
+        for _ in range(5):
+            response = self.client.get(self.category_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_recompute_slot_sheds_load(self):
+        """Test that a miss is rejected with 503 when all slots are busy."""
+        with recompute_slot():
+            response = self.client.get(self.category_url)
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        response = self.client.get(self.category_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_recompute_slot_not_needed_for_hits(self):
+        """Test that cache hits are served while all slots are busy."""
+        self.client.get(self.category_url)
+        with recompute_slot():
+            response = self.client.get(self.category_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_recompute_slot_released_on_error(self):
+        """Test that a slot is released when the recomputation fails."""
+        with self.assertRaises(ValueError):
+            with recompute_slot():
+                raise ValueError
+        with recompute_slot():
+            with self.assertRaises(ApiException):
+                with recompute_slot():
+                    pass
@@ -0,0 +1,131 @@
+import os
+import pickle
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django_redis import get_redis_connection
+from redis import BlockingConnectionPool
+from rest_framework.test import APIClient
+
+from apps.api.constants.redis import REDIS_KEY_PRODUCTS
+from apps.api.utils.redis_cache import (
+    ConsistentHashRing, MsgpackSerializer, ZstdCompressor, get_cache_nodes,
+)
+from apps.api.v1.category.models import Category
+from apps.api.v1.product.models import Product
+from apps.api.v1.tests.base import ApiTestCase
+from apps.api.v1.tests.performance.budget import capture_redis_commands
+
+# Three logical databases of the local server stand in for three nodes.
+NODES = [f"redis://127.0.0.1:6379/{db}" for db in (1, 2, 3)]
+SHARDED_CACHES = {
+    "default": {
+        **settings.CACHES["default"],
+        "LOCATION": NODES,
+    },
+}
+
+
+class ConsistentHashRingTests(TestCase):
+    def test_balanced_and_stable(self):
+        """Test that keys spread evenly and a new node only takes its share."""
+        keys = [f"store:products:page={i}" for i in range(6000)]
+        ring = ConsistentHashRing(NODES)
+        placement = {key: ring.get_node(key) for key in keys}
+        for node in NODES:
+            share = list(placement.values()).count(node) / len(keys)
+            self.assertAlmostEqual(share, 1 / 3, delta=0.08)
+
+        grown = ConsistentHashRing([*NODES, "redis://127.0.0.1:6379/4"])
+        moved = [key for key in keys if grown.get_node(key) != placement[key]]
+        self.assertLess(len(moved) / len(keys), 0.35)
+        self.assertEqual({grown.get_node(key) for key in moved},
+                         {"redis://127.0.0.1:6379/4"})
+
+
+@override_settings(CACHES=SHARDED_CACHES)
+class ShardedCacheTests(ApiTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_entries_spread_over_nodes(self):
+        """Test that entries land on every node and multi-key calls batch."""
+        data = {f"key:{i}": {"value": i} for i in range(60)}
+        with capture_redis_commands() as commands:
+            cache.set_many(data)
+            self.assertEqual(cache.get_many([*data, "missing"]), data)
+        self.assertEqual(commands.count("MGET"), len(NODES))
+        for node in get_cache_nodes():
+            self.assertGreater(node.dbsize(), 0)
+        self.assertEqual(cache.delete_many(list(data)), 60)
+
+    def test_coordination_on_first_node(self):
+        """Test that raw connections, used for counters, use the first node."""
+        self.assertIs(get_redis_connection(), get_cache_nodes()[0])
+        pool = get_redis_connection().connection_pool
+        self.assertIsInstance(pool, BlockingConnectionPool)
+        self.assertEqual(pool.max_connections, 50)
+
+    def test_invalidation_across_shards(self):
+        """Test that a write drops cached pages from every node."""
+        category = Category.objects.create(name="Books")
+        product = Product.objects.create(name="Atlas", price=10, category=category)
+        for i in range(30):
+            Product.objects.create(name=f"Item {i}", price=i, category=category)
+        client = APIClient()
+        for page in range(1, 5):
+            client.get("/api/v1/products/", {"page": page})
+        for price_max in range(20):
+            client.get("/api/v1/products/", {"price_max": price_max})
+        cached = [node.keys(f":1:{REDIS_KEY_PRODUCTS}*") for node in get_cache_nodes()]
+        self.assertTrue(all(cached))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            client.put(f"/api/v1/products/{product.id}/", {
+                "name": "Atlas", "price": 12, "category": category.id})
+        self.assertEqual(
+            [node.keys(f":1:{REDIS_KEY_PRODUCTS}*") for node in get_cache_nodes()],
+            [[], [], []])
+
+    def test_unreadable_value_is_a_miss(self):
+        """Test that entries written by the old serializer read as misses."""
+        cache.set("page", {"a": 1})
+        key = cache.make_key("page")
+        for node in get_cache_nodes():
+            if node.exists(key):
+                node.set(key, pickle.dumps({"a": 1}))
+        with self.assertLogs("apps.api.utils.redis_cache", "WARNING"):
+            self.assertIsNone(cache.get("page"))
+            self.assertEqual(cache.get_many(["page"]), {})
+
+
+class CompactSerializerTests(TestCase):
+    def test_round_trip(self):
+        """Test that decimals, datetimes and nested data survive."""
+        serializer = MsgpackSerializer({})
+        value = {
+            "price": Decimal("19.99"),
+            "updated_at": datetime(2026, 10, 19, 8, 0, 0, 123456, tzinfo=timezone.utc),
+            "day": date(2026, 10, 19),
+            "data": [{"id": 1, "name": "Café", "description": None}],
+            "body": b"\x1f\x8b",
+        }
+        self.assertEqual(serializer.loads(serializer.dumps(value)), value)
+
+    def test_compression(self):
+        """Test that pages shrink and incompressible values are kept as is."""
+        serializer = MsgpackSerializer({})
+        compressor = ZstdCompressor({})
+        page = serializer.dumps({"data": [
+            {"id": i, "name": f"Product {i}", "price": "10.00"} for i in range(100)]})
+        compressed = compressor.compress(page)
+        self.assertLess(len(compressed), len(page) / 4)
+        self.assertEqual(compressor.decompress(compressed), page)
+
+        noise = os.urandom(2048)
+        self.assertEqual(compressor.compress(noise), noise)
+        self.assertEqual(compressor.compress(b"short"), b"short")
@@ -0,0 +1,93 @@
+import io
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from apps.api.utils import renderers
+from apps.api.utils.renderers import FastJSONParser, FastJSONRenderer
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def setUp(self):
+        self.payload = {
+            "success": True,
+            "message": "Products retrieved successfully.",
+            "data": [
+                {
+                    "id": i,
+                    "name": f"Product {i}",
+                    "description": "Line separator",
+                    "price": Decimal("19.99"),
+                    "created_at": "2024-11-19T12:30:00Z",
+                    "category": 1,
+                }
+                for i in range(3)
+            ],
+            "count": 3,
+            "next": None,
+            "previous": None,
+        }
+
+    def test_matches_stock_renderer(self):
+        """Test that the output decodes to the same value as JSONRenderer."""
+        fast = FastJSONRenderer().render(self.payload)
+        stock = JSONRenderer().render(self.payload)
+        self.assertEqual(json.loads(fast), json.loads(stock))
+
+    def test_decimal_rendered_as_number(self):
+        """Test that decimals are rendered as JSON numbers."""
+        rendered = json.loads(FastJSONRenderer().render({"price": Decimal("9.50")}))
+        self.assertEqual(rendered["price"], 9.5)
+
+    def test_aware_datetime_rendered_natively(self):
+        """Test that timezone-aware datetimes are rendered with a Z suffix."""
+        value = datetime(2024, 11, 19, 12, 30, 0, 123456, tzinfo=timezone.utc)
+        rendered = json.loads(FastJSONRenderer().render({"created_at": value}))
+        self.assertEqual(rendered["created_at"], "2024-11-19T12:30:00.123456Z")
+
+    def test_line_separators_escaped(self):
+        """Test that U+2028 and U+2029 are escaped like JSONRenderer does."""
+        rendered = FastJSONRenderer().render({"text": "a\u2028b\u2029c"})
+        self.assertIn(b"\\u2028", rendered)
+        self.assertIn(b"\\u2029", rendered)
+
+    def test_none_renders_empty(self):
+        """Test that no data renders an empty body."""
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_indent_other_than_two_falls_back(self):
+        """Test that unsupported indents use the stock renderer."""
+        rendered = FastJSONRenderer().render(
+            {"a": 1}, "application/json; indent=4")
+        self.assertEqual(rendered, JSONRenderer().render(
+            {"a": 1}, "application/json; indent=4"))
+
+    def test_fallback_without_orjson(self):
+        """Test that the renderer works when orjson is not installed."""
+        with mock.patch.object(renderers, "orjson", None):
+            rendered = FastJSONRenderer().render(self.payload)
+        self.assertEqual(rendered, JSONRenderer().render(self.payload))
+
+
+class FastJSONParserTests(SimpleTestCase):
+    def test_parse(self):
+        """Test parsing a JSON request body."""
+        stream = io.BytesIO(b'{"name": "Test", "price": 10.5}')
+        self.assertEqual(
+            FastJSONParser().parse(stream), {"name": "Test", "price": 10.5})
+
+    def test_parse_error(self):
+        """Test that malformed JSON raises a ParseError."""
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"name": '))
+
+    def test_parse_without_orjson(self):
+        """Test that the parser works when orjson is not installed."""
+        with mock.patch.object(renderers, "orjson", None):
+            data = FastJSONParser().parse(io.BytesIO(b'{"name": "Test"}'))
+        self.assertEqual(data, {"name": "Test"})
@@ -0,0 +1,80 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.api.management.commands.replay_requests import build_url, load_capture
+from apps.api.v1.category.models import Category
+
+
+class RequestCaptureTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.capture_dir = tempfile.TemporaryDirectory()
+        self.capture_path = Path(self.capture_dir.name) / "requests.jsonl"
+        Category.objects.create(name="Existing Category")
+        cache.clear()
+
+    def tearDown(self):
+        self.capture_dir.cleanup()
+
+    def capture_settings(self, **overrides):
+        return override_settings(REQUEST_CAPTURE={
+            "ENABLED": True,
+            "SAMPLE_RATE": 1.0,
+            "PATH": self.capture_path,
+            **overrides,
+        })
+
+    def read_capture(self):
+        return load_capture([self.capture_path])
+
+    def test_requests_are_recorded(self):
+        """Test that sampled requests are written as JSON lines."""
+        with self.capture_settings():
+            self.client.get("/api/v1/categories/", {"page": 1})
+            self.client.get("/api/v1/categories/", {"page": 1})
+
+        records = self.read_capture()
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0]["method"], "GET")
+        self.assertEqual(records[0]["path"], "/api/v1/categories/")
+        self.assertEqual(records[0]["query"], {"page": ["1"]})
+        self.assertEqual(records[0]["status"], 200)
+        self.assertEqual(records[0]["cache"], "miss")
+        self.assertEqual(records[1]["cache"], "hit")
+        self.assertIsNone(records[0]["body_sha256"])
+
+    def test_request_body_is_hashed(self):
+        """Test that request bodies are stored as a hash only."""
+        with self.capture_settings():
+            self.client.post("/api/v1/categories/", {"name": "Secret"},
+                             format="json")
+
+        record = self.read_capture()[0]
+        self.assertEqual(len(record["body_sha256"]), 64)
+        self.assertNotIn("Secret", json.dumps(record))
+
+    def test_capture_disabled(self):
+        """Test that nothing is written when capture is disabled."""
+        with self.capture_settings(ENABLED=False):
+            self.client.get("/api/v1/categories/")
+        self.assertFalse(self.capture_path.exists())
+
+    def test_sample_rate_zero(self):
+        """Test that a zero sample rate records nothing."""
+        with self.capture_settings(SAMPLE_RATE=0.0):
+            self.client.get("/api/v1/categories/")
+        self.assertFalse(self.capture_path.exists())
+
+    def test_build_replay_url(self):
+        """Test that replay URLs keep repeated query parameters."""
+        record = {"path": "/api/v1/products/",
+                  "query": {"category": ["a", "b"], "page": ["2"]}}
+        self.assertEqual(
+            build_url("http://localhost:8000/", record),
+            "http://localhost:8000/api/v1/products/?category=a&category=b&page=2",
+        )
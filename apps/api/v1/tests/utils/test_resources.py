@@ -0,0 +1,129 @@
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.api.constants.redis import REDIS_KEY_CATEGORIES, REDIS_KEY_PRODUCTS
+from apps.api.v1.category.models import Category
+from apps.api.v1.product.models import Product
+from apps.api.v1.tests.base import ApiTestCase
+
+
+class CachedResourceTestsMixin:
+    """
+    Checks every cached resource must pass. Subclasses set ``url`` and
+    ``cache_prefix`` and implement ``create_items``, ``create_payload``
+    and ``update_payload``.
+    """
+    url = None
+    cache_prefix = None
+
+    def setUp(self):
+        self.client = APIClient()
+        self.items = self.create_items(12)
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def detail_url(self, item):
+        return f"{self.url}{item.id}/"
+
+    def test_hit_runs_no_queries(self):
+        """Test that cached lists and details are served without queries."""
+        for url in (self.url, self.detail_url(self.items[0])):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+                with self.assertNumQueries(0):
+                    response = self.client.get(url)
+                self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_fill_queries_independent_of_page_size(self):
+        """Test that filling a list page costs a fixed number of queries."""
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.json()["data"]), 10)
+        self.assertEqual(response.json()["count"], len(self.items))
+
+    def test_equivalent_queries_share_entry(self):
+        """Test that canonically equal query strings hit one entry."""
+        self.client.get(self.url, {"page": 1})
+        response = self.client.get(self.url, {"utm_source": "mail"})
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_pagination_links(self):
+        """Test that pages link to each other canonically."""
+        data = self.client.get(self.url, {"page": 2, "utm_source": "x"}).json()
+        self.assertIsNone(data["next"])
+        self.assertTrue(data["previous"].endswith(self.url))
+
+    def test_errors(self):
+        """Test that unknown items and pages are reported, not cached."""
+        self.assertEqual(self.client.get(f"{self.url}999999/").status_code,
+                         status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(self.url, {"page": 9}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(cache.keys(f"{self.cache_prefix}*"), [])
+
+    def test_writes_invalidate(self):
+        """Test that create, update and delete drop cached entries."""
+        item = self.items[0]
+        writes = (
+            lambda: self.client.post(self.url, self.create_payload(), format="json"),
+            lambda: self.client.put(self.detail_url(item), self.update_payload(), format="json"),
+            lambda: self.client.delete(self.detail_url(item)),
+        )
+        expected = (status.HTTP_201_CREATED, status.HTTP_200_OK, status.HTTP_204_NO_CONTENT)
+        for write, status_code in zip(writes, expected):
+            with self.subTest(status_code=status_code):
+                self.client.get(self.url)
+                self.client.get(self.detail_url(item))
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.assertEqual(write().status_code, status_code)
+                self.assertEqual(cache.keys(f"{self.cache_prefix}?*"), [])
+
+    def test_invalid_write(self):
+        """Test that invalid writes are rejected without invalidating."""
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "HIT")
+
+
+class ProductResourceTests(CachedResourceTestsMixin, ApiTestCase):
+    url = "/api/v1/products/"
+    cache_prefix = REDIS_KEY_PRODUCTS
+
+    def create_items(self, count):
+        self.category = Category.objects.create(name="Books")
+        return [
+            Product.objects.create(name=f"Book {i}", price=10 + i, category=self.category)
+            for i in range(count)
+        ]
+
+    def create_payload(self):
+        return {"name": "New", "price": "1.00", "category": self.category.id}
+
+    def update_payload(self):
+        return {"name": "Renamed", "price": "2.00", "category": self.category.id}
+
+    def test_writes_invalidate_categories(self):
+        """Test that product writes also drop the derived category entries."""
+        self.client.get("/api/v1/categories/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(self.detail_url(self.items[0]))
+        self.assertEqual(cache.keys(f"{REDIS_KEY_CATEGORIES}*"), [])
+
+
+class CategoryResourceTests(CachedResourceTestsMixin, ApiTestCase):
+    url = "/api/v1/categories/"
+    cache_prefix = REDIS_KEY_CATEGORIES
+
+    def create_items(self, count):
+        return [Category.objects.create(name=f"Category {i}") for i in range(count)]
+
+    def create_payload(self):
+        return {"name": "New"}
+
+    def update_payload(self):
+        return {"name": "Renamed"}
@@ -0,0 +1,57 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connections
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.api.utils.startup import iter_view_classes, warm_up
+from apps.api.v1.category.models import Category
+from apps.api.v1.category.views import CategoryListView
+from apps.api.v1.product.views import ProductDetailView
+from apps.api.v1.tests.base import ApiTestCase
+from config import settings_api
+
+API_PROFILE = {
+    "MIDDLEWARE": settings_api.MIDDLEWARE,
+    "ROOT_URLCONF": settings_api.ROOT_URLCONF,
+    "REST_FRAMEWORK": settings_api.REST_FRAMEWORK,
+}
+
+
+class WarmUpTests(ApiTestCase):
+    def test_finds_routed_views(self):
+        """Test that the view classes are collected from the URLconf."""
+        view_classes = set(iter_view_classes())
+        self.assertIn(CategoryListView, view_classes)
+        self.assertIn(ProductDetailView, view_classes)
+
+    def test_warm_up(self):
+        """Test that warming up leaves no database connection open."""
+        with mock.patch.object(connections, "close_all") as close_all:
+            self.assertGreaterEqual(warm_up(), 0)
+        close_all.assert_called_once()
+
+
+@override_settings(**API_PROFILE)
+class ApiProfileTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.category = Category.objects.create(name="Books")
+        cache.clear()
+
+    def test_no_admin_or_sessions(self):
+        """Test that the API profile routes no admin and sets no cookies."""
+        self.assertEqual(self.client.get("/admin/").status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get("/api/v1/categories/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.cookies, {})
+
+    def test_writes_without_csrf(self):
+        """Test that writes work without the CSRF and auth middleware."""
+        response = self.client.post(
+            "/api/v1/products/",
+            {"name": "Scarf", "price": "9.99", "category": self.category.id},
+            format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
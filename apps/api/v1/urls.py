@@ -1,6 +1,9 @@
 from django.urls import path, include
+from .views import BatchView, JobQueueView
 
 urlpatterns = [
     path('categories/', include('apps.api.v1.category.urls')),
     path('products/', include('apps.api.v1.product.urls')),
+    path('jobs/', JobQueueView.as_view(), name='job-queue'),
+    path('batch/', BatchView.as_view(), name='batch'),
 ]
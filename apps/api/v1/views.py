@@ -0,0 +1,50 @@
+from rest_framework.views import APIView
+from rest_framework import status
+from apps.api.utils.response_formatter import format_response
+from apps.api.utils.exceptions import ApiException
+from apps.api.utils.batch import execute_batch, parse_batch
+from apps.api.utils.jobs import get_queue_stats
+
+
+class JobQueueView(APIView):
+    def get(self, request):
+        try:
+            return format_response(
+                success=True,
+                message="Job queue stats retrieved successfully.",
+                data=get_queue_stats(),
+                status_code=status.HTTP_200_OK,
+            )
+        except Exception as e:
+            return format_response(
+                success=False,
+                message=str(e),
+                data=None,
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class BatchView(APIView):
+    def post(self, request):
+        try:
+            results = execute_batch(request, parse_batch(request.data))
+            return format_response(
+                success=True,
+                message="Batch processed successfully.",
+                data=results,
+                status_code=status.HTTP_200_OK,
+            )
+        except ApiException as e:
+            return format_response(
+                success=False,
+                message=e.message,
+                data=None,
+                status_code=e.status_code,
+            )
+        except Exception as e:
+            return format_response(
+                success=False,
+                message=str(e),
+                data=None,
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
@@ -0,0 +1,78 @@
+"""
+Compare the stock DRF JSON renderer with FastJSONRenderer on product list
+payloads.
+
+Usage:
+    python3 benchmarks/bench_renderers.py [--rows 100] [--iterations 2000]
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rest_framework.utils.serializer_helpers import ReturnList  # noqa: E402
+
+from apps.api.utils.renderers import FastJSONRenderer, orjson  # noqa: E402
+
+
+def build_payload(rows):
+    now = datetime(2024, 11, 19, 12, 30, tzinfo=timezone.utc)
+    data = ReturnList([
+        {
+            "id": i,
+            "name": f"Product {i}",
+            "description": "A reasonably long product description. " * 4,
+            "price": Decimal(f"{i % 500}.99"),
+            "created_at": now - timedelta(days=i),
+            "updated_at": (now - timedelta(hours=i)).isoformat(),
+            "category": i % 10,
+        }
+        for i in range(rows)
+    ], serializer=None)
+    return {
+        "success": True,
+        "message": "Products retrieved successfully.",
+        "data": data,
+        "count": rows * 10,
+        "next": "http://localhost/api/v1/products/?page=2",
+        "previous": None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    payload = build_payload(args.rows)
+    renderers = [("JSONRenderer", JSONRenderer()),
+                 ("FastJSONRenderer", FastJSONRenderer())]
+
+    print(f"orjson: {'available' if orjson else 'not installed (fallback)'}")
+    print(f"{args.rows} rows x {args.iterations} iterations")
+    results = {}
+    for name, renderer in renderers:
+        seconds = min(timeit.repeat(
+            lambda: renderer.render(payload), number=args.iterations, repeat=3))
+        results[name] = seconds
+        size = len(renderer.render(payload))
+        print(f"{name:>18}: {seconds / args.iterations * 1e6:9.1f} us/render "
+              f"({size} bytes)")
+    print(f"{'speedup':>18}: "
+          f"{results['JSONRenderer'] / results['FastJSONRenderer']:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
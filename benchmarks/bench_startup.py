@@ -0,0 +1,120 @@
+"""
+Compare worker boot time and per-request overhead of the full settings
+profile with the API-only profile, with and without the pre-fork warm-up.
+
+Each configuration is booted --boots times in a fresh interpreter. Boot
+time covers Django setup and loading the WSGI application. The first
+request is timed separately, and then --requests requests are made to
+``GET /api/v1/jobs/`` through the WSGI application. That view touches
+neither the database nor Redis, and rate limiting is switched off, so
+what remains is the cost of the middleware, routing and DRF.
+
+Usage:
+    python3 benchmarks/bench_startup.py [--boots 5] [--requests 2000]
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+PROFILES = [
+    ("settings", "config.settings", False),
+    ("settings_api", "config.settings_api", False),
+    ("settings_api + warm", "config.settings_api", True),
+]
+
+
+def call(application, path):
+    from wsgiref.util import setup_testing_defaults
+
+    environ = {"PATH_INFO": path, "wsgi.errors": io.StringIO()}
+    setup_testing_defaults(environ)
+    statuses = []
+    body = b"".join(application(
+        environ, lambda status, headers, exc_info=None: statuses.append(status)))
+    return statuses[0], body
+
+
+def run_child(warm, requests):
+    start = time.perf_counter()
+    import django
+    from django.core.wsgi import get_wsgi_application
+
+    django.setup(set_prefix=False)
+    from django.conf import settings
+    settings.RATE_LIMIT = {**settings.RATE_LIMIT, "ENABLED": False}
+    application = get_wsgi_application()
+    if warm:
+        from apps.api.utils.startup import warm_up
+        warm_up()
+    boot = time.perf_counter() - start
+
+    start = time.perf_counter()
+    status, _ = call(application, "/api/v1/jobs/")
+    first = time.perf_counter() - start
+    if not status.startswith("200"):
+        sys.exit(f"GET /api/v1/jobs/ returned {status}")
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        call(application, "/api/v1/jobs/")
+    per_request = (time.perf_counter() - start) / requests
+
+    print(json.dumps({
+        "modules": len(sys.modules), "boot": boot,
+        "first": first, "per_request": per_request,
+    }))
+
+
+def boot(settings_module, warm, requests):
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": settings_module,
+        "PYTHONPATH": str(ROOT),
+    }
+    command = [sys.executable, __file__, "--child", "--requests", str(requests)]
+    if warm:
+        command.append("--warm")
+    start = time.perf_counter()
+    output = subprocess.run(
+        command, env=env, check=True, capture_output=True, text=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process"] = time.perf_counter() - start
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--boots", type=int, default=5)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--warm", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, str(ROOT))
+        run_child(args.warm, args.requests)
+        return
+
+    print(f"{args.boots} boots x {args.requests} requests, medians")
+    print(f"{'profile':>20} {'modules':>8} {'boot ms':>8} {'process ms':>11} "
+          f"{'1st req ms':>11} {'us/req':>8}")
+    for name, settings_module, warm in PROFILES:
+        runs = [boot(settings_module, warm, args.requests) for _ in range(args.boots)]
+
+        def median(key):
+            return statistics.median(run[key] for run in runs)
+
+        print(f"{name:>20} {median('modules'):8.0f} {median('boot') * 1e3:8.1f} "
+              f"{median('process') * 1e3:11.1f} {median('first') * 1e3:11.2f} "
+              f"{median('per_request') * 1e6:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""
+gunicorn configuration for the API-only profile:
+
+    gunicorn -c config/gunicorn_api.py
+"""
+import multiprocessing
+import os
+
+wsgi_app = 'config.wsgi_api:application'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# Import and warm the application once, in the master, before forking.
+preload_app = True
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+from decimal import Decimal
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -38,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
+    'apps.api',
     'apps.api.v1.category',
     'apps.api.v1.product',
 ]
@@ -46,9 +48,21 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
     'COERCE_DECIMAL_TO_STRING': False,
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.api.utils.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'apps.api.utils.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 MIDDLEWARE = [
+    'apps.api.middleware.request_capture.RequestCaptureMiddleware',
+    'apps.api.middleware.compression.CompressionMiddleware',
+    'apps.api.middleware.rate_limit.RateLimitMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -131,17 +145,146 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-# Redis cache configuration
+# Redis cache configuration. Cache entries are spread over the LOCATION
+# nodes by consistent hashing; counters, queues and Lua-managed keys stay on
+# the first node (see apps/api/utils/redis_cache.py). The pool is per node
+# and per process: threads wait up to `timeout` seconds for a free
+# connection instead of opening more than `max_connections`.
 CACHES = {
     'default': {
         'BACKEND': 'django_redis.cache.RedisCache',
-        'LOCATION': 'redis://127.0.0.1:6379',
+        'LOCATION': [
+            'redis://127.0.0.1:6379',
+        ],
         'OPTIONS': {
-            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'CLIENT_CLASS': 'apps.api.utils.redis_cache.ShardedRedisClient',
+            'SERIALIZER': 'apps.api.utils.redis_cache.MsgpackSerializer',
+            'COMPRESSOR': 'apps.api.utils.redis_cache.ZstdCompressor',
+            'ZSTD_LEVEL': 3,
+            'ZSTD_MIN_LENGTH': 256,  # bytes
+            'CONNECTION_POOL_CLASS': 'redis.BlockingConnectionPool',
+            'CONNECTION_POOL_KWARGS': {
+                'max_connections': 50,
+                'timeout': 2,  # seconds to wait for a free connection
+                'health_check_interval': 30,
+            },
+            'SOCKET_CONNECT_TIMEOUT': 1,  # seconds
+            # Above JOB_QUEUE['POLL_TIMEOUT'], which blocks on BRPOP.
+            'SOCKET_TIMEOUT': 5,
         },
         'TIMEOUT': 300, # 5 minutes
     }
 }
 
+# Chunked category deletion. Products are removed BATCH_SIZE at a time, each
+# batch in its own short transaction; categories with more than
+# INLINE_THRESHOLD products are deleted in the background (HTTP 202) and
+# report progress at /api/v1/categories/<id>/deletion/.
+CATEGORY_DELETION = {
+    'BATCH_SIZE': 1000,
+    'INLINE_THRESHOLD': 1000,
+    'PROGRESS_TIMEOUT': 24 * 60 * 60,
+}
+
+# Product facets (/api/v1/products/facets/). With USE_SUMMARY, requests
+# without price filters are served from the incrementally maintained
+# ProductFacetSummary table; run `manage.py rebuild_product_facets` after
+# enabling it or changing SUMMARY_BUCKET_SIZE.
+PRODUCT_FACETS = {
+    'DEFAULT_BUCKET_SIZE': Decimal('10'),
+    'USE_SUMMARY': False,
+    'SUMMARY_BUCKET_SIZE': Decimal('10'),
+}
+
+# Response compression; encodings in server preference order. `br` and
+# `zstd` are used when the `brotli` / `zstandard` packages are installed.
+RESPONSE_COMPRESSION = {
+    'ENCODINGS': ['zstd', 'br', 'gzip'],
+    'MIN_SIZE': 512,
+    'GZIP_LEVEL': 6,
+    'BROTLI_QUALITY': 5,
+    'ZSTD_LEVEL': 3,
+}
+
+# Per-client token bucket rate limiting. Cache misses cost MISS_COST
+# tokens, hits HIT_COST. MAX_CONCURRENT_RECOMPUTES caps cache-miss
+# recomputation across all workers (0 disables the cap).
+RATE_LIMIT = {
+    'ENABLED': True,
+    'CAPACITY': 100,
+    'REFILL_RATE': 20,  # tokens per second
+    'HIT_COST': 1,
+    'MISS_COST': 5,
+    'WRITE_COST': 5,
+    'CLIENT_IP_HEADER': None,  # e.g. 'HTTP_X_FORWARDED_FOR' behind a proxy
+    'MAX_CONCURRENT_RECOMPUTES': 32,
+    'RECOMPUTE_SLOT_TTL': 30,
+}
+
+# Cache warming (`manage.py warm_cache`). Hot targets are TARGETS plus the
+# CAPTURE_TOP most requested paths of CAPTURE_PATH. BASE_URL must be an
+# allowed host; it is used for the pagination links stored in the cache.
+CACHE_WARMING = {
+    'TARGETS': ['/api/v1/products/', '/api/v1/categories/'],
+    'CAPTURE_PATH': None,
+    'CAPTURE_TOP': 100,
+    'BASE_URL': 'http://localhost:8000',
+    'WORKERS': 4,
+    'REWARM_ON_INVALIDATE': False,
+}
+
+# Background jobs: cache invalidation after writes, rewarming and large
+# category deletions. BACKEND is 'thread' (in-process, no external
+# services), 'redis' (shared list; add `manage.py run_job_worker`
+# processes and set WORKERS to 0 in web processes if desired) or 'inline'.
+JOB_QUEUE = {
+    'BACKEND': 'thread',
+    'WORKERS': 2,
+    'MAX_RETRIES': 3,
+    'RETRY_DELAY': 1.0,  # seconds
+}
+
+# In-memory (price, id) index answering price_min/price_max product lists
+# without a cache entry per range. Rebuilt on boot and after bulk writes,
+# from chunks of REBUILD_CHUNK_SIZE rows. Processes apply each other's
+# writes from a Redis log of the last LOG_SIZE writes.
+PRICE_INDEX = {
+    'ENABLED': True,
+    'REBUILD_CHUNK_SIZE': 10000,
+    'LOG_SIZE': 1000,
+}
+
+# Memory-mapped columnar catalog snapshot serving product lists (requires
+# numpy). Build it with `manage.py build_catalog_snapshot [--every SECONDS]`;
+# rows written since are read from the database, up to MAX_DIRTY of them.
+CATALOG_SNAPSHOT = {
+    'ENABLED': False,
+    'PATH': BASE_DIR / 'snapshots' / 'catalog',
+    'MAX_DIRTY': 1000,
+    'CHUNK_SIZE': 10000,
+    'DIRTY_RETENTION': 60 * 60,
+}
+
+# POST /api/v1/batch/: at most MAX_REQUESTS sub-requests per batch, with
+# consecutive reads run by up to WORKERS threads.
+BATCH = {
+    'MAX_REQUESTS': 20,
+    'WORKERS': 4,
+}
+
+# PATCH /api/v1/products/: at most MAX_BULK_ITEMS products per bulk patch.
+PRODUCT_PATCH = {
+    'MAX_BULK_ITEMS': 500,
+}
+
+# Sampled request capture, replayable with `manage.py replay_requests`
+REQUEST_CAPTURE = {
+    'ENABLED': False,
+    'SAMPLE_RATE': 0.05,
+    'PATH': BASE_DIR / 'captures' / 'requests.jsonl',
+    'MAX_BYTES': 50 * 1024 * 1024,
+    'BACKUP_COUNT': 5,
+}
+
 SESSION_ENGINE = "django.contrib.sessions.backends.cache"
 SESSION_CACHE_ALIAS = "default"
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""
+API-only settings profile for the application servers.
+
+The JSON API authenticates nobody and renders no HTML, so admin, sessions,
+messages, static files, templates and CSRF are left out. This avoids
+importing them at every worker boot and running their middleware on every
+request, and no session is ever loaded from Redis. Management commands and
+the admin keep using ``config.settings``.
+
+    DJANGO_SETTINGS_MODULE=config.settings_api gunicorn -c config/gunicorn_api.py
+"""
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    'rest_framework',
+    'apps.api',
+    'apps.api.v1.category',
+    'apps.api.v1.product',
+]
+
+MIDDLEWARE = [
+    'apps.api.middleware.request_capture.RequestCaptureMiddleware',
+    'apps.api.middleware.compression.CompressionMiddleware',
+    'apps.api.middleware.rate_limit.RateLimitMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'config.urls_api'
+WSGI_APPLICATION = 'config.wsgi_api.application'
+
+TEMPLATES = []
+AUTH_PASSWORD_VALIDATORS = []
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,  # noqa: F405
+    # No browsable API: it needs templates and static files.
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.api.utils.renderers.FastJSONRenderer',
+    ],
+    # Without django.contrib.auth there is no user model; requests are
+    # anonymous and request.user is None.
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PERMISSION_CLASSES': [],
+    'UNAUTHENTICATED_USER': None,
+}
@@ -0,0 +1,8 @@
+"""
+URL configuration for the API-only settings profile (no admin).
+"""
+from django.urls import path, include
+
+urlpatterns = [
+    path('api/v1/', include('apps.api.v1.urls')),
+]
@@ -0,0 +1,19 @@
+"""
+WSGI config for the API-only settings profile.
+
+The application is warmed up on import, so with gunicorn's
+``preload_app`` it is done once in the master before the workers fork.
+See ``config/gunicorn_api.py``.
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings_api')
+
+application = get_wsgi_application()
+
+from apps.api.utils.startup import warm_up  # noqa: E402
+
+warm_up()